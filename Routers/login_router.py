@@ -1,12 +1,18 @@
-from fastapi import APIRouter, HTTPException, Response, Depends
+import math
+
+from fastapi import APIRouter, HTTPException, Request, Response, Depends
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from auth import (
+    TokenClaims, current_user, set_access_cookie, token_decoder, token_revocations
+)
 from schemas import UserLoginSchema
-from config import security, config
+from config import RateLimitConfig, TokenConfig
 from database import get_db
-from repository import UserRepository
+from repository import UserRepository, RoleRepository
 from models import UserModel
+from rate_limit import login_limiter
 
 router = APIRouter(
     tags=["login"]
@@ -16,9 +22,24 @@ router = APIRouter(
 @router.post("/login")
 async def login(
     credentials: UserLoginSchema,
+    request: Request,
     response: Response,
     db: AsyncSession = Depends(get_db),
 ):
+    # Ограничение проверяется до запроса к базе и bcrypt
+    client_ip = request.client.host if request.client else "unknown"
+    wait = await login_limiter.check([
+        (f"login:user:{credentials.username.lower()}",
+         RateLimitConfig.LOGIN_LIMIT_PER_USERNAME),
+        (f"login:ip:{client_ip}", RateLimitConfig.LOGIN_LIMIT_PER_IP),
+    ])
+    if wait is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(wait))}
+        )
+
     repo = UserRepository(db)
 
     user: UserModel = await repo.authenticate(
@@ -26,13 +47,15 @@ async def login(
         credentials.password
     )
     if user:
-        access_token = security.create_access_token(uid="1")
-        response.set_cookie(
-            key=config.JWT_ACCESS_COOKIE_NAME,
-            value=access_token,
-            secure=True,
-            max_age=3600
+        # Роль берется из кэша ролей и попадает в токен, чтобы защищенные
+        # роуты не обращались к базе
+        role = await RoleRepository(db).get_by_id(user.role_id)
+        access_token = token_decoder.issue(
+            user_id=user.user_id,
+            role_id=user.role_id,
+            role_name=role.role_name if role else ""
         )
+        set_access_cookie(response, access_token)
         return {"access_token": access_token}
     else:
         raise HTTPException(
@@ -41,9 +64,29 @@ async def login(
         )
 
 
+@router.post("/logout")
+async def logout(
+    response: Response,
+    claims: TokenClaims = Depends(current_user)
+):
+    """Отозвать текущий токен"""
+    token_revocations.revoke(claims)
+    response.delete_cookie(TokenConfig.JWT_ACCESS_COOKIE_NAME)
+    return {"message": "OK"}
+
+
+@router.get("/me")
+async def me(claims: TokenClaims = Depends(current_user)):
+    """Текущий пользователь по данным токена"""
+    return {
+        "user_id": claims.user_id,
+        "role": {"role_id": claims.role_id, "role_name": claims.role_name},
+    }
+
+
 @router.get(
     "/protected",
-    dependencies=[Depends(security.access_token_required)]
+    dependencies=[Depends(current_user)]
 )
 async def potected():
     return {"message": "OK"}
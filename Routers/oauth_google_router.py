@@ -1,12 +1,76 @@
-from fastapi import APIRouter
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 # from fastapi.responses import HTMLResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from oauth_google import generate_google_oauth_redirect_uri
+from auth import set_access_cookie, token_decoder
+from database import get_db
+from oauth_google import (
+    GoogleOAuthError, generate_google_oauth_redirect_uri, google_oauth
+)
+from repository import RoleRepository, UserRepository
 
 router = APIRouter(prefix="/auth", tags=["oauth2_google"])
 
+# Cookie со state для защиты callback от CSRF
+STATE_COOKIE = "google_oauth_state"
+
 
 @router.get("/google/url")
-async def get_google_oauth_redirect_iri() -> str:
-    uri: str = generate_google_oauth_redirect_uri()
+async def get_google_oauth_redirect_iri(response: Response) -> str:
+    state = secrets.token_urlsafe(24)
+    response.set_cookie(
+        STATE_COOKIE, state, max_age=600, httponly=True, secure=True, samesite="lax"
+    )
+    uri: str = generate_google_oauth_redirect_uri(state)
     return uri
+
+
+@router.get("/google")
+async def google_oauth_callback(
+    request: Request,
+    response: Response,
+    code: Optional[str] = None,
+    state: Optional[str] = None,
+    error: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Callback Google OAuth2
+
+    Обменивает код на токены, проверяет подпись id_token по кэшу JWKS
+    и выдает access-токен приложения пользователю с тем же email.
+    """
+    if error:
+        raise HTTPException(status_code=400, detail=f"Google OAuth error: {error}")
+    expected_state = request.cookies.get(STATE_COOKIE)
+    if not code or not state or not expected_state or not secrets.compare_digest(
+        state, expected_state
+    ):
+        raise HTTPException(status_code=400, detail="Invalid OAuth state")
+
+    try:
+        claims = await google_oauth.authenticate(code)
+    except GoogleOAuthError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    if not claims.get("email") or not claims.get("email_verified"):
+        raise HTTPException(status_code=403, detail="Email не подтвержден Google")
+
+    user = await UserRepository(db).get_by_email(claims["email"])
+    if not user:
+        raise HTTPException(
+            status_code=403,
+            detail="Пользователь с таким email не зарегистрирован"
+        )
+
+    role = await RoleRepository(db).get_by_id(user.role_id)
+    access_token = token_decoder.issue(
+        user_id=user.user_id,
+        role_id=user.role_id,
+        role_name=role.role_name if role else ""
+    )
+    response.delete_cookie(STATE_COOKIE)
+    set_access_cookie(response, access_token)
+    return {"access_token": access_token}
@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from database import get_pool_stats
+from metrics import registry
+
+router = APIRouter(
+    prefix="/system",
+    tags=["system"]
+)
+
+metrics_router = APIRouter(
+    tags=["system"]
+)
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats():
+    """Состояние пула соединений с базой данных"""
+    return get_pool_stats()
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Метрики в текстовом формате Prometheus"""
+    return PlainTextResponse(
+        registry.render(get_pool_stats()),
+        media_type="text/plain; version=0.0.4"
+    )
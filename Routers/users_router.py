@@ -1,14 +1,42 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from pydantic import ValidationError
 
-from database import get_db
+from bulk_import import import_users, iter_json_array, iter_ndjson
+from conditional import (
+    is_conditional,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    validator_headers
+)
+from counting import CountMode
+from database import (
+    get_db,
+    get_read_db,
+    get_read_sessionmaker,
+    get_sessionmaker,
+    pin_to_primary
+)
+from db_errors import user_constraint_message
+from export import ExportFormat, MEDIA_TYPES, iter_export
+from jobs import job_registry
+from pagination import encode_cursor, decode_cursor, InvalidCursorError
 from repository import UserRepository, RoleRepository
+from user_cache import user_cache
+from search import MIN_QUERY_LENGTH, SearchMode
+from serialization import JSONBytesResponse, user_row_to_dict
 from schemas import (
     UserCreate, UserUpdate, UserResponse, UserList, 
-    UserWithRoleResponse, UserListWithRoles,
-    RoleCreate, RoleUpdate, RoleResponse, RoleList
+    UserWithRoleResponse, UserListWithRoles, BulkUserReport,
+    UserBatchGetRequest, UserBatchGetResponse, UserSearchResponse,
+    RoleCreate, RoleUpdate, RoleResponse, RoleList, RoleReassignRequest,
+    UserBulkUpdateRequest, UserBulkDeleteRequest, BulkOperationResult,
+    JobResponse
 )
 
 router = APIRouter(
@@ -21,15 +49,86 @@ roles_router = APIRouter(
     tags=["roles"]
 )
 
+jobs_router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"]
+)
+
+
+async def _run_bulk_operation(
+    kind: str,
+    operation,
+    background: bool,
+    response: Response,
+    db: AsyncSession
+):
+    """
+    Выполнить массовую операцию сразу или фоновой задачей
+
+    Args:
+        kind: Тип операции для статуса задачи
+        operation: Корутина-функция (repo, on_progress) -> количество строк
+        background: Запустить фоновой задачей и вернуть 202 с job_id
+        response: Ответ (для кода 202)
+        db: Сессия запроса (используется только при background=False)
+    """
+    if background:
+        async def run(job):
+            # Задача переживает запрос, поэтому открывает свою сессию
+            async with get_sessionmaker()() as session:
+                await operation(UserRepository(session), job.progress)
+
+        job = await job_registry.submit(kind, run)
+        # Коммиты задачи будут уже после ответа: закрепляем клиента заранее
+        pin_to_primary()
+        response.status_code = 202
+        return JobResponse.model_validate(job, from_attributes=True)
+
+    try:
+        affected = await operation(UserRepository(db), None)
+    except IntegrityError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=user_constraint_message(e, "Ошибка массовой операции")
+        )
+    return BulkOperationResult(affected=affected)
+
+
+# === JOBS ENDPOINTS ===
+
+@jobs_router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Статус фоновой задачи"""
+    job = await job_registry.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return JobResponse.model_validate(job, from_attributes=True)
+
 
 # === ROLES ENDPOINTS ===
 
 @roles_router.get("/", response_model=RoleList)
-async def get_roles(db: AsyncSession = Depends(get_db)):
-    """Получить все роли"""
+async def get_roles(
+    request: Request,
+    response: Response,
+    include_total: bool = Query(True, description="Вернуть общее количество"),
+    total_mode: CountMode = Query(
+        CountMode.EXACT,
+        description="Способ подсчета: exact, cached или estimate"
+    ),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Получить все роли (поддерживает If-None-Match)"""
     repo = RoleRepository(db)
+    # Версия берется из кэша ролей, поэтому 304 не требует запросов к базе
+    etag = make_etag("roles", await repo.version(), include_total, total_mode.value)
+    headers = validator_headers(etag)
+    if is_not_modified(request, etag):
+        return not_modified(headers)
+
     roles = await repo.get_all()
-    total = await repo.count()
+    total = await repo.count(total_mode) if include_total else None
+    response.headers.update(headers)
     return RoleList(
         roles=[
             RoleResponse.model_validate(role, from_attributes=True) 
@@ -40,7 +139,7 @@ async def get_roles(db: AsyncSession = Depends(get_db)):
 
 
 @roles_router.get("/{role_id}", response_model=RoleResponse)
-async def get_role(role_id: int, db: AsyncSession = Depends(get_db)):
+async def get_role(role_id: int, db: AsyncSession = Depends(get_read_db)):
     """Получить роль по ID"""
     repo = RoleRepository(db)
     role = await repo.get_by_id(role_id)
@@ -107,6 +206,40 @@ async def update_role(
         )
 
 
+@roles_router.post("/{role_id}/reassign")
+async def reassign_role_users(
+    role_id: int,
+    request: RoleReassignRequest,
+    response: Response,
+    background: bool = Query(
+        False, description="Выполнить фоновой задачей и вернуть job_id"
+    ),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Перенести всех пользователей роли в другую роль
+
+    Выполняется пачками UPDATE (по UserRepository.BULK_CHUNK_SIZE строк),
+    каждая в своей транзакции. Возвращает количество перенесенных
+    пользователей или, с background=true, 202 и статус задачи.
+    """
+    role_repo = RoleRepository(db)
+    if not await role_repo.get_by_id(role_id):
+        raise HTTPException(status_code=404, detail="Роль не найдена")
+    if not await role_repo.get_by_id(request.to_role_id):
+        raise HTTPException(status_code=400, detail="Указанная роль не существует")
+    if request.to_role_id == role_id:
+        return BulkOperationResult(affected=0)
+
+    return await _run_bulk_operation(
+        "reassign_role",
+        lambda repo, on_progress: repo.reassign_role(
+            role_id, request.to_role_id, on_progress=on_progress
+        ),
+        background, response, db
+    )
+
+
 @roles_router.delete("/{role_id}")
 async def delete_role(role_id: int, db: AsyncSession = Depends(get_db)):
     """Удалить роль"""
@@ -130,47 +263,249 @@ async def delete_role(role_id: int, db: AsyncSession = Depends(get_db)):
 
 # === USER'S ENDPOINTS ===
 
+def _decode_user_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Получить user_id из курсора страницы (400 при некорректном курсоре)"""
+    if cursor is None:
+        return None
+    try:
+        return int(decode_cursor(cursor, "user_id")["user_id"])
+    except (InvalidCursorError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
 @router.get("/", response_model=UserListWithRoles)
 async def get_users(
+    request: Request,
     skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
     limit: int = Query(
         100, ge=1, le=1000,
         description="Максимальное количество записей"
     ),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор следующей страницы (next_cursor из предыдущего "
+                    "ответа). Если указан, skip игнорируется"
+    ),
+    include_total: bool = Query(True, description="Вернуть общее количество"),
+    total_mode: CountMode = Query(
+        CountMode.EXACT,
+        description="Способ подсчета: exact, cached или estimate"
+    ),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Получить всех пользователей с пагинацией"""
+    """
+    Получить всех пользователей с пагинацией
+
+    ETag страницы строится по (user_id, updated_at, role_id) ее строк,
+    версии ролей и общему количеству. Для условного запроса эти данные
+    сначала читаются узким запросом без JOIN, и при совпадении
+    If-None-Match страница не загружается и не сериализуется. Без
+    If-None-Match ETag считается по уже загруженным строкам.
+    """
     repo = UserRepository(db)
-    users = await repo.get_all(skip=skip, limit=limit, include_role=True)
-    total = await repo.count()
-    return UserListWithRoles(
-        users=[
-            UserWithRoleResponse.model_validate(
-                user,
-                from_attributes=True
-            ) for user in users
-        ],
-        total=total
+    after_user_id = _decode_user_cursor(cursor)
+    if after_user_id is not None:
+        skip = 0
+
+    total = await repo.count(total_mode) if include_total else None
+    roles_version = await RoleRepository(db).version()
+
+    def page_etag(versions) -> str:
+        return make_etag(
+            "users", skip, after_user_id, limit, total,
+            [(v.user_id, v.updated_at, v.role_id) for v in versions],
+            roles_version
+        )
+
+    # Запрашиваем на одну запись больше, чтобы узнать, есть ли следующая страница
+    etag = None
+    # Список не отдает Last-Modified: проверяется только If-None-Match
+    if is_conditional(request, last_modified=False):
+        etag = page_etag(await repo.get_page_versions(
+            skip=skip, limit=limit + 1, after_user_id=after_user_id
+        ))
+        if is_not_modified(request, etag):
+            return not_modified(validator_headers(etag))
+
+    # Версии прочитаны раньше строк, поэтому ответ не старее своего ETag
+    rows = await repo.get_rows(
+        skip=skip, limit=limit + 1, after_user_id=after_user_id
+    )
+    if etag is None:
+        etag = page_etag(rows)
+    headers = validator_headers(etag)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(user_id=rows[-1].user_id)
+
+    # Ответ собирается из строк напрямую: без ORM-объектов и без
+    # повторной валидации через response_model
+    return JSONBytesResponse(
+        {
+            "users": [user_row_to_dict(row) for row in rows],
+            "total": total,
+            "next_cursor": next_cursor,
+        },
+        headers=headers
+    )
+
+
+@router.get("/search", response_model=UserSearchResponse)
+async def search_users(
+    q: str = Query(
+        ..., min_length=MIN_QUERY_LENGTH, max_length=150,
+        description="Строка поиска по ФИО, email и описанию"
+    ),
+    mode: SearchMode = Query(
+        SearchMode.PREFIX,
+        description="prefix — по началу, fuzzy — нечеткий поиск"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Найти пользователей"""
+    repo = UserRepository(db)
+    rows = await repo.search(q, mode=mode, limit=limit, offset=offset)
+    users = []
+    for row in rows:
+        user = user_row_to_dict(row)
+        user["rank"] = row.rank
+        users.append(user)
+    return JSONBytesResponse({"users": users, "limit": limit, "offset": offset})
+
+
+def _stream_user_rows(
+    request: Request,
+    export_format: ExportFormat,
+    rows_for,
+    headers: Optional[dict] = None
+) -> StreamingResponse:
+    """
+    Потоковый ответ со строками пользователей
+
+    Строки NDJSON имеют ту же форму, что и в постраничных ответах
+    (user_row_to_dict): вложенный role и время в UTC с "Z".
+
+    Args:
+        rows_for: Функция repo -> асинхронный итератор строк ROW_COLUMNS
+    """
+    sessionmaker = get_read_sessionmaker(request)
+
+    async def generate():
+        # Сессия живет столько же, сколько поток ответа
+        async with sessionmaker() as session:
+            repo = UserRepository(session)
+            fields = [column.key for column in repo.ROW_COLUMNS]
+            async for chunk in iter_export(
+                rows_for(repo), fields, export_format, user_row_to_dict
+            ):
+                yield chunk
+
+    return StreamingResponse(
+        generate(),
+        media_type=MEDIA_TYPES[export_format],
+        headers=headers
+    )
+
+
+def _user_rows_page(rows, limit: int) -> JSONBytesResponse:
+    """Страница пользователей из строк get_rows(limit + 1), курсор — в X-Next-Cursor"""
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(user_id=rows[-1].user_id)
+    return JSONBytesResponse(
+        [user_row_to_dict(row) for row in rows],
+        headers=headers
+    )
+
+
+@router.get("/export")
+async def export_users(
+    request: Request,
+    format: ExportFormat = Query(
+        ExportFormat.NDJSON,
+        description="Формат выгрузки: ndjson или csv"
+    )
+):
+    """Выгрузить всех пользователей с названиями ролей потоком"""
+    return _stream_user_rows(
+        request,
+        format,
+        lambda repo: repo.stream_with_roles(),
+        headers={
+            "Content-Disposition": f'attachment; filename="users.{format.value}"'
+        }
+    )
+
+
+@router.get("/cache-stats")
+async def get_user_cache_stats():
+    """Статистика кэша пользователей"""
+    return user_cache.stats()
+
+
+def _user_etag(user_id: int, updated_at, role) -> str:
+    # Название роли входит в ответ, поэтому и в ETag (роль — из кэша)
+    return make_etag(
+        "user", user_id, updated_at,
+        role.role_id if role else None,
+        role.role_name if role else None
     )
 
 
+def _user_last_modified(updated_at, role):
+    # Переименование роли меняет ответ так же, как изменение пользователя
+    if role is None or role.updated_at is None:
+        return updated_at
+    return max(updated_at, role.updated_at)
+
+
 @router.get("/{user_id}", response_model=UserWithRoleResponse)
 async def get_user(
     user_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Получить пользователя по ID"""
+    """
+    Получить пользователя по ID
+
+    Поддерживает If-None-Match и If-Modified-Since: для условного
+    запроса решение о 304 принимается по updated_at и роли, без загрузки
+    строки целиком. Last-Modified — позднейшее из времени изменения
+    пользователя и его роли. Без условных заголовков строка загружается
+    одним запросом, и валидаторы строятся по ней.
+    """
     repo = UserRepository(db)
+    if is_conditional(request):
+        version = await repo.get_version(user_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Пользователь не найден")
+        updated_at, role_id = version
+        role = await RoleRepository(db).get_by_id(role_id)
+        etag = _user_etag(user_id, updated_at, role)
+        last_modified = _user_last_modified(updated_at, role)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(validator_headers(etag, last_modified))
+
     user = await repo.get_by_id(user_id, include_role=True)
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
+    response.headers.update(validator_headers(
+        _user_etag(user_id, user.updated_at, user.role),
+        _user_last_modified(user.updated_at, user.role)
+    ))
     return UserWithRoleResponse.model_validate(user, from_attributes=True)
 
 
 @router.get("/email/{email}", response_model=UserWithRoleResponse)
 async def get_user_by_email(
     email: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить пользователя по email"""
     repo = UserRepository(db)
@@ -183,7 +518,7 @@ async def get_user_by_email(
 @router.get("/phone/{phone_number}", response_model=UserWithRoleResponse)
 async def get_user_by_phone(
     phone_number: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить пользователя по номеру телефона"""
     repo = UserRepository(db)
@@ -193,12 +528,26 @@ async def get_user_by_phone(
     return UserWithRoleResponse.model_validate(user, from_attributes=True)
 
 
-@router.get("/by-role/{role_id}", response_model=list[UserWithRoleResponse])
+@router.get("/by-role/{role_id}")
 async def get_users_by_role_id(
     role_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    limit: int = Query(1000, ge=1, le=1000, description="Размер страницы"),
+    cursor: Optional[str] = Query(
+        None, description="Курсор из заголовка X-Next-Cursor"
+    ),
+    stream: bool = Query(
+        False, description="Отдать всех пользователей роли потоком NDJSON"
+    ),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Получить пользователей по ID роли"""
+    """
+    Получить пользователей по ID роли
+
+    Ответ постраничный: если есть следующая страница, ее курсор
+    возвращается в заголовке X-Next-Cursor. С stream=true все
+    пользователи роли отдаются потоком NDJSON без пагинации.
+    """
     repo = UserRepository(db)
     role_repo = RoleRepository(db)
     
@@ -206,26 +555,50 @@ async def get_users_by_role_id(
     role = await role_repo.get_by_id(role_id)
     if not role:
         raise HTTPException(status_code=404, detail="Роль не найдена")
-    
-    users = await repo.get_by_role_id(role_id, include_role=True)
-    return [
-        UserWithRoleResponse.model_validate(user, from_attributes=True) 
-        for user in users
-    ]
+
+    if stream:
+        return _stream_user_rows(
+            request,
+            ExportFormat.NDJSON,
+            lambda stream_repo: stream_repo.stream_by_role_id(role_id)
+        )
+
+    rows = await repo.get_by_role_id(
+        role_id,
+        limit=limit + 1,
+        after_user_id=_decode_user_cursor(cursor)
+    )
+    return _user_rows_page(rows, limit)
 
 
-@router.get("/by-role-name/{role_name}", response_model=list[UserWithRoleResponse])
+@router.get("/by-role-name/{role_name}")
 async def get_users_by_role_name(
     role_name: str,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    limit: int = Query(1000, ge=1, le=1000, description="Размер страницы"),
+    cursor: Optional[str] = Query(
+        None, description="Курсор из заголовка X-Next-Cursor"
+    ),
+    stream: bool = Query(
+        False, description="Отдать всех пользователей роли потоком NDJSON"
+    ),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Получить пользователей по названию роли"""
+    """Получить пользователей по названию роли (параметры как у /by-role/{role_id})"""
+    if stream:
+        return _stream_user_rows(
+            request,
+            ExportFormat.NDJSON,
+            lambda stream_repo: stream_repo.stream_by_role_name(role_name)
+        )
+
     repo = UserRepository(db)
-    users = await repo.get_by_role_name(role_name, include_role=True)
-    return [
-        UserWithRoleResponse.model_validate(user, from_attributes=True) 
-        for user in users
-    ]
+    rows = await repo.get_by_role_name(
+        role_name,
+        limit=limit + 1,
+        after_user_id=_decode_user_cursor(cursor)
+    )
+    return _user_rows_page(rows, limit)
 
 
 @router.post("/", response_model=UserWithRoleResponse, status_code=201)
@@ -235,40 +608,18 @@ async def create_user(
 ):
     """Создать нового пользователя"""
     repo = UserRepository(db)
-    role_repo = RoleRepository(db)
-    
-    # Проверяем существование роли
-    role_exists = await repo.verify_role_exists(user.role_id)
-    if not role_exists:
-        raise HTTPException(
-            status_code=400,
-            detail="Указанная роль не существует"
-        )
-    
-    # Проверяем уникальность email и телефона
-    existing_email = await repo.get_by_email(user.email)
-    if existing_email:
-        raise HTTPException(
-            status_code=400, 
-            detail="Пользователь с таким email уже существует"
-        )
-    
-    existing_phone = await repo.get_by_phone(user.phone_number)
-    if existing_phone:
-        raise HTTPException(
-            status_code=400, 
-            detail="Пользователь с таким номером телефона уже существует"
-        )
-    
+
+    # Роль, email и телефон проверяет база в рамках одного INSERT
     try:
-        new_user = await repo.create(user)
-        # Получаем пользователя с ролью для ответа
-        user_with_role = await repo.get_by_id(new_user.role_id, include_role=True)
-        return UserWithRoleResponse.model_validate(user_with_role, from_attributes=True)
-    except IntegrityError:
+        new_user = await repo.create(user, include_role=True)
+        return UserWithRoleResponse.model_validate(new_user, from_attributes=True)
+    except IntegrityError as e:
         raise HTTPException(
             status_code=400,
-            detail="Ошибка создания пользователя. Проверьте уникальность данных."
+            detail=user_constraint_message(
+                e,
+                "Ошибка создания пользователя. Проверьте уникальность данных."
+            )
         )
     except ValidationError as e:
         raise HTTPException(
@@ -277,6 +628,60 @@ async def create_user(
         )
 
 
+@router.post("/batch-get", response_model=UserBatchGetResponse)
+async def get_users_batch(
+    request: UserBatchGetRequest,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Получить пользователей по списку ID"""
+    repo = UserRepository(db)
+    users = await repo.get_many(request.ids, include_role=True)
+    found_ids = {user.user_id for user in users}
+    return UserBatchGetResponse(
+        users=[
+            UserWithRoleResponse.model_validate(user, from_attributes=True)
+            for user in users
+        ],
+        missing=[
+            user_id for user_id in dict.fromkeys(request.ids)
+            if user_id not in found_ids
+        ]
+    )
+
+
+@router.post("/bulk", response_model=BulkUserReport)
+async def create_users_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Массовый импорт пользователей
+
+    Принимает JSON-массив (application/json) или поток NDJSON
+    (application/x-ndjson, по одному пользователю на строку).
+    Возвращает результат по каждой строке.
+    """
+    repo = UserRepository(db)
+    role_repo = RoleRepository(db)
+
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        rows = iter_ndjson(request.stream())
+    else:
+        try:
+            items = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Некорректный JSON")
+        if not isinstance(items, list):
+            raise HTTPException(
+                status_code=400,
+                detail="Ожидается массив пользователей"
+            )
+        rows = iter_json_array(items)
+
+    return await import_users(repo, role_repo, rows)
+
+
 @router.put("/{user_id}", response_model=UserWithRoleResponse)
 async def update_user(
     user_id: int,
@@ -285,51 +690,20 @@ async def update_user(
 ):
     """Обновить пользователя"""
     repo = UserRepository(db)
-    
-    # Проверяем существование пользователя
-    existing_user = await repo.get_by_id(user_id)
-    if not existing_user:
-        raise HTTPException(status_code=404, detail="Пользователь не найден")
-    
-    # Проверяем существование роли, если она обновляется
-    if user_update.role_id:
-        role_exists = await repo.verify_role_exists(user_update.role_id)
-        if not role_exists:
-            raise HTTPException(
-                status_code=400,
-                detail="Указанная роль не существует"
-            )
-    
-    # Проверяем уникальность email, если он обновляется
-    if user_update.email:
-        email_user = await repo.get_by_email(user_update.email)
-        if email_user and email_user.user_id != user_id:
-            raise HTTPException(
-                status_code=400,
-                detail="Пользователь с таким email уже существует"
-            )
-    
-    # Проверяем уникальность телефона, если он обновляется
-    if user_update.phone_number:
-        phone_user = await repo.get_by_phone(user_update.phone_number)
-        if phone_user and phone_user.user_id != user_id:
-            raise HTTPException(
-                status_code=400,
-                detail="Пользователь с таким номером телефона уже существует"
-            )
-    
+
+    # Роль, email и телефон проверяет база в рамках одного UPDATE
     try:
-        updated_user = await repo.update(user_id, user_update)
+        updated_user = await repo.update(user_id, user_update, include_role=True)
         if not updated_user:
             raise HTTPException(status_code=404, detail="Пользователь не найден")
-
-        # Получаем пользователя с ролью для ответа
-        user_with_role = await repo.get_by_id(user_id, include_role=True)
-        return UserWithRoleResponse.model_validate(user_with_role, from_attributes=True)
-    except IntegrityError:
+        return UserWithRoleResponse.model_validate(updated_user, from_attributes=True)
+    except IntegrityError as e:
         raise HTTPException(
             status_code=400,
-            detail="Ошибка обновления пользователя. Проверьте уникальность данных."
+            detail=user_constraint_message(
+                e,
+                "Ошибка обновления пользователя. Проверьте уникальность данных."
+            )
         )
     except ValidationError as e:
         raise HTTPException(
@@ -356,6 +730,61 @@ async def delete_user(
         raise HTTPException(status_code=404, detail="Пользователь не найден")
 
 
+@router.post("/bulk-update")
+async def update_users_bulk(
+    request: UserBulkUpdateRequest,
+    response: Response,
+    background: bool = Query(
+        False, description="Выполнить фоновой задачей и вернуть job_id"
+    ),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Обновить пользователей по фильтру
+
+    Выполняется пачками UPDATE, каждая в своей транзакции. Возвращает
+    количество обновленных пользователей или, с background=true, 202
+    и статус задачи.
+    """
+    if not request.filter.has_criteria():
+        raise HTTPException(status_code=400, detail="Укажите хотя бы один фильтр")
+    if not request.values.has_values():
+        raise HTTPException(status_code=400, detail="Укажите хотя бы одно поле для обновления")
+    role_id = request.values.role_id
+    if role_id is not None and not await RoleRepository(db).get_by_id(role_id):
+        raise HTTPException(status_code=400, detail="Указанная роль не существует")
+
+    return await _run_bulk_operation(
+        "bulk_update",
+        lambda repo, on_progress: repo.bulk_update(
+            request.filter, request.values, on_progress=on_progress
+        ),
+        background, response, db
+    )
+
+
+@router.post("/bulk-delete")
+async def delete_users_bulk(
+    request: UserBulkDeleteRequest,
+    response: Response,
+    background: bool = Query(
+        False, description="Выполнить фоновой задачей и вернуть job_id"
+    ),
+    db: AsyncSession = Depends(get_db)
+):
+    """Удалить пользователей по фильтру (пачками, как bulk-update)"""
+    if not request.filter.has_criteria():
+        raise HTTPException(status_code=400, detail="Укажите хотя бы один фильтр")
+
+    return await _run_bulk_operation(
+        "bulk_delete",
+        lambda repo, on_progress: repo.bulk_delete(
+            request.filter, on_progress=on_progress
+        ),
+        background, response, db
+    )
+
+
 @router.patch("/{user_id}/role", response_model=UserWithRoleResponse)
 async def change_user_role(
     user_id: int,
@@ -0,0 +1,265 @@
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import jwt
+from fastapi import HTTPException, Request, Response
+
+from config import TokenConfig
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    """Данные пользователя из access-токена"""
+    user_id: int
+    role_id: int
+    role_name: str
+    version: int
+    jti: str
+    issued_at: float
+    expires_at: Optional[float]
+
+
+class TokenRevocations:
+    """
+    Отозванные токены в памяти процесса
+
+    Хранит отдельные jti (до истечения срока токена) и моменты отзыва
+    по пользователю и по роли: токены, выпущенные не позже этого момента,
+    недействительны. Записи по jti удаляются по мере истечения токенов,
+    записи по пользователю и роли — когда все токены, выпущенные до
+    отзыва, истекли (старше max_lifetime), поэтому набор остается небольшим.
+
+    Отзыв локален для процесса; в остальных воркерах токен перестанет
+    действовать по истечении срока.
+    """
+
+    def __init__(self, max_lifetime: Optional[float] = None):
+        """
+        Args:
+            max_lifetime: Максимальный срок действия access-токена,
+                секунды (по умолчанию JWT_ACCESS_TOKEN_EXPIRES)
+        """
+        self._max_lifetime = max_lifetime
+        self._jti: Dict[str, float] = {}
+        # Моменты отзыва с долями секунды, как iat в токене; словари
+        # упорядочены по моменту отзыва, старые записи — в начале
+        self._users: Dict[int, float] = {}
+        self._roles: Dict[int, float] = {}
+
+    @property
+    def max_lifetime(self) -> Optional[float]:
+        """Срок действия токена, секунды (None — токены без exp)"""
+        if self._max_lifetime is None:
+            expires = TokenConfig.JWT_ACCESS_TOKEN_EXPIRES
+            if not expires:
+                return None
+            self._max_lifetime = float(expires)
+        return self._max_lifetime
+
+    def _purge(self, now: float) -> None:
+        expired = [jti for jti, exp in self._jti.items() if exp <= now]
+        for jti in expired:
+            del self._jti[jti]
+
+    def _purge_revoked(self, now: float) -> None:
+        lifetime = self.max_lifetime
+        if lifetime is None:
+            # Токены без exp: отзыв действует до перезапуска процесса
+            return
+        # Токен, выпущенный до cutoff, уже истек сам
+        cutoff = now - lifetime
+        for revoked in (self._users, self._roles):
+            while revoked:
+                key, revoked_at = next(iter(revoked.items()))
+                if revoked_at >= cutoff:
+                    break
+                del revoked[key]
+
+    @staticmethod
+    def _record(revoked: Dict[int, float], key: int, now: float) -> None:
+        # Повторный отзыв переносит запись в конец: порядок — по времени
+        revoked.pop(key, None)
+        revoked[key] = now
+
+    def revoke(self, claims: TokenClaims) -> None:
+        """Отозвать один токен"""
+        now = time.time()
+        self._purge(now)
+        # Токен без exp хранится до перезапуска процесса
+        self._jti[claims.jti] = claims.expires_at or float("inf")
+
+    def revoke_user(self, user_id: int) -> None:
+        """Отозвать все ранее выданные токены пользователя"""
+        now = time.time()
+        self._purge_revoked(now)
+        self._record(self._users, user_id, now)
+
+    def revoke_role(self, role_id: int) -> None:
+        """Отозвать все ранее выданные токены пользователей роли"""
+        now = time.time()
+        self._purge_revoked(now)
+        self._record(self._roles, role_id, now)
+
+    def is_revoked(self, claims: TokenClaims) -> bool:
+        """Проверить, отозван ли токен"""
+        if claims.jti in self._jti:
+            return True
+        self._purge_revoked(time.time())
+        # iat и момент отзыва — с долями секунды: токен, выданный
+        # в ту же секунду до отзыва, со старыми данными не принимается
+        for revoked_at in (
+            self._users.get(claims.user_id),
+            self._roles.get(claims.role_id),
+        ):
+            if revoked_at is not None and claims.issued_at <= revoked_at:
+                return True
+        return False
+
+    def clear(self) -> None:
+        """Забыть все отзывы"""
+        self._jti.clear()
+        self._users.clear()
+        self._roles.clear()
+
+
+class TokenDecoder:
+    """
+    Проверка access-токенов с LRU-кэшем декодированных токенов
+
+    Подпись проверяется один раз на токен; повторные запросы с тем же
+    токеном берут данные из кэша и проверяют только срок действия,
+    версию и отзыв.
+    """
+
+    def __init__(self, version: int = 1, max_size: int = 10000):
+        self.version = version
+        self.max_size = max_size
+        self._cache: "OrderedDict[str, TokenClaims]" = OrderedDict()
+
+    def issue(self, user_id: int, role_id: int, role_name: str) -> str:
+        """
+        Выпустить access-токен с данными пользователя
+
+        Токен подписывается тем же ключом и алгоритмом, что проверяет
+        _decode. iat — с долями секунды (NumericDate это допускает),
+        чтобы отзыв отделял токены, выданные в ту же секунду.
+        """
+        now = time.time()
+        payload = {
+            "sub": str(user_id),
+            "role_id": role_id,
+            "role_name": role_name,
+            "ver": self.version,
+            "type": "access",
+            "jti": uuid.uuid4().hex,
+            "iat": now,
+        }
+        if TokenConfig.JWT_ACCESS_TOKEN_EXPIRES:
+            payload["exp"] = int(now + TokenConfig.JWT_ACCESS_TOKEN_EXPIRES)
+        return jwt.encode(
+            payload,
+            TokenConfig.JWT_SECRET_KEY,
+            algorithm=TokenConfig.JWT_ALGORITHM
+        )
+
+    def _decode(self, token: str) -> TokenClaims:
+        payload = jwt.decode(
+            token,
+            TokenConfig.JWT_SECRET_KEY,
+            algorithms=[TokenConfig.JWT_ALGORITHM],
+            options={"verify_aud": False}
+        )
+        if payload.get("type", "access") != "access":
+            raise jwt.InvalidTokenError("Not an access token")
+        try:
+            return TokenClaims(
+                user_id=int(payload["sub"]),
+                role_id=int(payload["role_id"]),
+                role_name=payload["role_name"],
+                version=int(payload["ver"]),
+                jti=str(payload.get("jti", token)),
+                issued_at=float(payload.get("iat", 0)),
+                expires_at=payload.get("exp")
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise jwt.InvalidTokenError(f"Missing claim: {e}")
+
+    def decode(self, token: str) -> TokenClaims:
+        """
+        Получить данные из токена
+
+        Raises:
+            jwt.InvalidTokenError: Токен поврежден, просрочен или
+                выпущен для другой версии
+        """
+        claims = self._cache.get(token)
+        if claims is None:
+            claims = self._decode(token)
+            self._cache[token] = claims
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(token)
+
+        if claims.expires_at is not None and claims.expires_at <= time.time():
+            self._cache.pop(token, None)
+            raise jwt.ExpiredSignatureError("Token expired")
+        if claims.version != self.version:
+            raise jwt.InvalidTokenError("Token version mismatch")
+        return claims
+
+    def clear(self) -> None:
+        """Очистить кэш декодированных токенов"""
+        self._cache.clear()
+
+
+def set_access_cookie(response: Response, access_token: str) -> None:
+    """Записать access-токен в cookie ответа"""
+    response.set_cookie(
+        key=TokenConfig.JWT_ACCESS_COOKIE_NAME,
+        value=access_token,
+        secure=True,
+        max_age=3600
+    )
+
+
+def get_request_token(request: Request) -> Optional[str]:
+    """Достать токен из мест, указанных в JWT_TOKEN_LOCATION"""
+    locations = TokenConfig.JWT_TOKEN_LOCATION
+    if "headers" in locations:
+        header = request.headers.get(TokenConfig.JWT_HEADER_NAME, "")
+        scheme, _, value = header.partition(" ")
+        if value and scheme.lower() == TokenConfig.JWT_HEADER_TYPE.lower():
+            return value
+    if "cookies" in locations:
+        return request.cookies.get(TokenConfig.JWT_ACCESS_COOKIE_NAME)
+    return None
+
+
+async def current_user(request: Request) -> TokenClaims:
+    """
+    Зависимость FastAPI: пользователь из access-токена без запроса к БД
+
+    Raises:
+        HTTPException: 401, если токена нет, он недействителен или отозван
+    """
+    token = get_request_token(request)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        claims = token_decoder.decode(token)
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if token_revocations.is_revoked(claims):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return claims
+
+
+token_decoder = TokenDecoder(
+    version=TokenConfig.TOKEN_VERSION,
+    max_size=TokenConfig.TOKEN_CACHE_SIZE
+)
+token_revocations = TokenRevocations()
@@ -0,0 +1,7 @@
+"""
+Нагрузочное тестирование и бенчмарки
+
+    python -m benchmarks seed --users 100000
+    python -m benchmarks run --concurrency 50 --requests 2000 \
+        --output report.json --baseline benchmarks/baseline.json
+"""
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from benchmarks.runner import run_benchmark, compare
+from benchmarks.scenarios import select_scenarios, scenario_names
+from benchmarks.seed import seed
+from benchmarks.serialization import run_serialization_benchmark
+from benchmarks.startup import run_startup_benchmark
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Заполнение базы и нагрузочное тестирование API"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Заполнить базу данными")
+    seed_parser.add_argument("--roles", type=int, default=10)
+    seed_parser.add_argument("--users", type=int, default=10000)
+    seed_parser.add_argument("--login-users", type=int, default=20)
+    seed_parser.add_argument("--batch-size", type=int, default=50000)
+    seed_parser.add_argument("--manifest", default="bench_seed.json")
+
+    run_parser = commands.add_parser("run", help="Прогнать сценарии")
+    run_parser.add_argument("--manifest", default="bench_seed.json")
+    run_parser.add_argument(
+        "--base-url",
+        help="Адрес запущенного сервера; без него приложение "
+             "запускается в этом процессе"
+    )
+    run_parser.add_argument("--concurrency", type=int, default=10)
+    run_parser.add_argument("--requests", type=int, default=500,
+                            help="Запросов на сценарий")
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--scenario", action="append",
+                            help="Имя сценария (можно несколько)")
+    run_parser.add_argument("--include-writes", action="store_true")
+    run_parser.add_argument("--include-heavy", action="store_true")
+    run_parser.add_argument(
+        "--login-limit", type=int, default=1_000_000,
+        help="Лимит попыток входа при запуске в этом процессе "
+             "(по умолчанию фактически без ограничения)"
+    )
+    run_parser.add_argument("--output", help="Файл для JSON-отчета")
+    run_parser.add_argument("--baseline", help="Базовый отчет для сравнения")
+    run_parser.add_argument("--tolerance", type=float, default=0.10)
+
+    serialization_parser = commands.add_parser(
+        "serialization",
+        help="Сравнить сборку ответа списка через ORM и из строк (без БД)"
+    )
+    serialization_parser.add_argument("--rows", type=int, default=1000)
+    serialization_parser.add_argument("--iterations", type=int, default=50)
+
+    startup_parser = commands.add_parser(
+        "startup",
+        help="Измерить холодный старт: импорт, lifespan, первый запрос"
+    )
+    startup_parser.add_argument("--runs", type=int, default=5)
+    startup_parser.add_argument("--path", default="/roles/",
+                                help="Путь первого запроса")
+    startup_parser.add_argument("--prewarm", action="store_true",
+                                help="Включить прогрев воркера (PREWARM)")
+
+    commands.add_parser("list", help="Показать сценарии")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "list":
+        for name, flags in scenario_names().items():
+            print(f"{name}  [{flags}]" if flags else name)
+        return 0
+
+    if args.command == "serialization":
+        report = run_serialization_benchmark(args.rows, args.iterations)
+        print(json.dumps(report, indent=2))
+        return 0
+
+    if args.command == "startup":
+        report = run_startup_benchmark(args.runs, args.path, args.prewarm)
+        print(json.dumps(report, indent=2))
+        return 0
+
+    if args.command == "seed":
+        manifest = asyncio.run(seed(
+            roles=args.roles,
+            users=args.users,
+            login_users=args.login_users,
+            batch_size=args.batch_size,
+            manifest_path=args.manifest
+        ))
+        print(
+            f"Добавлено {args.users} пользователей за {manifest['seconds']} с, "
+            f"манифест: {args.manifest}"
+        )
+        return 0
+
+    with open(args.manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    report = asyncio.run(run_benchmark(
+        select_scenarios(args.scenario, args.include_writes, args.include_heavy),
+        manifest,
+        base_url=args.base_url,
+        concurrency=args.concurrency,
+        requests=args.requests,
+        warmup=args.warmup,
+        login_limit=args.login_limit
+    ))
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("Регрессии:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+import asyncio
+import platform
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.scenarios import Scenario
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Перцентиль по отсортированным значениям (линейная интерполяция)"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    """Сводка по одному сценарию (время в миллисекундах)"""
+    values = sorted(latency * 1000 for latency in latencies)
+    total = len(values)
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / total, 3) if total else 0.0,
+        "p50_ms": round(percentile(values, 0.50), 3),
+        "p95_ms": round(percentile(values, 0.95), 3),
+        "p99_ms": round(percentile(values, 0.99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    manifest: dict,
+    concurrency: int,
+    requests: int,
+    warmup: int,
+    rnd: random.Random
+) -> dict:
+    """Прогнать один сценарий на заданной конкурентности"""
+    planned = [scenario.build(manifest, rnd) for _ in range(warmup + requests)]
+    latencies: List[float] = []
+    errors = 0
+
+    async def send(path: str, body) -> bool:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            response = await client.request(scenario.method, path, json=body)
+            await response.aread()
+            failed = response.status_code >= 500 or (
+                scenario.require_success and not response.is_success
+            )
+        except httpx.HTTPError:
+            failed = True
+        latencies.append(time.perf_counter() - start)
+        if failed:
+            errors += 1
+        return not failed
+
+    for path, body in planned[:warmup]:
+        await send(path, body)
+    latencies.clear()
+    errors = 0
+
+    queue = iter(planned[warmup:])
+
+    async def worker():
+        for path, body in queue:
+            await send(path, body)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_benchmark(
+    scenarios: List[Scenario],
+    manifest: dict,
+    base_url: Optional[str] = None,
+    concurrency: int = 10,
+    requests: int = 500,
+    warmup: int = 20,
+    seed: int = 42,
+    login_limit: Optional[int] = None
+) -> dict:
+    """
+    Прогнать сценарии и собрать отчет
+
+    Если base_url не указан, приложение запускается в этом же процессе
+    через ASGITransport (без сети), включая lifespan.
+
+    Args:
+        login_limit: Лимит попыток входа на IP и на имя пользователя
+            на время прогона в этом процессе, чтобы POST /login измерял
+            проверку пароля, а не ответы 429. Для base_url лимиты задаются
+            при запуске сервера (LOGIN_LIMIT_PER_IP, LOGIN_LIMIT_PER_USERNAME)
+
+    Returns:
+        dict: Отчет с параметрами запуска и сводкой по каждому эндпоинту
+    """
+    rnd = random.Random(seed)
+    limits = httpx.Limits(
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency
+    )
+    results: Dict[str, dict] = {}
+
+    async def run_all(client: httpx.AsyncClient):
+        for scenario in scenarios:
+            results[scenario.name] = await run_scenario(
+                client, scenario, manifest, concurrency, requests, warmup, rnd
+            )
+
+    if base_url:
+        async with httpx.AsyncClient(
+            base_url=base_url, limits=limits, timeout=60
+        ) as client:
+            await run_all(client)
+    else:
+        from config import RateLimitConfig
+        from main import app
+
+        limits_before = (
+            RateLimitConfig.LOGIN_LIMIT_PER_IP,
+            RateLimitConfig.LOGIN_LIMIT_PER_USERNAME,
+        )
+        if login_limit is not None:
+            RateLimitConfig.LOGIN_LIMIT_PER_IP = login_limit
+            RateLimitConfig.LOGIN_LIMIT_PER_USERNAME = login_limit
+        try:
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(
+                    transport=transport,
+                    base_url="http://bench",
+                    timeout=60
+                ) as client:
+                    await run_all(client)
+        finally:
+            (
+                RateLimitConfig.LOGIN_LIMIT_PER_IP,
+                RateLimitConfig.LOGIN_LIMIT_PER_USERNAME,
+            ) = limits_before
+
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "target": base_url or "in-process",
+            "concurrency": concurrency,
+            "requests": requests,
+            "warmup": warmup,
+            "login_limit": None if base_url else login_limit,
+            "seeded_users": manifest.get("seeded_users"),
+            "python": platform.python_version(),
+        },
+        "endpoints": results,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.10) -> List[str]:
+    """
+    Сравнить отчет с базовым
+
+    Регрессия — рост p95 или p99 либо падение пропускной способности
+    больше чем на tolerance, либо появление ошибок.
+
+    Returns:
+        List[str]: Описания регрессий (пустой список — регрессий нет)
+    """
+    regressions = []
+    for name, current in report["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if base is None:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if base[key] and current[key] > base[key] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {key} {base[key]} -> {current[key]}"
+                )
+        if (
+            base["throughput_rps"]
+            and current["throughput_rps"]
+            < base["throughput_rps"] * (1 - tolerance)
+        ):
+            regressions.append(
+                f"{name}: throughput_rps {base['throughput_rps']} -> "
+                f"{current['throughput_rps']}"
+            )
+        if current["errors"] > base["errors"]:
+            regressions.append(
+                f"{name}: errors {base['errors']} -> {current['errors']}"
+            )
+    return regressions
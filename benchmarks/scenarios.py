@@ -0,0 +1,145 @@
+import random
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# (путь, JSON-тело) для одного запроса
+Request = Tuple[str, Optional[Any]]
+
+
+class Scenario:
+    """Один эндпоинт под нагрузкой"""
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        build: Callable[[dict, random.Random], Request],
+        writes: bool = False,
+        heavy: bool = False,
+        require_success: bool = False
+    ):
+        self.name = name
+        self.method = method
+        self.build = build
+        # Изменяет данные в базе
+        self.writes = writes
+        # Отдает объем, пропорциональный размеру таблицы
+        self.heavy = heavy
+        # Ошибка — любой ответ кроме 2xx, а не только 5xx (например, 429)
+        self.require_success = require_success
+
+
+def _user_id(manifest: dict, rnd: random.Random) -> int:
+    return rnd.randint(manifest["first_user_id"], manifest["last_user_id"])
+
+
+def _sample(manifest: dict, rnd: random.Random) -> dict:
+    return rnd.choice(manifest["samples"])
+
+
+def _role(manifest: dict, rnd: random.Random) -> dict:
+    return rnd.choice(manifest["roles"])
+
+
+def _new_user(manifest: dict, rnd: random.Random) -> dict:
+    n = rnd.randrange(10 ** 9)
+    return {
+        "full_name": "Bench Created User",
+        "phone_number": f"+9{n:010d}",
+        "email": f"created{n}@bench.example.com",
+        "description": "Создан бенчмарком",
+        "role_id": _role(manifest, rnd)["role_id"],
+    }
+
+
+def _credentials(manifest: dict, rnd: random.Random) -> dict:
+    if not manifest["credentials"]:
+        return {"username": "missing", "password": "missing"}
+    return rnd.choice(manifest["credentials"])
+
+
+SCENARIOS: List[Scenario] = [
+    # users_router
+    Scenario("GET /users/", "GET",
+             lambda m, r: ("/users/?limit=100", None)),
+    Scenario("GET /users/ (deep offset)", "GET",
+             lambda m, r: (f"/users/?skip={r.randint(0, m['seeded_users'])}"
+                           "&limit=100", None)),
+    Scenario("GET /users/{user_id}", "GET",
+             lambda m, r: (f"/users/{_user_id(m, r)}", None)),
+    Scenario("GET /users/email/{email}", "GET",
+             lambda m, r: (f"/users/email/{_sample(m, r)['email']}", None)),
+    Scenario("GET /users/phone/{phone_number}", "GET",
+             lambda m, r: (f"/users/phone/{_sample(m, r)['phone_number']}", None)),
+    Scenario("POST /users/batch-get", "POST",
+             lambda m, r: ("/users/batch-get",
+                           {"ids": [_user_id(m, r) for _ in range(100)]})),
+    Scenario("GET /users/by-role/{role_id}", "GET",
+             lambda m, r: (f"/users/by-role/{_role(m, r)['role_id']}", None),
+             heavy=True),
+    Scenario("GET /users/by-role-name/{role_name}", "GET",
+             lambda m, r: (f"/users/by-role-name/{_role(m, r)['role_name']}",
+                           None),
+             heavy=True),
+    Scenario("GET /users/export", "GET",
+             lambda m, r: ("/users/export", None),
+             heavy=True),
+    Scenario("POST /users/", "POST",
+             lambda m, r: ("/users/", _new_user(m, r)),
+             writes=True),
+    Scenario("PUT /users/{user_id}", "PUT",
+             lambda m, r: (f"/users/{_user_id(m, r)}",
+                           {"description": f"Обновлено {r.random()}"}),
+             writes=True),
+    Scenario("PATCH /users/{user_id}/role", "PATCH",
+             lambda m, r: (f"/users/{_user_id(m, r)}/role"
+                           f"?new_role_id={_role(m, r)['role_id']}", None),
+             writes=True),
+    # roles_router
+    Scenario("GET /roles/", "GET",
+             lambda m, r: ("/roles/", None)),
+    Scenario("GET /roles/{role_id}", "GET",
+             lambda m, r: (f"/roles/{_role(m, r)['role_id']}", None)),
+    # login_router
+    Scenario("POST /login", "POST",
+             lambda m, r: ("/login", _credentials(m, r)),
+             require_success=True),
+    # oauth_google_router
+    Scenario("GET /auth/google/url", "GET",
+             lambda m, r: ("/auth/google/url", None)),
+    # system_router
+    Scenario("GET /system/db-pool", "GET",
+             lambda m, r: ("/system/db-pool", None)),
+    Scenario("GET /metrics", "GET",
+             lambda m, r: ("/metrics", None)),
+]
+
+
+def select_scenarios(
+    names: Optional[List[str]] = None,
+    include_writes: bool = False,
+    include_heavy: bool = False
+) -> List[Scenario]:
+    """Отобрать сценарии по имени и типу"""
+    selected = []
+    for scenario in SCENARIOS:
+        if names:
+            if scenario.name in names:
+                selected.append(scenario)
+            continue
+        if scenario.writes and not include_writes:
+            continue
+        if scenario.heavy and not include_heavy:
+            continue
+        selected.append(scenario)
+    return selected
+
+
+def scenario_names() -> Dict[str, str]:
+    """Имена сценариев с пометками для справки CLI"""
+    return {
+        scenario.name: ", ".join(
+            flag for flag, on in (("writes", scenario.writes),
+                                  ("heavy", scenario.heavy)) if on
+        )
+        for scenario in SCENARIOS
+    }
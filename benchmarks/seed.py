@@ -0,0 +1,130 @@
+import json
+import time
+from datetime import datetime, timezone
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import text
+
+from database import create_tables, get_engine
+from passwords import password_hasher
+
+USER_COLUMNS = (
+    "full_name", "phone_number", "email", "description",
+    "role_id", "created_at", "updated_at",
+)
+
+
+def _user_records(
+    start: int,
+    count: int,
+    role_ids: List[int],
+    now: datetime
+) -> Iterator[Tuple]:
+    for n in range(start, start + count):
+        yield (
+            f"Bench User{n} Testov",
+            f"+7{n:010d}",
+            f"user{n}@bench.example.com",
+            f"Пользователь для нагрузочного теста #{n}",
+            role_ids[n % len(role_ids)],
+            now,
+            now,
+        )
+
+
+async def seed(
+    roles: int = 10,
+    users: int = 10000,
+    login_users: int = 20,
+    batch_size: int = 50000,
+    manifest_path: str = "bench_seed.json"
+) -> dict:
+    """
+    Заполнить базу ролями и пользователями для бенчмарков
+
+    Только PostgreSQL: используется COPY соединения asyncpg.
+
+    Пользователи загружаются через COPY пачками по batch_size, поэтому
+    миллионы строк грузятся за минуты. Повторный запуск добавляет новых
+    пользователей с непересекающимися email и телефонами. Первым
+    login_users пользователям назначаются логин и пароль для /login.
+
+    Returns:
+        dict: Манифест (диапазон ID, роли, учетные данные), который
+        также сохраняется в manifest_path для run
+    """
+    started = time.perf_counter()
+    await create_tables()
+
+    async with get_engine().connect() as conn:
+        raw = await conn.get_raw_connection()
+        pg = raw.driver_connection
+
+        await pg.executemany(
+            "INSERT INTO roles (role_name) VALUES ($1) "
+            "ON CONFLICT (role_name) DO NOTHING",
+            [(f"bench_role_{i}",) for i in range(roles)]
+        )
+        role_rows = await pg.fetch(
+            "SELECT role_id, role_name FROM roles "
+            "WHERE role_name LIKE 'bench_role_%' ORDER BY role_id"
+        )
+        role_ids = [row["role_id"] for row in role_rows]
+
+        start = await pg.fetchval(
+            "SELECT coalesce(max(user_id), 0) + 1 FROM users"
+        )
+        now = datetime.now(timezone.utc)
+        for offset in range(0, users, batch_size):
+            count = min(batch_size, users - offset)
+            await pg.copy_records_to_table(
+                "users",
+                records=_user_records(start + offset, count, role_ids, now),
+                columns=USER_COLUMNS
+            )
+
+        id_range = await pg.fetchrow(
+            "SELECT min(user_id) AS first, max(user_id) AS last FROM users "
+            "WHERE email LIKE '%@bench.example.com'"
+        )
+
+        # Образцы для запросов по email и телефону
+        samples = await pg.fetch(
+            "SELECT user_id, email, phone_number FROM users "
+            "WHERE email LIKE '%@bench.example.com' "
+            "ORDER BY random() LIMIT 1000"
+        )
+
+        credentials = []
+        login_ids = await pg.fetch(
+            "SELECT user_id FROM users WHERE email LIKE '%@bench.example.com' "
+            "AND login IS NULL ORDER BY user_id LIMIT $1",
+            login_users
+        )
+        for row in login_ids:
+            login = f"bench{row['user_id']}"
+            password = f"bench-password-{row['user_id']}"
+            await pg.execute(
+                "UPDATE users SET login = $1, password = $2 WHERE user_id = $3",
+                login,
+                await password_hasher.hash(password),
+                row["user_id"]
+            )
+            credentials.append({"username": login, "password": password})
+
+        await conn.execute(text("ANALYZE roles"))
+        await conn.execute(text("ANALYZE users"))
+        await conn.commit()
+
+    manifest = {
+        "roles": [dict(row) for row in role_rows],
+        "first_user_id": id_range["first"],
+        "last_user_id": id_range["last"],
+        "samples": [dict(row) for row in samples],
+        "credentials": credentials,
+        "seeded_users": users,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
@@ -0,0 +1,89 @@
+import json
+import time
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+from models import RoleModel, UserModel
+from schemas import UserListWithRoles, UserWithRoleResponse
+from serialization import JSONBytesResponse, user_row_to_dict
+
+
+class _Row:
+    """Заменитель строки SQLAlchemy с атрибутом _mapping"""
+
+    def __init__(self, mapping: dict):
+        self._mapping = mapping
+
+
+def _make_data(rows: int):
+    now = datetime.now(timezone.utc)
+    role = RoleModel(role_id=1, role_name="customer")
+    users, raw_rows = [], []
+    for n in range(rows):
+        values = {
+            "user_id": n + 1,
+            "full_name": f"Bench User{n} Testov",
+            "phone_number": f"+7{n:010d}",
+            "email": f"user{n}@bench.example.com",
+            "description": "Пользователь для бенчмарка",
+            "role_id": 1,
+            "created_at": now,
+            "updated_at": now,
+        }
+        user = UserModel(**values)
+        user.role = role
+        users.append(user)
+        raw_rows.append(_Row({**values, "role_name": role.role_name}))
+    return users, raw_rows
+
+
+def _orm_path(users) -> bytes:
+    # Как было: model_validate в обработчике, затем повторная валидация
+    # response_model и jsonable_encoder внутри FastAPI
+    result = UserListWithRoles(
+        users=[
+            UserWithRoleResponse.model_validate(user, from_attributes=True)
+            for user in users
+        ],
+        total=len(users)
+    )
+    validated = UserListWithRoles.model_validate(result, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def _row_path(raw_rows) -> bytes:
+    return JSONBytesResponse({
+        "users": [user_row_to_dict(row) for row in raw_rows],
+        "total": len(raw_rows),
+        "next_cursor": None,
+    }).body
+
+
+def run_serialization_benchmark(rows: int = 1000, iterations: int = 50) -> dict:
+    """
+    Сравнить сборку ответа GET /users/ через ORM + pydantic и из строк + orjson
+
+    Работает без базы данных: измеряется только CPU на построение
+    и сериализацию ответа (загрузка ORM-объектов сессией не учитывается,
+    поэтому реальный выигрыш больше).
+    """
+    users, raw_rows = _make_data(rows)
+    timings = {}
+    for name, func, data in (
+        ("orm_pydantic", _orm_path, users),
+        ("rows_orjson", _row_path, raw_rows),
+    ):
+        func(data)  # прогрев
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func(data)
+        timings[name] = (time.perf_counter() - start) / iterations * 1000
+
+    return {
+        "rows": rows,
+        "iterations": iterations,
+        "orm_pydantic_ms": round(timings["orm_pydantic"], 3),
+        "rows_orjson_ms": round(timings["rows_orjson"], 3),
+        "speedup": round(timings["orm_pydantic"] / timings["rows_orjson"], 2),
+    }
@@ -0,0 +1,95 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Режим дочернего процесса: python -m benchmarks.startup <path>
+# Измерения в нем начинаются до импорта приложения
+
+
+def _measure_child(path: str) -> dict:
+    import asyncio
+
+    started = time.perf_counter()
+    from main import app
+    imported = time.perf_counter()
+
+    import httpx
+
+    async def run() -> dict:
+        lifespan_started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            lifespan_done = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench"
+            ) as client:
+                first_started = time.perf_counter()
+                first = await client.get(path)
+                first_done = time.perf_counter()
+                await client.get(path)
+                second_done = time.perf_counter()
+        return {
+            "import_ms": (imported - started) * 1000,
+            "lifespan_ms": (lifespan_done - lifespan_started) * 1000,
+            "first_request_ms": (first_done - first_started) * 1000,
+            "second_request_ms": (second_done - first_done) * 1000,
+            "status": first.status_code,
+        }
+
+    return asyncio.run(run())
+
+
+def run_startup_benchmark(
+    runs: int = 5,
+    path: str = "/roles/",
+    prewarm: bool = False
+) -> dict:
+    """
+    Измерить холодный старт воркера
+
+    Каждый прогон — новый процесс Python: время импорта main,
+    выполнения lifespan, первого и второго запроса к path (через
+    ASGITransport, без сети), а также общее время жизни процесса.
+
+    Returns:
+        dict: Медианы и значения по прогонам, мс
+    """
+    env = dict(os.environ, PREWARM="true" if prewarm else "false")
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", path],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        sample["process_ms"] = (time.perf_counter() - started) * 1000
+        samples.append(sample)
+
+    keys = (
+        "import_ms", "lifespan_ms", "first_request_ms",
+        "second_request_ms", "process_ms",
+    )
+    return {
+        "runs": runs,
+        "path": path,
+        "prewarm": prewarm,
+        "median": {
+            key: round(statistics.median(s[key] for s in samples), 3)
+            for key in keys
+        },
+        "samples": [
+            {key: round(s[key], 3) for key in keys} | {"status": s["status"]}
+            for s in samples
+        ],
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(_measure_child(sys.argv[1] if len(sys.argv) > 1 else "/")))
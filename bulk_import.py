@@ -0,0 +1,220 @@
+import json
+from typing import Any, AsyncIterator, List, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from db_errors import user_constraint_message
+from repository import UserRepository, RoleRepository
+from schemas import UserCreate, BulkUserResult, BulkUserReport
+
+# Размер пачки: одна проверка уникальности и один INSERT на пачку
+BULK_CHUNK_SIZE = 1000
+
+INSERT_ERROR_MESSAGE = "Ошибка создания пользователя. Проверьте уникальность данных."
+
+
+async def iter_ndjson(stream: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Разобрать поток NDJSON построчно, не читая тело запроса целиком
+
+    Пустые строки пропускаются. Строка, которую не удалось разобрать,
+    отдается как исключение ValueError, чтобы попасть в отчет.
+    """
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Некорректный JSON: {e}")
+
+
+async def iter_json_array(items: List[Any]) -> AsyncIterator[Any]:
+    """Отдать элементы JSON-массива тем же интерфейсом, что и NDJSON"""
+    for item in items:
+        yield item
+
+
+async def _iter_chunks(
+    rows: AsyncIterator[Any],
+    size: int
+) -> AsyncIterator[List[Tuple[int, Any]]]:
+    chunk: List[Tuple[int, Any]] = []
+    index = 0
+    async for row in rows:
+        chunk.append((index, row))
+        index += 1
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _error(index: int, message: str) -> BulkUserResult:
+    return BulkUserResult(index=index, status="error", error=message)
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Ошибки валидации строки, каждая с путем к полю (loc)"""
+    messages = []
+    for err in error.errors():
+        loc = ".".join(str(part) for part in err["loc"])
+        messages.append(f"{loc}: {err['msg']}" if loc else err["msg"])
+    return "; ".join(messages)
+
+
+async def _insert_rows(
+    repo: UserRepository,
+    rows: List[Tuple[int, UserCreate]]
+) -> dict:
+    """
+    Вставить строки по одной после отката пачки
+
+    Возвращает результат для каждой строки: нарушившие ограничение
+    получают ошибку с причиной, остальные создаются.
+    """
+    results: dict = {}
+    for index, user in rows:
+        try:
+            user_ids = await repo.bulk_create([user])
+        except IntegrityError as e:
+            await repo.session.rollback()
+            results[index] = _error(
+                index, user_constraint_message(e, INSERT_ERROR_MESSAGE)
+            )
+        else:
+            results[index] = BulkUserResult(
+                index=index, status="created", user_id=user_ids[0]
+            )
+    return results
+
+
+async def _import_chunk(
+    repo: UserRepository,
+    role_repo: RoleRepository,
+    chunk: List[Tuple[int, Any]],
+    seen_emails: set,
+    seen_phones: set
+) -> List[BulkUserResult]:
+    results: dict = {}
+    valid: List[Tuple[int, UserCreate]] = []
+
+    # Валидация схемой UserCreate
+    for index, row in chunk:
+        if isinstance(row, Exception):
+            results[index] = _error(index, str(row))
+            continue
+        try:
+            valid.append((index, UserCreate.model_validate(row)))
+        except ValidationError as e:
+            results[index] = _error(index, _validation_message(e))
+
+    # Проверки существования и уникальности — по одному запросу на пачку
+    existing_roles = await role_repo.get_existing_ids(u.role_id for _, u in valid)
+    taken_emails = await repo.get_existing_emails(u.email for _, u in valid)
+    taken_phones = await repo.get_existing_phones(
+        u.phone_number for _, u in valid
+    )
+
+    # Значения строки попадают в seen_* только после успешной вставки:
+    # откаченная строка не должна отклонять следующие строки как дубликаты
+    chunk_emails: Set[str] = set()
+    chunk_phones: Set[str] = set()
+    to_insert: List[Tuple[int, UserCreate]] = []
+    for index, user in valid:
+        if user.role_id not in existing_roles:
+            results[index] = _error(index, "Указанная роль не существует")
+        elif (
+            user.email in taken_emails
+            or user.email in seen_emails
+            or user.email in chunk_emails
+        ):
+            results[index] = _error(
+                index, "Пользователь с таким email уже существует"
+            )
+        elif (
+            user.phone_number in taken_phones
+            or user.phone_number in seen_phones
+            or user.phone_number in chunk_phones
+        ):
+            results[index] = _error(
+                index, "Пользователь с таким номером телефона уже существует"
+            )
+        else:
+            chunk_emails.add(user.email)
+            chunk_phones.add(user.phone_number)
+            to_insert.append((index, user))
+
+    try:
+        user_ids = await repo.bulk_create([user for _, user in to_insert])
+    except IntegrityError:
+        # Параллельная запись заняла email или телефон после проверки:
+        # пачка откатывается и вставляется по одной строке, чтобы ошибку
+        # получили только строки, нарушившие ограничение
+        await repo.session.rollback()
+        results.update(await _insert_rows(repo, to_insert))
+    else:
+        for (index, _), user_id in zip(to_insert, user_ids):
+            results[index] = BulkUserResult(
+                index=index, status="created", user_id=user_id
+            )
+
+    for index, user in to_insert:
+        if results[index].status == "created":
+            seen_emails.add(user.email)
+            seen_phones.add(user.phone_number)
+
+    return [results[index] for index, _ in chunk]
+
+
+async def import_users(
+    repo: UserRepository,
+    role_repo: RoleRepository,
+    rows: AsyncIterator[Any],
+    chunk_size: int = BULK_CHUNK_SIZE
+) -> BulkUserReport:
+    """
+    Импортировать пользователей пачками
+
+    Каждая пачка валидируется, проверяется на уникальность набором
+    запросов с IN и вставляется одним multi-row INSERT в собственной
+    транзакции, так что уже вставленные пачки не откатываются при
+    ошибке в последующих. Если INSERT пачки нарушил ограничение
+    (параллельная запись), ее строки вставляются по одной.
+
+    Args:
+        repo: Репозиторий пользователей
+        role_repo: Репозиторий ролей
+        rows: Асинхронный поток сырых строк (dict)
+        chunk_size: Размер пачки
+
+    Returns:
+        BulkUserReport: Отчет с результатом по каждой строке
+    """
+    results: List[BulkUserResult] = []
+    # Дубликаты внутри самого импорта
+    seen_emails: set = set()
+    seen_phones: set = set()
+
+    async for chunk in _iter_chunks(rows, chunk_size):
+        results.extend(
+            await _import_chunk(repo, role_repo, chunk, seen_emails, seen_phones)
+        )
+
+    created = sum(1 for result in results if result.status == "created")
+    return BulkUserReport(
+        created=created,
+        failed=len(results) - created,
+        results=results
+    )
@@ -0,0 +1,101 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Слабый ETag по версии данных
+
+    ETag строится не по телу ответа, а по тому, от чего тело зависит
+    (ID, updated_at, роли), поэтому он слабый: одинаковая версия дает
+    эквивалентный, но не обязательно побайтно одинаковый ответ.
+    """
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    """Дата в формате HTTP (RFC 7231)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match использует слабое сравнение
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def is_conditional(request: Request, last_modified: bool = True) -> bool:
+    """
+    Передан ли в запросе условный заголовок, который можно проверить
+
+    Args:
+        request: Запрос
+        last_modified: Отдает ли эндпоинт Last-Modified; если нет,
+            If-Modified-Since не учитывается (ответ 304 по нему невозможен)
+    """
+    headers = request.headers
+    if "if-none-match" in headers:
+        return True
+    return last_modified and "if-modified-since" in headers
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    Проверить условные заголовки запроса
+
+    If-None-Match имеет приоритет: если он передан, If-Modified-Since
+    не учитывается.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # В HTTP-дате нет долей секунды
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def validator_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> Dict[str, str]:
+    """Заголовки ETag/Last-Modified для ответа"""
+    headers = {
+        "ETag": etag,
+        # Клиент может хранить ответ, но обязан перепроверять его
+        "Cache-Control": "no-cache",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """Ответ 304 с заголовками валидатора"""
+    return Response(status_code=304, headers=headers)
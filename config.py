@@ -1,6 +1,7 @@
 import os
-from authx import AuthX, AuthXConfig
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,6 +14,86 @@ class DatabaseConfig:
     DB_USER = os.getenv("DB_USER")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
     
+    # Профиль движка: dev или prod
+    DB_PROFILE = os.getenv("DB_PROFILE", "dev")
+
+    ENGINE_PROFILES = {
+        "dev": {
+            "echo": True,  # Логирование SQL запросов
+            "pool_pre_ping": True,  # Проверка соединений
+            "pool_recycle": 300,  # Пересоздание соединений каждые 5 минут
+            "pool_size": 5,
+            "max_overflow": 10,
+            "pool_timeout": 30,
+            "statement_cache_size": 100,
+        },
+        "prod": {
+            "echo": False,
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+            "pool_size": 20,
+            "max_overflow": 10,
+            "pool_timeout": 10,
+            "statement_cache_size": 500,
+        },
+    }
+
+    # Переменные окружения, переопределяющие значения профиля
+    ENGINE_OVERRIDES = {
+        "pool_size": ("DB_POOL_SIZE", int),
+        "max_overflow": ("DB_MAX_OVERFLOW", int),
+        "pool_timeout": ("DB_POOL_TIMEOUT", float),
+        "pool_recycle": ("DB_POOL_RECYCLE", int),
+        "statement_cache_size": ("DB_STATEMENT_CACHE_SIZE", int),
+        "echo": ("DB_ECHO", lambda v: v.lower() == "true"),
+    }
+
+    @classmethod
+    def get_engine_options(cls, profile: str = None) -> dict:
+        """
+        Получить параметры create_async_engine для профиля
+
+        Значения профиля можно переопределить переменными окружения
+        из ENGINE_OVERRIDES.
+        """
+        profile = profile or cls.DB_PROFILE
+        if profile not in cls.ENGINE_PROFILES:
+            raise ValueError(f"Неизвестный профиль движка БД: {profile}")
+
+        options = dict(cls.ENGINE_PROFILES[profile])
+        for key, (env_name, cast) in cls.ENGINE_OVERRIDES.items():
+            value = os.getenv(env_name)
+            if value is not None:
+                options[key] = cast(value)
+
+        # Кэш подготовленных выражений asyncpg
+        options["connect_args"] = {
+            "prepared_statement_cache_size": options.pop("statement_cache_size")
+        }
+        return options
+
+    # Создавать схему при старте (create_all). В prod схему ведет Alembic
+    DB_CREATE_SCHEMA_ON_STARTUP = os.getenv(
+        "DB_CREATE_SCHEMA_ON_STARTUP",
+        "true" if DB_PROFILE == "dev" else "false"
+    ).lower() == "true"
+
+    # Реплики только для чтения: полные URL через запятую
+    DB_REPLICA_URLS = os.getenv("DB_REPLICA_URLS", "")
+    # Период проверки доступности реплик, секунды
+    DB_REPLICA_HEALTH_INTERVAL = float(
+        os.getenv("DB_REPLICA_HEALTH_INTERVAL", "5")
+    )
+    # Сколько секунд после записи клиент читает с основной базы (0 — выкл.)
+    DB_READ_YOUR_WRITES_SECONDS = float(
+        os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5")
+    )
+
+    @classmethod
+    def get_replica_urls(cls) -> list:
+        """Получить URL реплик для чтения"""
+        return [url.strip() for url in cls.DB_REPLICA_URLS.split(",") if url.strip()]
+
     @classmethod
     def get_database_url(cls):
         """Получить URL для подключения к базе данных"""
@@ -24,16 +105,138 @@ class DatabaseConfig:
         return f"postgresql://{cls.DB_USER}:{cls.DB_PASSWORD}@{cls.DB_HOST}:{cls.DB_PORT}/{cls.DB_NAME}"
 
 
+class CacheConfig:
+    USER_CACHE_ENABLED = os.getenv("USER_CACHE_ENABLED", "false").lower() == "true"
+    USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+    # Оповещение об изменении ролей: postgres (LISTEN/NOTIFY между
+    # воркерами) или local (один процесс, без соединения LISTEN)
+    ROLE_CACHE_NOTIFIER = os.getenv("ROLE_CACHE_NOTIFIER", "postgres")
+
+
+class PasswordConfig:
+    # Cost factor bcrypt; при изменении пароли перехешируются при входе
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # Размер пула потоков для bcrypt
+    PASSWORD_HASH_WORKERS = int(
+        os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+
+
+class ProfilerConfig:
+    # off, header (по заголовку X-Query-Profile: 1) или always
+    QUERY_PROFILER = os.getenv("QUERY_PROFILER", "off")
+    # Порог медленного запроса, мс
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+    # Добавлять в лог план EXPLAIN для медленных запросов
+    SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+
+
+class TokenConfig:
+    # Ключ и алгоритм подписи access-токенов
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+    JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+    # Срок действия access-токена, секунды (0 — токены без exp)
+    JWT_ACCESS_TOKEN_EXPIRES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRES", "900"))
+    # Где искать токен: cookies и/или headers (через запятую)
+    JWT_TOKEN_LOCATION = [
+        location.strip()
+        for location in os.getenv("JWT_TOKEN_LOCATION", "cookies").split(",")
+        if location.strip()
+    ]
+    JWT_ACCESS_COOKIE_NAME = os.getenv("JWT_ACCESS_COOKIE_NAME", "my_access_token")
+    JWT_HEADER_NAME = "Authorization"
+    JWT_HEADER_TYPE = "Bearer"
+    # Версия формата токенов; увеличение отзывает все выданные токены
+    TOKEN_VERSION = int(os.getenv("TOKEN_VERSION", "1"))
+    # Размер LRU-кэша декодированных токенов
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+
+class RateLimitConfig:
+    # local (в памяти процесса) или postgres (общий для всех воркеров)
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "local")
+    # Окно ограничения попыток входа, секунды
+    LOGIN_RATE_WINDOW = float(os.getenv("LOGIN_RATE_WINDOW", "60"))
+    # Попыток входа за окно на одно имя пользователя и на один IP
+    LOGIN_LIMIT_PER_USERNAME = int(os.getenv("LOGIN_LIMIT_PER_USERNAME", "5"))
+    LOGIN_LIMIT_PER_IP = int(os.getenv("LOGIN_LIMIT_PER_IP", "30"))
+    # Максимум ключей в локальном бэкенде (самые старые вытесняются)
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+
+class JobConfig:
+    # local (в памяти процесса) или postgres (статус виден всем воркерам)
+    JOB_STORE = os.getenv("JOB_STORE", "local")
+    # Сколько часов хранить завершенные задачи в PostgreSQL
+    JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+
+
+class ServerConfig:
+    HOST = os.getenv("HOST", "0.0.0.0")
+    PORT = int(os.getenv("PORT", "8000"))
+    # Количество воркеров (процессов). По умолчанию один: отзыв токенов,
+    # локальные лимитер входа и статус задач хранятся в памяти процесса
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # Keep-alive должен быть больше idle-таймаута балансировщика
+    KEEPALIVE_TIMEOUT = int(os.getenv("KEEPALIVE_TIMEOUT", "65"))
+    # Очередь входящих соединений (listen backlog)
+    BACKLOG = int(os.getenv("BACKLOG", "2048"))
+    # Сколько секунд ждать завершения запросов после SIGTERM
+    GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+    # Максимум одновременных соединений на воркер (503 сверх лимита)
+    LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "0")) or None
+    # IP прокси, которым доверяются X-Forwarded-For/Proto
+    FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+    # Проверять, что схема БД на последней миграции Alembic
+    PREFLIGHT_SCHEMA_CHECK = os.getenv("PREFLIGHT_SCHEMA_CHECK", "true").lower() == "true"
+
+    # Прогревать воркер при старте: соединения пула, кэш ролей, bcrypt
+    PREWARM = os.getenv("PREWARM", "false").lower() == "true"
+
+    # Выставляется запускающим процессом после предварительных проверок;
+    # воркеры наследуют его и не повторяют эту работу в lifespan
+    PREFLIGHT_ENV = "APP_PREFLIGHT_DONE"
+
+    @classmethod
+    def preflight_done(cls) -> bool:
+        """Выполнены ли предварительные проверки запускающим процессом"""
+        return os.getenv(cls.PREFLIGHT_ENV) == "1"
+
+
+class GoogleOAuthConfig:
+    # Адреса Google; для тестов можно указать локальный заменитель
+    REDIRECT_URI = os.getenv(
+        "OAUTH_GOOGLE_REDIRECT_URI", "http://localhost:8000/auth/google"
+    )
+    AUTH_URL = os.getenv(
+        "OAUTH_GOOGLE_AUTH_URL", "https://accounts.google.com/o/oauth2/v2/auth"
+    )
+    TOKEN_URL = os.getenv(
+        "OAUTH_GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token"
+    )
+    JWKS_URL = os.getenv(
+        "OAUTH_GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs"
+    )
+    # Общий HTTP-клиент для обращений к Google
+    HTTP_TIMEOUT = float(os.getenv("OAUTH_HTTP_TIMEOUT", "10"))
+    HTTP_MAX_CONNECTIONS = int(os.getenv("OAUTH_HTTP_MAX_CONNECTIONS", "20"))
+
+    @classmethod
+    def configured(cls) -> bool:
+        """Задан ли клиент Google OAuth (OAUTH_GOOGLE_CLIENT_ID)"""
+        return bool(os.getenv("OAUTH_GOOGLE_CLIENT_ID"))
+
+
 class Settings(BaseSettings):
     OAUTH_GOOGLE_CLIENT_SECRET: str
     OAUTH_GOOGLE_CLIENT_ID: str
 
-settings = Settings()
-
 
-config = AuthXConfig()
-config.JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
-config.JWT_ACCESS_COOKIE_NAME = "my_access_token"
-config.JWT_TOKEN_LOCATION = ["cookies"]
+# Настройки OAuth создаются при первом обращении, а не при импорте:
+# без переменных Google OAuth падает только то, что их использует
 
-security: AuthX = AuthX(config=config)
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Настройки OAuth (создаются при первом обращении)"""
+    return Settings()
@@ -0,0 +1,116 @@
+import time
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class CountMode(str, Enum):
+    """Способ подсчета общего количества записей"""
+    EXACT = "exact"        # SELECT count(*) на каждый запрос
+    CACHED = "cached"      # Точное значение, закэшированное в процессе
+    ESTIMATE = "estimate"  # Оценка планировщика из pg_class.reltuples
+
+
+class TotalCounter:
+    """
+    In-process кэш количества строк в таблицах
+
+    Значение живет ttl секунд. Между пересчетами create/delete
+    репозиториев поправляют его через adjust(), поэтому в пределах
+    одного воркера итог остается точным, а расхождение между
+    воркерами ограничено временем жизни записи.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._values: Dict[str, Tuple[int, float]] = {}
+
+    def get(self, table: str) -> Optional[int]:
+        """Получить закэшированное значение, если оно не устарело"""
+        entry = self._values.get(table)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._values[table]
+            return None
+        return value
+
+    def set(self, table: str, value: int) -> None:
+        """Сохранить значение"""
+        self._values[table] = (value, time.monotonic())
+
+    def adjust(self, table: str, delta: int) -> None:
+        """Поправить закэшированное значение после вставки или удаления"""
+        entry = self._values.get(table)
+        if entry is not None:
+            value, stored_at = entry
+            self._values[table] = (max(value + delta, 0), stored_at)
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Сбросить значение для таблицы (или для всех таблиц)"""
+        if table is None:
+            self._values.clear()
+        else:
+            self._values.pop(table, None)
+
+
+total_counter = TotalCounter()
+
+
+async def count_exact(session: AsyncSession, model) -> int:
+    """Точный подсчет строк средствами базы данных"""
+    query = select(func.count()).select_from(model)
+    result = await session.execute(query)
+    return result.scalar_one()
+
+
+async def count_estimate(session: AsyncSession, model) -> int:
+    """
+    Оценка количества строк по статистике планировщика
+
+    Не читает таблицу вовсе. Если статистика еще не собрана
+    (reltuples < 0), выполняется точный подсчет.
+    """
+    query = text(
+        "SELECT reltuples::bigint FROM pg_class "
+        "WHERE oid = to_regclass(:table_name)"
+    )
+    result = await session.execute(
+        query, {"table_name": model.__tablename__}
+    )
+    estimate = result.scalar_one_or_none()
+    if estimate is None or estimate < 0:
+        return await count_exact(session, model)
+    return estimate
+
+
+async def count_rows(
+    session: AsyncSession,
+    model,
+    mode: CountMode = CountMode.EXACT
+) -> int:
+    """
+    Получить общее количество строк таблицы модели
+
+    Args:
+        session: Сессия базы данных
+        model: SQLAlchemy модель
+        mode: Способ подсчета
+
+    Returns:
+        int: Количество строк (точное или оценочное)
+    """
+    if mode == CountMode.ESTIMATE:
+        return await count_estimate(session, model)
+
+    if mode == CountMode.CACHED:
+        cached = total_counter.get(model.__tablename__)
+        if cached is not None:
+            return cached
+
+    total = await count_exact(session, model)
+    total_counter.set(model.__tablename__, total)
+    return total
@@ -1,44 +1,387 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event, make_url, text
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     create_async_engine,
     async_sessionmaker
 )
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from config import DatabaseConfig
+from metrics import install_query_hooks, registry
 from models import Base
 
-# Создаем асинхронный движок
-engine = create_async_engine(
-    DatabaseConfig.get_database_url(),
-    echo=True,  # Логирование SQL запросов
-    pool_pre_ping=True,  # Проверка соединений
-    pool_recycle=300,  # Пересоздание соединений каждые 5 минут
+logger = logging.getLogger(__name__)
+
+# Cookie, закрепляющая клиента за основной базой после записи
+PRIMARY_PIN_COOKIE = "db_primary_until"
+
+
+class PoolWaitStats:
+    """
+    Статистика ожидания соединения из пула одного движка
+
+    Ожидание учитывается только когда пул исчерпан (занято pool_size +
+    max_overflow соединений) и checkout ждет возврата соединения;
+    создание нового соединения сюда не входит.
+    """
+
+    def __init__(self, role: str, name: str):
+        self.role = role
+        self.name = name
+        self.checkouts = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.histogram = registry.pool_wait_histogram(self.labels)
+
+    @property
+    def labels(self) -> str:
+        """Метки Prometheus этого пула"""
+        return f'role="{self.role}",pool="{self.name}"'
+
+    def record(self, wait: float) -> None:
+        self.waits += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.histogram.observe(wait)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, измеряющий время ожидания свободного соединения"""
+
+    # Задается после создания движка (_create_engine)
+    wait_stats: Optional[PoolWaitStats] = None
+
+    def _must_wait(self) -> bool:
+        # Все соединения открыты и ни одно не свободно
+        return (
+            self._max_overflow > -1
+            and self._overflow >= self._max_overflow
+            and self._pool.empty()
+        )
+
+    def _do_get(self):
+        stats = self.wait_stats
+        if stats is None:
+            return super()._do_get()
+        stats.checkouts += 1
+        if not self._must_wait():
+            # Есть свободное соединение или место для нового
+            return super()._do_get()
+
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            stats.timeouts += 1
+            raise
+        stats.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() заменяет пул новым: статистика сохраняется
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+def _create_engine(url: str, role: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        poolclass=TimedQueuePool,
+        **DatabaseConfig.get_engine_options()
+    )
+    engine.pool.wait_stats = PoolWaitStats(role, name)
+    install_query_hooks(engine)
+    return engine
+
+
+# Движок и фабрика сессий создаются при первом обращении, а не при импорте
+
+@lru_cache(maxsize=None)
+def get_engine() -> AsyncEngine:
+    """Асинхронный движок основной базы"""
+    return _create_engine(DatabaseConfig.get_database_url(), "primary", "primary")
+
+
+@lru_cache(maxsize=None)
+def get_sessionmaker() -> async_sessionmaker:
+    """Фабрика асинхронных сессий основной базы"""
+    return async_sessionmaker(
+        get_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+
+class Replica:
+    """Реплика только для чтения (движок создается при первом обращении)"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._engine: Optional[AsyncEngine] = None
+        self._sessionmaker: Optional[async_sessionmaker] = None
+        self.healthy = True
+
+    @property
+    def name(self) -> str:
+        """Имя реплики в метриках (хост и порт, без учетных данных)"""
+        url = make_url(self.url)
+        return f"{url.host}:{url.port or 5432}"
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self._engine = _create_engine(self.url, "replica", self.name)
+        return self._engine
+
+    @property
+    def sessionmaker(self) -> async_sessionmaker:
+        if self._sessionmaker is None:
+            self._sessionmaker = async_sessionmaker(
+                self.engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+                # Кэши не заполняются данными с реплики, которая может отставать
+                info={"replica": True},
+            )
+        return self._sessionmaker
+
+
+class ReplicaRouter:
+    """
+    Распределение чтений по репликам
+
+    Реплики выбираются по кругу среди доступных. Фоновая задача
+    периодически проверяет каждую реплику запросом SELECT 1; если
+    доступных реплик нет, чтения идут на основную базу.
+    """
+
+    def __init__(self, urls: List[str], health_interval: float = 5.0):
+        self.replicas = [Replica(url) for url in urls]
+        self.health_interval = health_interval
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._task: Optional[asyncio.Task] = None
+
+    def choose(self) -> Optional[Replica]:
+        """Следующая доступная реплика или None"""
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica
+        return None
+
+    async def check(self, replica: Replica) -> None:
+        """Проверить доступность реплики"""
+        try:
+            async with replica.engine.connect() as conn:
+                await asyncio.wait_for(
+                    conn.execute(text("SELECT 1")),
+                    timeout=self.health_interval
+                )
+            healthy = True
+        except Exception as e:
+            logger.warning("Реплика %s недоступна: %s", replica.url, e)
+            healthy = False
+        replica.healthy = healthy
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.gather(*(self.check(r) for r in self.replicas))
+            await asyncio.sleep(self.health_interval)
+
+    async def start(self) -> None:
+        """Запустить проверку доступности реплик"""
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        """Остановить проверку и закрыть соединения реплик"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for replica in self.replicas:
+            if replica._engine is not None:
+                await replica._engine.dispose()
+
+
+replica_router = ReplicaRouter(
+    DatabaseConfig.get_replica_urls(),
+    DatabaseConfig.DB_REPLICA_HEALTH_INTERVAL
 )
 
-# Создаем фабрику асинхронных сессий
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
+
+def get_read_sessionmaker(request: Optional[Request] = None):
+    """
+    Фабрика сессий для чтения
+
+    Возвращает фабрику сессий реплики, кроме случаев, когда реплик
+    нет или клиент недавно писал в основную базу.
+    """
+    if request is not None:
+        pinned_until = request.cookies.get(PRIMARY_PIN_COOKIE)
+        try:
+            if pinned_until and float(pinned_until) > time.time():
+                return get_sessionmaker()
+        except ValueError:
+            pass
+
+    replica = replica_router.choose() if replica_router.replicas else None
+    return replica.sessionmaker if replica else get_sessionmaker()
+
+
+class PrimaryPin:
+    """Флаг запроса: клиент записал в основную базу"""
+
+    __slots__ = ("requested",)
+
+    def __init__(self):
+        self.requested = False
+
+
+current_primary_pin: ContextVar[Optional[PrimaryPin]] = ContextVar(
+    "current_primary_pin", default=None
 )
 
 
+def pin_to_primary() -> None:
+    """Закрепить клиента текущего запроса за основной базой"""
+    pin = current_primary_pin.get()
+    if pin is not None:
+        pin.requested = True
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_after_commit(session) -> None:
+    # Коммит любой сессии основной базы внутри запроса
+    if not session.info.get("replica"):
+        pin_to_primary()
+
+
+def _pin_cookie_header(window: float) -> tuple:
+    response = Response()
+    response.set_cookie(
+        PRIMARY_PIN_COOKIE,
+        str(time.time() + window),
+        max_age=int(window) + 1,
+        httponly=True
+    )
+    return next(h for h in response.raw_headers if h[0] == b"set-cookie")
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware, закрепляющий клиента за основной базой после записи
+
+    Cookie добавляется к любому ответу запроса, в котором был коммит:
+    и к Response, возвращенному эндпоинтом напрямую, и к ответу
+    на HTTPException. Следующие чтения клиента в течение окна
+    DB_READ_YOUR_WRITES_SECONDS идут на основную базу.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        window = DatabaseConfig.DB_READ_YOUR_WRITES_SECONDS
+        if scope["type"] != "http" or not replica_router.replicas or window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        pin = PrimaryPin()
+        token = current_primary_pin.set(pin)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and pin.requested:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    _pin_cookie_header(window)
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_primary_pin.reset(token)
+
+
 async def get_db() -> AsyncSession:
     """Dependency для получения сессии базы данных"""
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         try:
             yield session
         finally:
             await session.close()
 
 
+async def get_read_db(request: Request) -> AsyncSession:
+    """Dependency для получения сессии только для чтения (реплика)"""
+    async with get_read_sessionmaker(request)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def _pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    stats = pool.wait_stats
+    return {
+        "role": stats.role,
+        "pool": stats.name,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": stats.checkouts,
+        "waits": stats.waits,
+        "timeouts": stats.timeouts,
+        "avg_wait_ms": (
+            stats.total_wait / stats.waits * 1000 if stats.waits else 0.0
+        ),
+        "max_wait_ms": stats.max_wait * 1000,
+    }
+
+
+def get_pool_stats() -> dict:
+    """
+    Текущее состояние пулов соединений
+
+    Основная база — на верхнем уровне, реплики (только с уже
+    созданным движком) — в списке replicas.
+    """
+    return {
+        "profile": DatabaseConfig.DB_PROFILE,
+        **_pool_stats(get_engine()),
+        "replicas": [
+            _pool_stats(replica.engine)
+            for replica in replica_router.replicas
+            if replica._engine is not None
+        ],
+    }
+
+
 async def create_tables():
     """Создание всех таблиц"""
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
+        # Нужно для триграммных индексов поиска пользователей
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
 
 
 async def drop_tables():
     """Удаление всех таблиц (для тестов)"""
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+# Сообщения для нарушений ограничений таблицы users.
+# Имена — стандартные имена PostgreSQL для ограничений из models.py
+USER_CONSTRAINT_MESSAGES = {
+    "users_email_key": "Пользователь с таким email уже существует",
+    "users_phone_number_key": "Пользователь с таким номером телефона уже существует",
+    "users_role_id_fkey": "Указанная роль не существует",
+}
+
+
+def get_constraint_name(error: IntegrityError) -> Optional[str]:
+    """
+    Получить имя нарушенного ограничения из ошибки драйвера
+
+    asyncpg передает имя в атрибуте constraint_name исходного
+    исключения, которое SQLAlchemy оборачивает дважды.
+    """
+    orig = error.orig
+    while orig is not None:
+        name = getattr(orig, "constraint_name", None)
+        if name:
+            return name
+        orig = orig.__cause__
+    return None
+
+
+def user_constraint_message(error: IntegrityError, default: str) -> str:
+    """Сообщение для клиента по нарушенному ограничению таблицы users"""
+    return USER_CONSTRAINT_MESSAGES.get(get_constraint_name(error), default)
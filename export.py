@@ -0,0 +1,95 @@
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Sequence
+
+import orjson
+
+# Количество строк, которые склеиваются в один фрагмент ответа
+ROWS_PER_CHUNK = 500
+
+
+class ExportFormat(str, Enum):
+    """Формат выгрузки"""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+RowToDict = Callable[[Any], Dict[str, Any]]
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # UTC-время как "...Z", так же как в JSON-ответах API
+        text = value.isoformat()
+        if text.endswith("+00:00"):
+            return text[:-6] + "Z"
+        return text
+    return value
+
+
+async def iter_ndjson_lines(
+    rows: AsyncIterator[Any],
+    fields: Sequence[str],
+    row_to_dict: Optional[RowToDict] = None
+) -> AsyncIterator[str]:
+    """
+    Сериализовать строки в NDJSON фрагментами по ROWS_PER_CHUNK строк
+
+    Args:
+        row_to_dict: Преобразование строки в объект; по умолчанию
+            плоский словарь из fields
+    """
+    lines = []
+    async for row in rows:
+        data = row_to_dict(row) if row_to_dict else dict(zip(fields, row))
+        # Те же опции orjson, что и у JSONBytesResponse
+        lines.append(orjson.dumps(data, option=orjson.OPT_UTC_Z).decode())
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def iter_csv_lines(
+    rows: AsyncIterator[Any],
+    fields: Sequence[str]
+) -> AsyncIterator[str]:
+    """Сериализовать строки в CSV (с заголовком) фрагментами по ROWS_PER_CHUNK строк"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    written = 0
+    async for row in rows:
+        writer.writerow([_plain(value) for value in row])
+        written += 1
+        if written >= ROWS_PER_CHUNK:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            written = 0
+    yield buffer.getvalue()
+
+
+def iter_export(
+    rows: AsyncIterator[Any],
+    fields: Sequence[str],
+    export_format: ExportFormat,
+    row_to_dict: Optional[RowToDict] = None
+) -> AsyncIterator[str]:
+    """
+    Выбрать сериализатор для формата выгрузки
+
+    row_to_dict используется только для NDJSON: CSV всегда плоский
+    """
+    if export_format == ExportFormat.CSV:
+        return iter_csv_lines(rows, fields)
+    return iter_ndjson_lines(rows, fields, row_to_dict)
@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+import asyncpg
+from sqlalchemy.exc import IntegrityError
+
+from config import ServerConfig
+from db_errors import user_constraint_message
+
+logger = logging.getLogger(__name__)
+
+# Сообщение об ошибке задачи для клиента: подробности (SQL, параметры)
+# пишутся только в лог сервера
+JOB_FAILED_MESSAGE = "Ошибка массовой операции"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, IntegrityError):
+        return user_constraint_message(error, JOB_FAILED_MESSAGE)
+    return JOB_FAILED_MESSAGE
+
+
+@dataclass
+class Job:
+    """Фоновая задача массовой операции"""
+    kind: str
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "pending"
+    affected: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=_now)
+    finished_at: Optional[datetime] = None
+
+    def progress(self, affected: int) -> None:
+        """Добавить количество затронутых строк (вызывается после каждой пачки)"""
+        self.affected += affected
+
+
+class LocalJobStore:
+    """
+    Состояние задач в памяти процесса
+
+    Используется по умолчанию и в тестах: статус задачи виден только
+    воркеру, который ее запустил. Хранит не больше max_jobs последних
+    задач (незавершенные не вытесняются).
+    """
+
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    async def save(self, job: Job) -> None:
+        """Записать состояние задачи"""
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.finished_at is None:
+                break
+            self._jobs.popitem(last=False)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Получить задачу по ID"""
+        return self._jobs.get(job_id)
+
+    async def start(self) -> None:
+        """Подготовить хранилище"""
+
+    async def stop(self) -> None:
+        """Освободить ресурсы"""
+
+    def clear(self) -> None:
+        """Забыть все задачи"""
+        self._jobs.clear()
+
+
+class PostgresJobStore(LocalJobStore):
+    """
+    Состояние задач в UNLOGGED-таблице PostgreSQL, общее для воркеров
+
+    Статус задачи можно запросить у любого воркера. Запись — один
+    INSERT ... ON CONFLICT DO UPDATE; завершенные задачи старше
+    retention удаляются при запуске новой задачи. Таблица не пишется
+    в WAL и очищается после сбоя сервера, как и сами задачи.
+    """
+
+    table = "bulk_jobs"
+
+    def __init__(
+        self,
+        dsn: str,
+        retention: timedelta = timedelta(days=1),
+        pool_size: int = 2
+    ):
+        super().__init__()
+        self.dsn = dsn
+        self.retention = retention
+        self.pool_size = pool_size
+        self._pool: Optional[asyncpg.Pool] = None
+
+    def _create_table_sql(self) -> str:
+        return (
+            f"CREATE UNLOGGED TABLE IF NOT EXISTS {self.table} ("
+            " job_id text PRIMARY KEY,"
+            " kind text NOT NULL,"
+            " status text NOT NULL,"
+            " affected bigint NOT NULL DEFAULT 0,"
+            " error text,"
+            " created_at timestamptz NOT NULL,"
+            " finished_at timestamptz)"
+        )
+
+    async def create_table(self) -> None:
+        """Создать таблицу задач (один раз перед запуском воркеров)"""
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            await connection.execute(self._create_table_sql())
+        finally:
+            await connection.close()
+
+    async def start(self) -> None:
+        self._pool = await asyncpg.create_pool(
+            self.dsn, min_size=1, max_size=self.pool_size
+        )
+        if not ServerConfig.preflight_done():
+            await self._pool.execute(self._create_table_sql())
+
+    async def stop(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def save(self, job: Job) -> None:
+        t = self.table
+        if job.status == "pending":
+            await self._pool.execute(
+                f"DELETE FROM {t} WHERE finished_at < $1",
+                _now() - self.retention
+            )
+        await self._pool.execute(
+            f"INSERT INTO {t} AS j "
+            "(job_id, kind, status, affected, error, created_at, finished_at) "
+            "VALUES ($1, $2, $3, $4, $5, $6, $7) "
+            "ON CONFLICT (job_id) DO UPDATE SET "
+            " status = EXCLUDED.status,"
+            " affected = EXCLUDED.affected,"
+            " error = EXCLUDED.error,"
+            " finished_at = EXCLUDED.finished_at",
+            job.job_id, job.kind, job.status, job.affected,
+            job.error, job.created_at, job.finished_at
+        )
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        row = await self._pool.fetchrow(
+            f"SELECT job_id, kind, status, affected, error, created_at, "
+            f"finished_at FROM {self.table} WHERE job_id = $1",
+            job_id
+        )
+        return Job(**dict(row)) if row else None
+
+    def clear(self) -> None:
+        pass
+
+
+class JobRegistry:
+    """
+    Запуск фоновых задач и запись их состояния в хранилище
+
+    Задача выполняется в воркере, который ее запустил; состояние
+    записывается при старте, не чаще раза в progress_interval секунд
+    во время работы и при завершении.
+    """
+
+    def __init__(
+        self,
+        store: Optional[LocalJobStore] = None,
+        progress_interval: float = 1.0
+    ):
+        self.store = store or LocalJobStore()
+        self.progress_interval = progress_interval
+        self._tasks: "dict[str, asyncio.Task]" = {}
+
+    def set_store(self, store: LocalJobStore) -> None:
+        """Заменить хранилище состояния задач (например, на PostgreSQL)"""
+        self.store = store
+
+    async def submit(
+        self,
+        kind: str,
+        run: Callable[[Job], Awaitable[None]]
+    ) -> Job:
+        """
+        Запустить задачу
+
+        Args:
+            kind: Тип задачи (для отображения)
+            run: Корутина-функция, получающая Job для отчета о прогрессе
+
+        Returns:
+            Job: Созданная задача (уже записана в хранилище)
+        """
+        job = Job(kind=kind)
+        await self.store.save(job)
+
+        task = asyncio.create_task(self._run(job, run))
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.job_id, None))
+        return job
+
+    async def _report_progress(self, job: Job) -> None:
+        reported = job.affected
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            if job.affected != reported:
+                reported = job.affected
+                await self.store.save(job)
+
+    async def _run(self, job: Job, run: Callable[[Job], Awaitable[None]]) -> None:
+        job.status = "running"
+        await self.store.save(job)
+        reporter = asyncio.create_task(self._report_progress(job))
+        try:
+            await run(job)
+            job.status = "done"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "cancelled"
+            raise
+        except Exception as e:
+            logger.exception(
+                "Задача %s (%s) завершилась с ошибкой", job.job_id, job.kind
+            )
+            job.status = "failed"
+            job.error = _error_message(e)
+        finally:
+            reporter.cancel()
+            await asyncio.gather(reporter, return_exceptions=True)
+            job.finished_at = _now()
+            await self.store.save(job)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Получить задачу по ID"""
+        return await self.store.get(job_id)
+
+    async def shutdown(self) -> None:
+        """Отменить незавершенные задачи"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+job_registry = JobRegistry()
@@ -1,22 +1,79 @@
 from contextlib import asynccontextmanager
+from datetime import timedelta
 from fastapi import FastAPI
 
-from database import create_tables
-from Routers.users_router import router as users_router, roles_router
+from config import (
+    CacheConfig,
+    DatabaseConfig,
+    GoogleOAuthConfig,
+    JobConfig,
+    RateLimitConfig,
+    ServerConfig
+)
+from database import create_tables, get_engine, replica_router, ReadYourWritesMiddleware
+from jobs import job_registry, PostgresJobStore
+from oauth_google import google_oauth
+from passwords import password_hasher
+from rate_limit import login_limiter, PostgresRateLimitBackend
+from role_cache import role_cache, PostgresRoleNotifier
+from Routers.users_router import router as users_router, roles_router, jobs_router
 from Routers.oauth_google_router import router as oauth_google_router
 from Routers.login_router import router as login_router
+from Routers.system_router import router as system_router, metrics_router
+from metrics import MetricsMiddleware
+from profiler import QueryProfilerMiddleware
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler для управления подключением к БД"""
     # Startup
-    await create_tables()
-    print("TABLES CREATED")
+    # В prod схему создают миграции (alembic upgrade head), а не воркеры.
+    # При запуске через serve.py схема уже подготовлена один раз до воркеров
+    if DatabaseConfig.DB_CREATE_SCHEMA_ON_STARTUP and not ServerConfig.preflight_done():
+        await create_tables()
+        print("TABLES CREATED")
+
+    # Оповещения об изменении ролей между воркерами
+    if CacheConfig.ROLE_CACHE_NOTIFIER == "postgres":
+        role_cache.set_notifier(
+            PostgresRoleNotifier(DatabaseConfig.get_sync_database_url())
+        )
+    await role_cache.notifier.start()
+    # Счетчики попыток входа, общие для всех воркеров
+    if RateLimitConfig.RATE_LIMIT_BACKEND == "postgres":
+        login_limiter.set_backend(
+            PostgresRateLimitBackend(DatabaseConfig.get_sync_database_url())
+        )
+    await login_limiter.backend.start()
+    # Состояние фоновых задач, доступное из любого воркера
+    if JobConfig.JOB_STORE == "postgres":
+        job_registry.set_store(PostgresJobStore(
+            DatabaseConfig.get_sync_database_url(),
+            retention=timedelta(hours=JobConfig.JOB_RETENTION_HOURS)
+        ))
+    await job_registry.store.start()
+    await replica_router.start()
+    # Общий HTTP-клиент для Google OAuth и фоновая загрузка JWKS;
+    # без настроенного клиента запускаются при первом callback
+    if GoogleOAuthConfig.configured():
+        await google_oauth.start()
+
+    if ServerConfig.PREWARM:
+        from warmup import prewarm
+
+        await prewarm()
     
     yield
     
     # Shutdown
+    await job_registry.shutdown()
+    await job_registry.store.stop()
+    await google_oauth.stop()
+    await replica_router.stop()
+    await role_cache.notifier.stop()
+    await login_limiter.backend.stop()
+    password_hasher.shutdown()
     print("APP STOPPED")
 
 
@@ -28,8 +85,14 @@ app = FastAPI(
 )
 app.include_router(users_router)
 app.include_router(roles_router)
+app.include_router(jobs_router)
 app.include_router(oauth_google_router)
 app.include_router(login_router)
+app.include_router(system_router)
+app.include_router(metrics_router)
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(QueryProfilerMiddleware, get_engine=get_engine)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
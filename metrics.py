@@ -0,0 +1,250 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин"""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str = "") -> List[str]:
+        """Строки в текстовом формате Prometheus"""
+        prefix = f"{labels}," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class RequestDbStats:
+    """Запросы к базе в рамках одного HTTP-запроса"""
+    __slots__ = ("queries", "db_time", "slow_threshold", "slow")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        # Порог медленного запроса, секунды; None — медленные не собираются
+        self.slow_threshold: Optional[float] = None
+        # (выражение, параметры, время) для медленных запросов
+        self.slow: List[Tuple[str, Any, float]] = []
+
+
+# Статистика текущего HTTP-запроса; None вне запроса
+current_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar(
+    "current_db_stats", default=None
+)
+
+# Счетчики выполненных выражений (profiler.count_queries) текущего контекста
+current_query_counters: ContextVar[tuple] = ContextVar(
+    "current_query_counters", default=()
+)
+
+
+class RouteMetrics:
+    """Метрики одного маршрута"""
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.responses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    """Хранилище метрик процесса"""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        # Ожидание соединения по пулам (метки пула -> гистограмма)
+        self.pool_wait: Dict[str, Histogram] = {}
+
+    def pool_wait_histogram(self, labels: str) -> Histogram:
+        """Гистограмма ожидания соединения для пула с метками labels"""
+        histogram = self.pool_wait.get(labels)
+        if histogram is None:
+            histogram = self.pool_wait[labels] = Histogram(POOL_WAIT_BUCKETS)
+        return histogram
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        duration: float,
+        db_stats: RequestDbStats
+    ) -> None:
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.latency.observe(duration)
+        metrics.queries.observe(db_stats.queries)
+        metrics.db_time.observe(db_stats.db_time)
+        metrics.responses[status] = metrics.responses.get(status, 0) + 1
+
+    def render(self, pool_stats: Optional[dict] = None) -> str:
+        """Все метрики в текстовом формате Prometheus"""
+        sections = [
+            ("http_request_duration_seconds", "histogram",
+             "Время обработки запроса", "latency"),
+            ("http_request_db_queries", "histogram",
+             "Количество SQL-запросов на HTTP-запрос", "queries"),
+            ("http_request_db_seconds", "histogram",
+             "Время SQL-запросов на HTTP-запрос", "db_time"),
+        ]
+        lines = []
+        for name, kind, help_text, attr in sections:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (method, route), metrics in self.routes.items():
+                labels = f'method="{method}",route="{route}"'
+                lines.extend(getattr(metrics, attr).render(name, labels))
+
+        lines.append("# HELP http_requests_total Количество ответов")
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route), metrics in self.routes.items():
+            for status, count in metrics.responses.items():
+                lines.append(
+                    f'http_requests_total{{method="{method}",route="{route}",'
+                    f'status="{status}"}} {count}'
+                )
+
+        lines.append(
+            "# HELP db_pool_checkout_wait_seconds Ожидание соединения "
+            "из исчерпанного пула"
+        )
+        lines.append("# TYPE db_pool_checkout_wait_seconds histogram")
+        for labels, histogram in self.pool_wait.items():
+            lines.extend(
+                histogram.render("db_pool_checkout_wait_seconds", labels)
+            )
+
+        if pool_stats:
+            pools = [pool_stats, *pool_stats.get("replicas", ())]
+            for key in ("size", "checked_out", "overflow"):
+                name = f"db_pool_{key}"
+                lines.append(f"# TYPE {name} gauge")
+                for pool in pools:
+                    lines.append(
+                        f'{name}{{role="{pool["role"]}",pool="{pool["pool"]}"}} '
+                        f"{pool[key]}"
+                    )
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def install_query_hooks(engine) -> None:
+    """
+    Подключить подсчет SQL-запросов к движку
+
+    Время запроса добавляется к статистике текущего HTTP-запроса
+    из current_db_stats, выражение — к счетчикам из current_query_counters.
+    Это единственные обработчики выполнения запросов: профилировщик
+    использует ту же статистику.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters,
+                               context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters,
+                              context, executemany):
+        for counter in current_query_counters.get():
+            counter.statements.append(statement)
+
+        stats = current_db_stats.get()
+        if stats is None:
+            return
+        elapsed = time.perf_counter() - context._query_start
+        stats.queries += 1
+        stats.db_time += elapsed
+        if (
+            stats.slow_threshold is not None
+            and elapsed >= stats.slow_threshold
+            and not executemany
+        ):
+            stats.slow.append((statement, parameters, elapsed))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware, измеряющий время запроса и работу с базой
+
+    Метка route — шаблон пути маршрута (например, /users/{user_id}),
+    а не фактический путь, чтобы количество рядов метрик не зависело
+    от количества ID.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[Dict[object, str]] = None
+
+    def _route_path(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._route_paths is None:
+            self._route_paths = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._route_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDbStats()
+        token = current_db_stats.set(stats)
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            current_db_stats.reset(token)
+            registry.observe_request(
+                scope["method"],
+                self._route_path(scope),
+                status_holder["status"],
+                duration,
+                stats
+            )
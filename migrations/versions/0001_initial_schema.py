@@ -0,0 +1,58 @@
+"""initial schema
+
+Схема, которую раньше создавал Base.metadata.create_all при старте.
+Для существующей базы выполните `alembic stamp 0001` вместо upgrade.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "roles",
+        sa.Column("role_id", sa.Integer(), nullable=False),
+        sa.Column("role_name", sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint("role_id"),
+        sa.UniqueConstraint("role_name"),
+    )
+    op.create_index("ix_roles_role_id", "roles", ["role_id"])
+
+    op.create_table(
+        "users",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("full_name", sa.String(length=150), nullable=False),
+        sa.Column("phone_number", sa.String(length=20), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("role_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("login", sa.String(), nullable=True),
+        sa.Column("password", sa.String(length=20), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["role_id"], ["roles.role_id"], ondelete="RESTRICT"
+        ),
+        sa.PrimaryKeyConstraint("user_id"),
+        sa.UniqueConstraint("email"),
+        sa.UniqueConstraint("phone_number"),
+        sa.UniqueConstraint("login"),
+        sa.UniqueConstraint("password"),
+    )
+    op.create_index("ix_users_user_id", "users", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_user_id", table_name="users")
+    op.drop_table("users")
+    op.drop_index("ix_roles_role_id", table_name="roles")
+    op.drop_table("roles")
@@ -0,0 +1,32 @@
+"""widen password column for bcrypt hashes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "users", "password",
+        type_=sa.String(length=60),
+        existing_type=sa.String(length=20),
+        existing_nullable=True
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "users", "password",
+        type_=sa.String(length=20),
+        existing_type=sa.String(length=60),
+        existing_nullable=True
+    )
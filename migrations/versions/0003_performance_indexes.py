@@ -0,0 +1,70 @@
+"""performance indexes
+
+Индексы создаются CONCURRENTLY вне транзакции, чтобы не блокировать
+запись в таблицы на рабочей базе.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+TRGM_INDEXES = {
+    "ix_users_full_name_trgm": "full_name",
+    "ix_users_email_trgm": "email",
+    "ix_users_description_trgm": "description",
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        # get_by_role_id и JOIN в get_by_role_name
+        op.create_index(
+            "ix_users_role_id", "users", ["role_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        # Поиск роли по названию без учета регистра
+        op.create_index(
+            "ix_roles_lower_role_name", "roles", [sa.text("lower(role_name)")],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        # Поиск пользователей (GET /users/search)
+        for name, column in TRGM_INDEXES.items():
+            op.create_index(
+                name, "users", [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in TRGM_INDEXES:
+            op.drop_index(
+                name, table_name="users",
+                postgresql_concurrently=True,
+                if_exists=True
+            )
+        op.drop_index(
+            "ix_roles_lower_role_name", table_name="roles",
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+        op.drop_index(
+            "ix_users_role_id", table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -0,0 +1,45 @@
+"""composite index for ordered by-role listings
+
+Индекс (role_id, user_id) отдает пользователей роли уже в порядке
+user_id, что нужно для keyset-пагинации и потоковой выдачи по роли.
+Он же покрывает поиск по role_id, поэтому ix_users_role_id удаляется.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 00:00:00
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_role_id_user_id", "users", ["role_id", "user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index(
+            "ix_users_role_id", table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_role_id", "users", ["role_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index(
+            "ix_users_role_id_user_id", table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -0,0 +1,33 @@
+"""roles.updated_at for Last-Modified of user responses
+
+Ответ GET /users/{user_id} содержит название роли, поэтому его
+Last-Modified учитывает и время изменения роли.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "roles",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now()
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("roles", "updated_at")
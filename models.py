@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -14,10 +14,22 @@ class RoleModel(Base):
 
     role_id = Column(Integer, primary_key=True, index=True)
     role_name = Column(String(50), nullable=False, unique=True)
+    # Название роли входит в ответы о пользователях (Last-Modified)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now()
+    )
 
     # Связь с пользователями
     users = relationship("UserModel", back_populates="role")
 
+    __table_args__ = (
+        # Поиск роли по названию без учета регистра
+        Index("ix_roles_lower_role_name", func.lower(role_name)),
+    )
+
     def __repr__(self):
         return f"<Role(id={self.role_id}, name='{self.role_name}')>"
 
@@ -48,11 +60,33 @@ class UserModel(Base):
         onupdate=func.now()
     )
     login = Column(String(0), unique=True)
-    password = Column(String(20), unique=True) 
+    # bcrypt-хеш, 60 символов
+    password = Column(String(60), unique=True)
 
     # Связь с ролью
     role = relationship("RoleModel", back_populates="users")
 
+    __table_args__ = (
+        # Выборка пользователей роли в порядке user_id без сортировки
+        Index("ix_users_role_id_user_id", "role_id", "user_id"),
+        # Триграммные индексы для поиска (расширение pg_trgm)
+        Index(
+            "ix_users_full_name_trgm", "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_users_email_trgm", "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_users_description_trgm", "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"}
+        ),
+    )
+
     def __repr__(self):
         return f"""
             <User(id={self.user_id}, 
@@ -62,14 +96,22 @@ class UserModel(Base):
         """
 
     def set_password(self, password: str) -> None:
-        """Хеширует пароль перед сохранением"""
+        """
+        Хеширует пароль перед сохранением
+
+        Блокирующий вызов: в async-коде используйте passwords.password_hasher
+        """
         self.password = bcrypt.hashpw(
             password.encode("utf-8"),
             bcrypt.gensalt()
         ).decode("utf-8")
 
     def verify_password(self, password: str) -> bool:
-        """Проверяет соответствие введенного пароля хешу"""
+        """
+        Проверяет соответствие введенного пароля хешу
+
+        Блокирующий вызов: в async-коде используйте passwords.password_hasher
+        """
         return bcrypt.checkpw(
             password.encode("utf-8"),
             self.password.encode("utf-8")
@@ -1,12 +1,28 @@
+import asyncio
+import logging
+import re
+import time
 import urllib.parse
+from typing import Dict, Optional
 
-from config import settings
+import httpx
+import jwt
 
+from config import GoogleOAuthConfig, get_settings
 
-def generate_google_oauth_redirect_uri() -> str:
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+
+
+class GoogleOAuthError(Exception):
+    """Не удалось обменять код или проверить id_token"""
+
+
+def generate_google_oauth_redirect_uri(state: Optional[str] = None) -> str:
     query_params: dict = {
-        "client_id": settings.OAUTH_GOOGLE_CLIENT_ID,
-        "redirect_uri": "http://localhost:8000/auth/google",
+        "client_id": get_settings().OAUTH_GOOGLE_CLIENT_ID,
+        "redirect_uri": GoogleOAuthConfig.REDIRECT_URI,
         "response_type": "code",
         "scope": " ".join([
             "https://www.googleapis.com/auth/drive",
@@ -17,12 +33,252 @@ def generate_google_oauth_redirect_uri() -> str:
         ]),
         # управляем scope, пока не пользователь не отзовет права
         "access_type": "offline"
-        # state: ...
     }
+    if state is not None:
+        query_params["state"] = state
 
     query_string: str = urllib.parse.urlencode(
         query_params,
         quote_via=urllib.parse.quote
     )
-    base_url: str = "https://accounts.google.com/o/oauth2/v2/auth"
+    base_url: str = GoogleOAuthConfig.AUTH_URL
     return f"{base_url}?{query_string}"
+
+
+def parse_max_age(cache_control: str) -> Optional[int]:
+    """Значение max-age из заголовка Cache-Control (0 для no-cache/no-store)"""
+    if re.search(r"\bno-(cache|store)\b", cache_control):
+        return 0
+    match = re.search(r"\bmax-age=(\d+)", cache_control)
+    return int(match.group(1)) if match else None
+
+
+class JWKSCache:
+    """
+    Кэш ключей подписи Google (JWKS) с фоновым обновлением
+
+    Ключи перечитываются в фоне до истечения срока из Cache-Control
+    (max-age), поэтому вход не ждет загрузки ключей. Если в токене
+    неизвестный kid (ключи сменились раньше срока), ключи перечитываются
+    сразу, но не чаще min_refresh_interval. При ошибке загрузки
+    продолжают использоваться прежние ключи.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        min_ttl: float = 60.0,
+        default_ttl: float = 3600.0,
+        retry_interval: float = 30.0,
+        min_refresh_interval: float = 10.0
+    ):
+        self.url = url
+        self.min_ttl = min_ttl
+        self.default_ttl = default_ttl
+        self.retry_interval = retry_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.expires_at = 0.0
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._last_fetch = float("-inf")
+        self._lock = asyncio.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _refreshed_recently(self) -> bool:
+        return time.monotonic() - self._last_fetch < self.min_refresh_interval
+
+    async def refresh(self, force: bool = True) -> None:
+        """
+        Загрузить ключи
+
+        Args:
+            force: Если False, ключи не загружаются, когда их уже загрузили
+                меньше min_refresh_interval назад (в том числе другой
+                вызов, пока этот ждал блокировку)
+
+        Raises:
+            httpx.HTTPError: Ошибка запроса
+            ValueError: Некорректный ответ
+        """
+        async with self._lock:
+            if not force and self._refreshed_recently():
+                return
+            self._last_fetch = time.monotonic()
+            response = await self._client.get(self.url)
+            response.raise_for_status()
+
+            keys = {}
+            for jwk in response.json().get("keys", []):
+                try:
+                    keys[jwk["kid"]] = jwt.PyJWK(jwk)
+                except (KeyError, jwt.PyJWKError):
+                    logger.warning("Пропущен некорректный ключ JWKS: %s", jwk)
+            self._keys = keys
+
+            max_age = parse_max_age(response.headers.get("cache-control", ""))
+            ttl = self.default_ttl if max_age is None else max(max_age, self.min_ttl)
+            self.expires_at = time.monotonic() + ttl
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+                # Обновляем заранее, до истечения срока кэша
+                delay = max(
+                    (self.expires_at - time.monotonic()) * 0.9, self.min_ttl
+                )
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("Не удалось загрузить JWKS %s: %s", self.url, e)
+                delay = self.retry_interval
+            await asyncio.sleep(delay)
+
+    async def start(self, client: httpx.AsyncClient) -> None:
+        """Запустить фоновую загрузку ключей"""
+        self._client = client
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Остановить фоновую загрузку"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def get_key(self, kid: str) -> Optional[jwt.PyJWK]:
+        """Получить ключ по kid"""
+        key = self._keys.get(kid)
+        # Проверка без блокировки только отсекает лишнее ожидание;
+        # окончательно интервал проверяется в refresh под блокировкой
+        if key is None and not self._refreshed_recently():
+            try:
+                await self.refresh(force=False)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("Не удалось загрузить JWKS %s: %s", self.url, e)
+            key = self._keys.get(kid)
+        return key
+
+
+class GoogleOAuthClient:
+    """
+    Обмен кода авторизации Google и проверка id_token
+
+    Все запросы к Google идут через один httpx.AsyncClient с пулом
+    соединений. Клиент создается в lifespan (start), если Google OAuth
+    настроен, иначе — при первом callback (ensure_started), и
+    закрывается при остановке (stop).
+    """
+
+    def __init__(
+        self,
+        token_url: str,
+        jwks_url: str,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.token_url = token_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.jwks = JWKSCache(jwks_url)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._start_lock = asyncio.Lock()
+
+    def set_transport(self, transport: Optional[httpx.AsyncBaseTransport]) -> None:
+        """
+        Заменить транспорт (например, на заменитель Google в тестах); до start
+
+        None возвращает обычный сетевой транспорт.
+        """
+        self._transport = transport
+
+    async def start(self) -> None:
+        """Создать HTTP-клиент и запустить загрузку ключей"""
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            transport=self._transport,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            )
+        )
+        await self.jwks.start(self._client)
+
+    async def ensure_started(self) -> None:
+        """Запустить клиент, если он еще не запущен (первый callback)"""
+        if self._client is None:
+            async with self._start_lock:
+                await self.start()
+
+    async def stop(self) -> None:
+        """Остановить загрузку ключей и закрыть HTTP-клиент"""
+        await self.jwks.stop()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def exchange_code(self, code: str) -> dict:
+        """Обменять код авторизации на токены"""
+        await self.ensure_started()
+        settings = get_settings()
+        try:
+            response = await self._client.post(self.token_url, data={
+                "code": code,
+                "client_id": settings.OAUTH_GOOGLE_CLIENT_ID,
+                "client_secret": settings.OAUTH_GOOGLE_CLIENT_SECRET,
+                "redirect_uri": GoogleOAuthConfig.REDIRECT_URI,
+                "grant_type": "authorization_code",
+            })
+        except httpx.HTTPError as e:
+            raise GoogleOAuthError(f"Token endpoint unavailable: {e}")
+        if response.status_code != 200:
+            raise GoogleOAuthError(f"Code exchange failed: {response.text}")
+        tokens = response.json()
+        if "id_token" not in tokens:
+            raise GoogleOAuthError("No id_token in token response")
+        return tokens
+
+    async def verify_id_token(self, id_token: str) -> dict:
+        """
+        Проверить подпись и claims id_token
+
+        Returns:
+            dict: Claims токена (sub, email, email_verified, ...)
+        """
+        try:
+            kid = jwt.get_unverified_header(id_token).get("kid")
+        except jwt.InvalidTokenError as e:
+            raise GoogleOAuthError(f"Malformed id_token: {e}")
+        key = await self.jwks.get_key(kid) if kid else None
+        if key is None:
+            raise GoogleOAuthError(f"Unknown signing key: {kid}")
+
+        try:
+            claims = jwt.decode(
+                id_token,
+                key.key,
+                algorithms=["RS256"],
+                audience=get_settings().OAUTH_GOOGLE_CLIENT_ID,
+                leeway=30
+            )
+        except jwt.InvalidTokenError as e:
+            raise GoogleOAuthError(f"Invalid id_token: {e}")
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise GoogleOAuthError("Invalid id_token issuer")
+        return claims
+
+    async def authenticate(self, code: str) -> dict:
+        """Обменять код и вернуть проверенные claims id_token"""
+        tokens = await self.exchange_code(code)
+        return await self.verify_id_token(tokens["id_token"])
+
+
+google_oauth = GoogleOAuthClient(
+    token_url=GoogleOAuthConfig.TOKEN_URL,
+    jwks_url=GoogleOAuthConfig.JWKS_URL,
+    timeout=GoogleOAuthConfig.HTTP_TIMEOUT,
+    max_connections=GoogleOAuthConfig.HTTP_MAX_CONNECTIONS
+)
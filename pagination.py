@@ -0,0 +1,47 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+
+class InvalidCursorError(ValueError):
+    """Курсор пагинации поврежден или имеет неверный формат"""
+
+
+def encode_cursor(**keys: Any) -> str:
+    """
+    Упаковать ключи сортировки последней записи страницы в непрозрачный курсор
+
+    Args:
+        **keys: Значения ключей сортировки (например, user_id=42)
+
+    Returns:
+        str: URL-безопасная строка курсора
+    """
+    raw = json.dumps(keys, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *required: str) -> Dict[str, Any]:
+    """
+    Распаковать курсор, полученный от клиента
+
+    Args:
+        cursor: Строка курсора из ответа предыдущей страницы
+        *required: Ключи, которые обязаны присутствовать в курсоре
+
+    Returns:
+        dict: Значения ключей сортировки
+
+    Raises:
+        InvalidCursorError: Если курсор не удается разобрать
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        keys = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorError("Некорректный курсор") from e
+
+    if not isinstance(keys, dict) or any(key not in keys for key in required):
+        raise InvalidCursorError("Некорректный курсор")
+    return keys
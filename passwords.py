@@ -0,0 +1,101 @@
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from config import PasswordConfig
+
+_COST_RE = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+def hash_password_sync(password: str, rounds: int) -> str:
+    """Захешировать пароль bcrypt (блокирующий вызов)"""
+    return bcrypt.hashpw(
+        password.encode("utf-8"),
+        bcrypt.gensalt(rounds=rounds)
+    ).decode("utf-8")
+
+
+def verify_password_sync(password: str, password_hash: str) -> bool:
+    """Проверить пароль по хешу bcrypt (блокирующий вызов)"""
+    try:
+        return bcrypt.checkpw(
+            password.encode("utf-8"),
+            password_hash.encode("utf-8")
+        )
+    except ValueError:
+        # В базе лежит не bcrypt-хеш
+        return False
+
+
+def get_cost(password_hash: str) -> Optional[int]:
+    """Получить cost factor из bcrypt-хеша"""
+    match = _COST_RE.match(password_hash or "")
+    return int(match.group(1)) if match else None
+
+
+class PasswordHasher:
+    """
+    Асинхронное хеширование паролей
+
+    bcrypt освобождает GIL, поэтому вычисления выполняются в отдельном
+    пуле потоков и не блокируют event loop. Количество одновременных
+    вычислений ограничено семафором: при всплеске логинов запросы
+    ждут в event loop, а не копятся в очереди пула.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 4):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Хеш для выравнивания времени ответа, когда пользователь не найден
+        self._dummy_hash: Optional[str] = None
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="bcrypt"
+            )
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    async def hash(self, password: str) -> str:
+        """Захешировать пароль с текущим cost factor"""
+        return await self._run(hash_password_sync, password, self.rounds)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """Проверить пароль по хешу"""
+        return await self._run(verify_password_sync, password, password_hash)
+
+    async def verify_dummy(self, password: str) -> None:
+        """
+        Потратить на проверку столько же времени, сколько на настоящую
+
+        Не дает по времени ответа узнать, существует ли логин.
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash("dummy-password")
+        await self.verify(password, self._dummy_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Проверить, отличается ли cost factor хеша от текущего"""
+        return get_cost(password_hash) != self.rounds
+
+    def shutdown(self) -> None:
+        """Остановить пул потоков"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._semaphore = None
+
+
+password_hasher = PasswordHasher(
+    rounds=PasswordConfig.BCRYPT_ROUNDS,
+    max_workers=PasswordConfig.PASSWORD_HASH_WORKERS
+)
@@ -0,0 +1,159 @@
+import logging
+import os
+
+import asyncpg
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+from config import CacheConfig, DatabaseConfig, JobConfig, RateLimitConfig, ServerConfig
+from database import create_tables, get_engine
+from jobs import PostgresJobStore
+from rate_limit import PostgresRateLimitBackend
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+class PreflightError(RuntimeError):
+    """Предварительная проверка не пройдена, запускать воркеры нельзя"""
+
+
+def get_migration_heads() -> set:
+    """Последние ревизии миграций Alembic"""
+    config = Config(ALEMBIC_INI)
+    config.set_main_option(
+        "script_location",
+        os.path.join(os.path.dirname(ALEMBIC_INI), "migrations")
+    )
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+async def check_schema(connection) -> None:
+    """
+    Проверить, что база на последней миграции
+
+    Raises:
+        PreflightError: Миграции не применены или применены не все
+    """
+    exists = await connection.scalar(text("SELECT to_regclass('alembic_version')"))
+    current = set()
+    if exists is not None:
+        result = await connection.execute(text("SELECT version_num FROM alembic_version"))
+        current = set(result.scalars().all())
+
+    heads = get_migration_heads()
+    if current != heads:
+        raise PreflightError(
+            f"Схема БД не на последней миграции: {sorted(current) or 'нет'}, "
+            f"ожидается {sorted(heads)}. Выполните: alembic upgrade head"
+        )
+
+
+async def check_replicas() -> None:
+    """Проверить доступность реплик (недоступная реплика — не ошибка)"""
+    for url in DatabaseConfig.get_replica_urls():
+        dsn = url.replace("postgresql+asyncpg://", "postgresql://", 1)
+        try:
+            connection = await asyncpg.connect(dsn, timeout=5)
+            await connection.close()
+        except (OSError, asyncpg.PostgresError) as e:
+            logger.warning("Реплика недоступна при старте: %s (%s)", url, e)
+
+
+def check_engine_options() -> None:
+    """
+    Проверить, что движок БД не логирует каждый SQL-запрос
+
+    Профиль dev (по умолчанию для разработки) включает echo: в production
+    это синхронная запись в лог на каждом запросе.
+
+    Raises:
+        PreflightError: В параметрах движка включен echo
+    """
+    if DatabaseConfig.get_engine_options().get("echo"):
+        raise PreflightError(
+            f"Логирование SQL включено (DB_PROFILE={DatabaseConfig.DB_PROFILE}"
+            f"{', DB_ECHO=true' if os.getenv('DB_ECHO') else ''}). "
+            "Для production укажите DB_PROFILE=prod и не включайте DB_ECHO"
+        )
+
+
+def check_workers(workers: int) -> None:
+    """
+    Проверить, что состояние в памяти процесса допускает несколько воркеров
+
+    Локальный лимитер входа считает попытки в каждом воркере отдельно,
+    и лимит фактически умножается на количество воркеров. Отзыв токенов
+    тоже виден только своему воркеру — об этом предупреждает лог.
+
+    Raises:
+        PreflightError: Несколько воркеров с RATE_LIMIT_BACKEND=local,
+            ROLE_CACHE_NOTIFIER=local или JOB_STORE=local
+    """
+    if workers <= 1:
+        return
+    if RateLimitConfig.RATE_LIMIT_BACKEND == "local":
+        raise PreflightError(
+            f"{workers} воркеров с RATE_LIMIT_BACKEND=local: лимит попыток входа "
+            "будет считаться в каждом воркере отдельно. Укажите "
+            "RATE_LIMIT_BACKEND=postgres или запустите один воркер"
+        )
+    if CacheConfig.ROLE_CACHE_NOTIFIER == "local":
+        raise PreflightError(
+            f"{workers} воркеров с ROLE_CACHE_NOTIFIER=local: изменения ролей "
+            "не сбросят кэш ролей в других воркерах. Укажите "
+            "ROLE_CACHE_NOTIFIER=postgres или запустите один воркер"
+        )
+    if JobConfig.JOB_STORE == "local":
+        raise PreflightError(
+            f"{workers} воркеров с JOB_STORE=local: статус фоновой задачи "
+            "(/jobs/{job_id}) будет знать только воркер, который ее запустил. "
+            "Укажите JOB_STORE=postgres или запустите один воркер"
+        )
+    logger.warning(
+        "%d воркеров: отзыв токенов (выход, смена роли) хранится в памяти "
+        "воркера и не виден другим воркерам",
+        workers
+    )
+
+
+async def run_preflight() -> None:
+    """
+    Однократная подготовка перед запуском воркеров
+
+    Проверяет подключение к основной базе и реплик, создает схему
+    (если включено DB_CREATE_SCHEMA_ON_STARTUP) или проверяет, что
+    применены все миграции, и создает служебные таблицы.
+
+    Raises:
+        PreflightError: База не готова к работе приложения
+    """
+    try:
+        if DatabaseConfig.DB_CREATE_SCHEMA_ON_STARTUP:
+            await create_tables()
+            logger.info("Схема БД создана")
+
+        async with get_engine().connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            if (
+                ServerConfig.PREFLIGHT_SCHEMA_CHECK
+                and not DatabaseConfig.DB_CREATE_SCHEMA_ON_STARTUP
+            ):
+                await check_schema(connection)
+
+        if RateLimitConfig.RATE_LIMIT_BACKEND == "postgres":
+            backend = PostgresRateLimitBackend(
+                DatabaseConfig.get_sync_database_url()
+            )
+            await backend.create_table()
+        if JobConfig.JOB_STORE == "postgres":
+            await PostgresJobStore(
+                DatabaseConfig.get_sync_database_url()
+            ).create_table()
+
+        await check_replicas()
+    finally:
+        # Соединения этого процесса воркерам не нужны
+        await get_engine().dispose()
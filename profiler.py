@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple
+
+from config import ProfilerConfig
+from metrics import RequestDbStats, current_db_stats, current_query_counters
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-query-profile"
+
+# Выражения, для которых безопасно выполнять EXPLAIN (без ANALYZE)
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+
+class QueryCounter:
+    """Счетчик SQL-запросов, выполненных в контексте count_queries"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+# Ссылки на фоновые задачи логирования, чтобы их не собрал GC
+_background_tasks: set = set()
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Посчитать SQL-запросы, выполненные внутри блока
+
+    Счетчик хранится в ContextVar, поэтому запросы других задач
+    (параллельных HTTP-запросов) в него не попадают. Запрос к приложению
+    должен выполняться в том же контексте, например через
+    httpx.AsyncClient с ASGITransport.
+    """
+    counter = QueryCounter()
+    token = current_query_counters.set(current_query_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        current_query_counters.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryCounter]:
+    """
+    Проверить в тесте, что блок выполняет не больше max_queries запросов
+
+    Пример:
+        with assert_max_queries(2):
+            await client.get("/users/1")
+    """
+    with count_queries() as counter:
+        yield counter
+    if counter.count > max_queries:
+        statements = "\n".join(
+            f"  {i}. {statement}"
+            for i, statement in enumerate(counter.statements, 1)
+        )
+        raise AssertionError(
+            f"Выполнено {counter.count} SQL-запросов, "
+            f"допустимо не больше {max_queries}:\n{statements}"
+        )
+
+
+async def _explain(engine, statement: str, parameters: Any) -> Optional[str]:
+    if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+        return None
+    try:
+        async with engine.connect() as conn:
+            result = await conn.exec_driver_sql(
+                "EXPLAIN " + statement, parameters
+            )
+            return "\n".join(row[0] for row in result)
+    except Exception as e:
+        return f"EXPLAIN не выполнен: {e}"
+
+
+async def log_slow_queries(
+    engine,
+    slow: List[Tuple[str, Any, float]],
+    path: str
+) -> None:
+    """Записать в лог медленные запросы с параметрами и планом"""
+    for statement, parameters, elapsed in slow:
+        plan = None
+        if ProfilerConfig.SLOW_QUERY_EXPLAIN:
+            plan = await _explain(engine, statement, parameters)
+        logger.warning(
+            "Медленный запрос (%.1f мс) в %s: %s; параметры: %r%s",
+            elapsed * 1000,
+            path,
+            statement,
+            parameters,
+            f"\n{plan}" if plan else ""
+        )
+
+
+class QueryProfilerMiddleware:
+    """
+    ASGI middleware профилировщика SQL-запросов
+
+    Режим задается QUERY_PROFILER: off — выключен, header — включается
+    заголовком запроса X-Query-Profile: 1, always — для всех запросов.
+    В ответ добавляются заголовки X-Query-Count и X-DB-Time (мс).
+
+    Собственных обработчиков событий движка нет: используется
+    статистика запроса из metrics (current_db_stats).
+    """
+
+    def __init__(self, app, get_engine):
+        self.app = app
+        # Функция, а не движок: движок создается при первом обращении
+        self.get_engine = get_engine
+
+    def _enabled(self, scope) -> bool:
+        mode = ProfilerConfig.QUERY_PROFILER
+        if mode == "always":
+            return True
+        if mode == "header":
+            for name, value in scope.get("headers", ()):
+                if name == PROFILE_HEADER.encode() and value in (b"1", b"true"):
+                    return True
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._enabled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # Обычно статистику уже создал MetricsMiddleware
+        stats = current_db_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestDbStats()
+            token = current_db_stats.set(stats)
+        stats.slow_threshold = ProfilerConfig.SLOW_QUERY_MS / 1000
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(stats.queries).encode()))
+                headers.append(
+                    (b"x-db-time", f"{stats.db_time * 1000:.2f}".encode())
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                current_db_stats.reset(token)
+            if stats.slow:
+                task = asyncio.create_task(
+                    log_slow_queries(self.get_engine(), stats.slow, scope["path"])
+                )
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
@@ -0,0 +1,241 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+import asyncpg
+
+from config import RateLimitConfig, ServerConfig
+
+
+def window_start(now: float, window: float) -> float:
+    """Начало фиксированного окна, в которое попадает момент now"""
+    return math.floor(now / window) * window
+
+
+def retry_after(
+    now: float,
+    window: float,
+    limit: int,
+    previous: int,
+    current: int
+) -> Optional[float]:
+    """
+    Проверить попытку по счетчику скользящего окна
+
+    Число попыток за последние window секунд оценивается как
+    current + previous * (доля предыдущего окна, еще попадающая
+    в скользящее окно). Такой счетчик хранит два числа на ключ вместо
+    списка отметок времени.
+
+    Args:
+        now: Текущее время
+        window: Длина окна, секунды
+        limit: Допустимое число попыток за окно
+        previous: Попыток в предыдущем фиксированном окне
+        current: Попыток в текущем фиксированном окне (включая эту)
+
+    Returns:
+        float: Через сколько секунд попытка будет разрешена
+        None: Попытка разрешена
+    """
+    elapsed = now - window_start(now, window)
+    if previous * (window - elapsed) / window + current <= limit:
+        return None
+    # Место, которое должно освободиться под следующую попытку
+    room = max(limit - 1, 0)
+    if current <= room:
+        # Хватит уменьшения вклада предыдущего окна
+        return window * (1 - (room - current) / previous) - elapsed
+    # Ждем перехода текущего окна в предыдущее и уменьшения его вклада
+    return (window - elapsed) + window * (1 - room / current)
+
+
+class RateLimitBackend:
+    """Хранилище счетчиков попыток по ключам"""
+
+    async def hit(self, key: str, now: float, window: float) -> Tuple[int, int]:
+        """
+        Учесть попытку
+
+        Returns:
+            Tuple[int, int]: Попыток в предыдущем и текущем окне
+        """
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        """Подготовить бэкенд"""
+
+    async def stop(self) -> None:
+        """Освободить ресурсы"""
+
+    def clear(self) -> None:
+        """Сбросить все счетчики"""
+
+
+class LocalRateLimitBackend(RateLimitBackend):
+    """
+    Счетчики попыток в памяти процесса
+
+    Используется по умолчанию и в тестах. Число ключей ограничено
+    max_keys: при переполнении вытесняются давно не использованные.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._counters: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    async def hit(self, key: str, now: float, window: float) -> Tuple[int, int]:
+        start = window_start(now, window)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = [start, 0, 0]
+            self._counters[key] = counter
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(key)
+            if counter[0] != start:
+                # Текущее окно стало предыдущим или оба устарели
+                counter[1] = counter[2] if counter[0] == start - window else 0
+                counter[2] = 0
+                counter[0] = start
+        counter[2] += 1
+        return int(counter[1]), int(counter[2])
+
+    def clear(self) -> None:
+        self._counters.clear()
+
+
+class PostgresRateLimitBackend(RateLimitBackend):
+    """
+    Счетчики попыток в UNLOGGED-таблице PostgreSQL, общие для воркеров
+
+    Одна попытка — один INSERT ... ON CONFLICT DO UPDATE. Таблица
+    не пишется в WAL и очищается после сбоя сервера, что для счетчиков
+    попыток допустимо.
+
+    Строки, у которых оба окна устарели, удаляются не чаще раза в окно
+    (в каждом воркере), поэтому перебор случайных имен и IP не растит
+    таблицу без ограничений.
+    """
+
+    table = "rate_limit_counters"
+
+    def __init__(self, dsn: str, pool_size: int = 4):
+        self.dsn = dsn
+        self.pool_size = pool_size
+        self._pool: Optional[asyncpg.Pool] = None
+        self._pruned_at: Optional[float] = None
+
+    def _create_table_sql(self) -> str:
+        return (
+            f"CREATE UNLOGGED TABLE IF NOT EXISTS {self.table} ("
+            " key text PRIMARY KEY,"
+            " window_start double precision NOT NULL,"
+            " previous integer NOT NULL DEFAULT 0,"
+            " current integer NOT NULL DEFAULT 0)"
+        )
+
+    async def create_table(self) -> None:
+        """Создать таблицу счетчиков (один раз перед запуском воркеров)"""
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            await connection.execute(self._create_table_sql())
+        finally:
+            await connection.close()
+
+    async def start(self) -> None:
+        self._pool = await asyncpg.create_pool(
+            self.dsn, min_size=1, max_size=self.pool_size
+        )
+        if not ServerConfig.preflight_done():
+            await self._pool.execute(self._create_table_sql())
+
+    async def stop(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def prune(self, now: float, window: float) -> None:
+        """Удалить счетчики, у которых устарели и текущее, и предыдущее окно"""
+        self._pruned_at = now
+        await self._pool.execute(
+            f"DELETE FROM {self.table} WHERE window_start < $1",
+            window_start(now, window) - window
+        )
+
+    async def hit(self, key: str, now: float, window: float) -> Tuple[int, int]:
+        if self._pruned_at is None or now - self._pruned_at >= window:
+            await self.prune(now, window)
+        start = window_start(now, window)
+        t = self.table
+        row = await self._pool.fetchrow(
+            f"INSERT INTO {t} AS c (key, window_start, previous, current) "
+            "VALUES ($1, $2, 0, 1) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            " previous = CASE"
+            "  WHEN c.window_start = $2 THEN c.previous"
+            "  WHEN c.window_start = $2 - $3 THEN c.current"
+            "  ELSE 0 END,"
+            " current = CASE WHEN c.window_start = $2 THEN c.current + 1 ELSE 1 END,"
+            " window_start = $2 "
+            "RETURNING previous, current",
+            key, start, window
+        )
+        return row["previous"], row["current"]
+
+
+class RateLimiter:
+    """
+    Ограничение частоты попыток по нескольким ключам
+
+    Каждая попытка учитывается по всем ключам (например, имя
+    пользователя и IP); отказ — если превышен лимит хотя бы по одному.
+
+    Отклоненные попытки тоже учитываются (намеренно): пока клиент
+    продолжает перебор, блокировка продлевается и Retry-After растет.
+    Клиент, который ждет указанное время, проходит.
+    """
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        backend: Optional[RateLimitBackend] = None
+    ):
+        self.window = window
+        self.backend = backend or LocalRateLimitBackend()
+
+    def set_backend(self, backend: RateLimitBackend) -> None:
+        """Заменить хранилище счетчиков (например, на PostgreSQL)"""
+        self.backend = backend
+
+    async def check(self, limits: Iterable[Tuple[str, int]]) -> Optional[float]:
+        """
+        Учесть попытку по ключам
+
+        Args:
+            limits: Пары (ключ, допустимое число попыток за окно)
+
+        Returns:
+            float: Через сколько секунд можно повторить попытку
+            None: Попытка разрешена
+        """
+        now = time.time()
+        limits = list(limits)
+        counts = await asyncio.gather(*(
+            self.backend.hit(key, now, self.window) for key, _ in limits
+        ))
+        waits = [
+            retry_after(now, self.window, limit, previous, current)
+            for (_, limit), (previous, current) in zip(limits, counts)
+        ]
+        waits = [wait for wait in waits if wait is not None]
+        return max(waits) if waits else None
+
+
+login_limiter = RateLimiter(
+    window=RateLimitConfig.LOGIN_RATE_WINDOW,
+    backend=LocalRateLimitBackend(RateLimitConfig.RATE_LIMIT_MAX_KEYS)
+)
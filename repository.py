@@ -1,10 +1,26 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from sqlalchemy import select, insert, update, delete, func, or_
+from sqlalchemy.orm import attributes, make_transient_to_detached
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional, Set
 
+from auth import token_revocations
+from counting import CountMode, count_rows, total_counter
 from models import UserModel, RoleModel
-from schemas import UserCreate, UserUpdate, RoleCreate, RoleUpdate
+from passwords import password_hasher
+from role_cache import role_cache
+from user_cache import user_cache
+from search import LIKE_ESCAPE, SearchMode, escape_like
+from schemas import (
+    UserCreate, UserUpdate, RoleCreate, RoleUpdate, UserFilter, UserBulkValues
+)
+
+
+def _column_values(user: UserModel) -> dict:
+    """Значения колонок пользователя для кэша"""
+    return {
+        column.key: getattr(user, column.key)
+        for column in UserModel.__table__.columns
+    }
 
 
 class RoleRepository:
@@ -15,21 +31,15 @@ class RoleRepository:
 
     async def get_all(self) -> List[RoleModel]:
         """Получить все роли"""
-        query = select(RoleModel).order_by(RoleModel.role_id)
-        result = await self.session.execute(query)
-        return result.scalars().all()
+        return await role_cache.get_all(self.session)
 
     async def get_by_id(self, role_id: int) -> Optional[RoleModel]:
         """Получить роль по ID"""
-        query = select(RoleModel).where(RoleModel.role_id == role_id)
-        result = await self.session.execute(query)
-        return result.scalar_one_or_none()
+        return await role_cache.get_by_id(self.session, role_id)
 
     async def get_by_name(self, name: str) -> Optional[RoleModel]:
         """Получить роль по названию"""
-        query = select(RoleModel).where(RoleModel.role_name == name)
-        result = await self.session.execute(query)
-        return result.scalar_one_or_none()
+        return await role_cache.get_by_name(self.session, name)
 
     async def create(self, role_data: RoleCreate) -> RoleModel:
         """Создать новую роль"""
@@ -37,6 +47,8 @@ class RoleRepository:
         self.session.add(role)
         await self.session.commit()
         await self.session.refresh(role)
+        await role_cache.invalidate()
+        total_counter.adjust(RoleModel.__tablename__, 1)
         return role
 
     async def update(
@@ -58,6 +70,9 @@ class RoleRepository:
             )
             await self.session.execute(query)
             await self.session.commit()
+            await role_cache.invalidate()
+            # Название роли записано в токенах ее пользователей
+            token_revocations.revoke_role(role_id)
             return await self.get_by_id(role_id)
         
         return role
@@ -67,13 +82,26 @@ class RoleRepository:
         query = delete(RoleModel).where(RoleModel.role_id == role_id)
         result = await self.session.execute(query)
         await self.session.commit()
+        await role_cache.invalidate()
+        total_counter.adjust(RoleModel.__tablename__, -result.rowcount)
         return result.rowcount > 0
 
-    async def count(self) -> int:
-        """Получить общее количество ролей"""
-        query = select(RoleModel.role_id)
+    async def version(self) -> str:
+        """Версия списка ролей (хеш содержимого кэша ролей)"""
+        return await role_cache.version(self.session)
+
+    async def get_existing_ids(self, role_ids: Iterable[int]) -> Set[int]:
+        """Получить ID существующих ролей из переданного набора одним запросом"""
+        role_ids = set(role_ids)
+        if not role_ids:
+            return set()
+        query = select(RoleModel.role_id).where(RoleModel.role_id.in_(role_ids))
         result = await self.session.execute(query)
-        return len(result.scalars().all())
+        return set(result.scalars().all())
+
+    async def count(self, mode: CountMode = CountMode.EXACT) -> int:
+        """Получить общее количество ролей"""
+        return await count_rows(self.session, RoleModel, mode)
 
 
 class UserRepository:
@@ -82,25 +110,198 @@ class UserRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all(
+    @property
+    def _from_replica(self) -> bool:
+        """Сессия читает с реплики (данные могут отставать)"""
+        return bool(self.session.info.get("replica"))
+
+    async def _attach_roles(self, users: List[UserModel]) -> None:
+        """
+        Подставить пользователям роли из кэша ролей
+
+        Заменяет selectinload(UserModel.role): отдельный запрос
+        к таблице ролей не выполняется.
+        """
+        roles = {}
+        for user in users:
+            if user.role_id not in roles:
+                roles[user.role_id] = await role_cache.get_by_id(
+                    self.session, user.role_id
+                )
+            attributes.set_committed_value(user, "role", roles[user.role_id])
+
+    # Колонки пользователя с названием роли для чтения без ORM-объектов
+    ROW_COLUMNS = (
+        UserModel.user_id,
+        UserModel.full_name,
+        UserModel.phone_number,
+        UserModel.email,
+        UserModel.description,
+        UserModel.role_id,
+        RoleModel.role_name,
+        UserModel.created_at,
+        UserModel.updated_at,
+    )
+
+    def _rows_query(
+        self,
+        role_id: Optional[int] = None,
+        role_name: Optional[str] = None
+    ):
+        """Запрос строк ROW_COLUMNS с фильтром по роли"""
+        query = (
+            select(*self.ROW_COLUMNS)
+            .join(RoleModel, UserModel.role_id == RoleModel.role_id)
+            .order_by(UserModel.user_id)
+        )
+        if role_id is not None:
+            query = query.where(UserModel.role_id == role_id)
+        if role_name is not None:
+            query = query.where(
+                func.lower(RoleModel.role_name) == role_name.lower()
+            )
+        return query
+
+    async def get_rows(
         self,
         skip: int = 0,
         limit: int = 100,
-        include_role: bool = False
-    ) -> List[UserModel]:
-        """Получить всех пользователей с пагинацией"""
+        after_user_id: Optional[int] = None,
+        role_id: Optional[int] = None,
+        role_name: Optional[str] = None
+    ) -> List[Any]:
+        """
+        Получить страницу пользователей строками ROW_COLUMNS
+
+        Роль присоединяется в том же запросе, ORM-объекты не создаются.
+        Если указан after_user_id, используется keyset-пагинация и skip
+        игнорируется: база не перебирает пропущенные строки, а начинает
+        сразу с позиции в индексе первичного ключа.
+
+        Args:
+            skip: Количество записей для пропуска
+            limit: Максимальное количество записей
+            after_user_id: ID последнего пользователя предыдущей страницы
+            role_id: Только пользователи с этой ролью
+            role_name: Только пользователи с ролью с этим названием
+
+        Returns:
+            List[Row]: Строки, отсортированные по user_id
+        """
+        query = self._rows_query(role_id, role_name).limit(limit)
+        if after_user_id is not None:
+            query = query.where(UserModel.user_id > after_user_id)
+        else:
+            query = query.offset(skip)
+
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def search(
+        self,
+        q: str,
+        mode: SearchMode = SearchMode.PREFIX,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Any]:
+        """
+        Найти пользователей по ФИО, email и описанию
+
+        Оба режима используют триграммные GIN-индексы, поэтому время
+        ответа зависит от количества совпадений, а не от размера таблицы.
+
+        Args:
+            q: Строка поиска (не короче MIN_QUERY_LENGTH символов)
+            mode: prefix — совпадение начала, fuzzy — нечеткое совпадение слов
+            limit: Максимальное количество записей
+            offset: Количество записей для пропуска
+
+        Returns:
+            List[Row]: Строки ROW_COLUMNS и rank, по убыванию rank
+        """
+        columns = (UserModel.full_name, UserModel.email, UserModel.description)
+
+        if mode == SearchMode.FUZZY:
+            condition = or_(*(column.op("%>")(q) for column in columns))
+        else:
+            pattern = escape_like(q) + "%"
+            condition = or_(*(
+                column.ilike(pattern, escape=LIKE_ESCAPE) for column in columns
+            ))
+
+        rank = func.greatest(
+            *(func.word_similarity(q, column) for column in columns)
+        ).label("rank")
+
         query = (
-            select(UserModel)
-            .offset(skip)
+            select(*self.ROW_COLUMNS, rank)
+            .join(RoleModel, UserModel.role_id == RoleModel.role_id)
+            .where(condition)
+            .order_by(rank.desc(), UserModel.user_id)
             .limit(limit)
-            .order_by(UserModel.user_id)
+            .offset(offset)
         )
-        
-        if include_role:
-            query = query.options(selectinload(UserModel.role))
-        
         result = await self.session.execute(query)
-        return result.scalars().all()
+        return result.all()
+
+    async def stream_with_roles(
+        self,
+        batch_size: int = 1000,
+        role_id: Optional[int] = None,
+        role_name: Optional[str] = None
+    ) -> AsyncIterator[Any]:
+        """
+        Потоково отдать пользователей с названием роли
+
+        Использует серверный курсор: строки приходят из базы пачками
+        по batch_size, поэтому потребление памяти не зависит от
+        размера таблицы.
+
+        Args:
+            batch_size: Размер пачки серверного курсора
+            role_id: Только пользователи с этой ролью
+            role_name: Только пользователи с ролью с этим названием
+
+        Yields:
+            Row: Строка с колонками ROW_COLUMNS
+        """
+        query = (
+            self._rows_query(role_id, role_name)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(query)
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
+
+    async def _get_one(
+        self,
+        query,
+        cached: Optional[dict],
+        include_role: bool
+    ) -> Optional[UserModel]:
+        """
+        Получить одного пользователя из кэша или из базы
+
+        Попадание в кэш подключается к сессии через merge(load=False)
+        без запроса к базе; результат запроса сохраняется в кэш.
+        """
+        if cached is not None:
+            user = UserModel(**cached)
+            make_transient_to_detached(user)
+            user = await self.session.merge(user, load=False)
+        else:
+            generation = user_cache.generation
+            result = await self.session.execute(query)
+            user = result.scalar_one_or_none()
+            if user and user_cache.enabled and not self._from_replica:
+                user_cache.put(_column_values(user), generation)
+
+        if user and include_role:
+            await self._attach_roles([user])
+        return user
 
     async def get_by_id(
         self,
@@ -119,12 +320,95 @@ class UserRepository:
             None: Если пользователь не существует
         """
         query = select(UserModel).where(UserModel.user_id == user_id)
-        
-        if include_role:
-            query = query.options(selectinload(UserModel.role))
-            
+        cached = user_cache.get(user_id) if user_cache.enabled else None
+        return await self._get_one(query, cached, include_role)
+
+    async def get_version(self, user_id: int) -> Optional[Any]:
+        """
+        Получить версию пользователя для условных запросов
+
+        Читает только updated_at и role_id (или берет их из кэша),
+        не загружая строку целиком.
+
+        Returns:
+            tuple: (updated_at, role_id)
+            None: Если пользователь не существует
+        """
+        cached = user_cache.get(user_id) if user_cache.enabled else None
+        if cached is not None:
+            return (cached["updated_at"], cached["role_id"])
+
+        query = (
+            select(UserModel.updated_at, UserModel.role_id)
+            .where(UserModel.user_id == user_id)
+        )
+        result = await self.session.execute(query)
+        return result.one_or_none()
+
+    async def get_page_versions(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after_user_id: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Получить версии пользователей страницы get_rows с теми же параметрами
+
+        Returns:
+            List[Row]: Строки (user_id, updated_at, role_id) в порядке user_id
+        """
+        query = (
+            select(UserModel.user_id, UserModel.updated_at, UserModel.role_id)
+            .order_by(UserModel.user_id)
+            .limit(limit)
+        )
+        if after_user_id is not None:
+            query = query.where(UserModel.user_id > after_user_id)
+        else:
+            query = query.offset(skip)
+
         result = await self.session.execute(query)
-        return result.scalar_one_or_none()
+        return result.all()
+
+    async def get_many(
+        self,
+        user_ids: List[int],
+        include_role: bool = False
+    ) -> List[UserModel]:
+        """
+        Получить пользователей по списку ID одним запросом
+
+        Args:
+            user_ids: Идентификаторы пользователей
+            include_role: Если True, включает роль пользователя в результат
+
+        Returns:
+            List[UserModel]: Найденные пользователи в порядке user_ids
+            (без повторов); отсутствующие ID пропускаются
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        found = {}
+
+        if user_cache.enabled:
+            for user_id in user_ids:
+                cached = user_cache.get(user_id)
+                if cached is not None:
+                    found[user_id] = await self._get_one(None, cached, False)
+
+        to_load = [user_id for user_id in user_ids if user_id not in found]
+        if to_load:
+            generation = user_cache.generation
+            query = select(UserModel).where(UserModel.user_id.in_(to_load))
+            result = await self.session.execute(query)
+            for user in result.scalars().all():
+                found[user.user_id] = user
+                if user_cache.enabled and not self._from_replica:
+                    user_cache.put(_column_values(user), generation)
+
+        users = [found[user_id] for user_id in user_ids if user_id in found]
+        if include_role:
+            await self._attach_roles(users)
+        return users
 
     async def get_by_email(
         self,
@@ -133,12 +417,8 @@ class UserRepository:
     ) -> Optional[UserModel]:
         """Получить пользователя по email"""
         query = select(UserModel).where(UserModel.email == email)
-        
-        if include_role:
-            query = query.options(selectinload(UserModel.role))
-            
-        result = await self.session.execute(query)
-        return result.scalar_one_or_none()
+        cached = user_cache.get_by_email(email) if user_cache.enabled else None
+        return await self._get_one(query, cached, include_role)
 
     async def get_by_phone(
         self,
@@ -147,52 +427,141 @@ class UserRepository:
     ) -> Optional[UserModel]:
         """Получить пользователя по номеру телефона"""
         query = select(UserModel).where(UserModel.phone_number == phone_number)
-        
-        if include_role:
-            query = query.options(selectinload(UserModel.role))
-            
-        result = await self.session.execute(query)
-        return result.scalar_one_or_none()
-
-    async def create(self, user_data: UserCreate) -> UserModel:
-        """Создать нового пользователя"""
-        user = UserModel(
-            full_name=user_data.full_name,
-            phone_number=user_data.phone_number,
-            email=user_data.email,
-            description=user_data.description,
-            role_id=user_data.role_id
+        cached = (
+            user_cache.get_by_phone(phone_number) if user_cache.enabled else None
         )
-        self.session.add(user)
+        return await self._get_one(query, cached, include_role)
+
+    async def create(
+        self,
+        user_data: UserCreate,
+        include_role: bool = False
+    ) -> UserModel:
+        """
+        Создать нового пользователя одним INSERT ... RETURNING
+
+        Существование роли и уникальность email/телефона проверяет сама
+        база; нарушение ограничения приходит как IntegrityError, имя
+        ограничения разбирается в db_errors.
+
+        Raises:
+            IntegrityError: Если нарушено ограничение таблицы users
+        """
+        query = (
+            insert(UserModel)
+            .values(
+                full_name=user_data.full_name,
+                phone_number=user_data.phone_number,
+                email=user_data.email,
+                description=user_data.description,
+                role_id=user_data.role_id
+            )
+            .returning(UserModel)
+        )
+        result = await self.session.execute(query)
+        user = result.scalar_one()
         await self.session.commit()
-        await self.session.refresh(user)
+        total_counter.adjust(UserModel.__tablename__, 1)
+        if include_role:
+            await self._attach_roles([user])
         return user
+
+    async def bulk_create(self, users_data: List[UserCreate]) -> List[int]:
+        """
+        Создать пользователей пачкой одним multi-row INSERT
+
+        Args:
+            users_data: Провалидированные данные пользователей
+
+        Returns:
+            List[int]: ID созданных пользователей в порядке входных данных
+
+        Raises:
+            IntegrityError: Если нарушено ограничение уникальности
+        """
+        if not users_data:
+            return []
+        query = insert(UserModel).returning(
+            UserModel.user_id,
+            sort_by_parameter_order=True
+        )
+        result = await self.session.execute(
+            query,
+            [
+                {
+                    "full_name": user_data.full_name,
+                    "phone_number": user_data.phone_number,
+                    "email": user_data.email,
+                    "description": user_data.description,
+                    "role_id": user_data.role_id,
+                }
+                for user_data in users_data
+            ]
+        )
+        user_ids = list(result.scalars().all())
+        await self.session.commit()
+        total_counter.adjust(UserModel.__tablename__, len(user_ids))
+        return user_ids
+
+    async def get_existing_emails(self, emails: Iterable[str]) -> Set[str]:
+        """Получить уже занятые email из переданного набора одним запросом"""
+        emails = set(emails)
+        if not emails:
+            return set()
+        query = select(UserModel.email).where(UserModel.email.in_(emails))
+        result = await self.session.execute(query)
+        return set(result.scalars().all())
+
+    async def get_existing_phones(self, phone_numbers: Iterable[str]) -> Set[str]:
+        """Получить уже занятые номера телефонов из переданного набора"""
+        phone_numbers = set(phone_numbers)
+        if not phone_numbers:
+            return set()
+        query = (
+            select(UserModel.phone_number)
+            .where(UserModel.phone_number.in_(phone_numbers))
+        )
+        result = await self.session.execute(query)
+        return set(result.scalars().all())
     
     async def update(
         self,
         user_id: int,
-        user_data: UserUpdate
+        user_data: UserUpdate,
+        include_role: bool = False
     ) -> Optional[UserModel]:
-        """Обновить пользователя"""
-        # Получаем текущего пользователя
-        user = await self.get_by_id(user_id)
-        if not user:
-            return None
+        """
+        Обновить пользователя одним UPDATE ... RETURNING
 
+        Returns:
+            UserModel: Обновленный объект пользователя
+            None: Если пользователь не найден
+
+        Raises:
+            IntegrityError: Если нарушено ограничение таблицы users
+        """
         # Обновляем только переданные поля
         update_data = user_data.model_dump(exclude_unset=True)
-        if update_data:
-            query = (
-                update(UserModel)
-                .where(UserModel.user_id == user_id)
-                .values(**update_data)
-            )
-            await self.session.execute(query)
-            await self.session.commit()
-            
-            # Возвращаем обновленного пользователя
-            return await self.get_by_id(user_id)
-        
+        if not update_data:
+            return await self.get_by_id(user_id, include_role=include_role)
+
+        query = (
+            update(UserModel)
+            .where(UserModel.user_id == user_id)
+            .values(**update_data)
+            .returning(UserModel)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(query)
+        user = result.scalar_one_or_none()
+        await self.session.commit()
+        user_cache.invalidate(user_id)
+        if "role_id" in update_data:
+            # Роль записана в токенах пользователя
+            token_revocations.revoke_user(user_id)
+
+        if user and include_role:
+            await self._attach_roles([user])
         return user
 
     async def delete(self, user_id: int) -> bool:
@@ -200,6 +569,9 @@ class UserRepository:
         query = delete(UserModel).where(UserModel.user_id == user_id)
         result = await self.session.execute(query)
         await self.session.commit()
+        user_cache.invalidate(user_id)
+        token_revocations.revoke_user(user_id)
+        total_counter.adjust(UserModel.__tablename__, -result.rowcount)
         return result.rowcount > 0
     
     async def change_role(
@@ -228,54 +600,253 @@ class UserRepository:
         )
         result = await self.session.execute(query)
         await self.session.commit()
+        user_cache.invalidate(user_id)
+        token_revocations.revoke_user(user_id)
         
         if result.rowcount > 0:
             return await self.get_by_id(user_id, include_role=True)
         return None
     
-    async def count(self) -> int:
+    # Размер пачки массовых UPDATE/DELETE: блокировки строк держатся
+    # только до коммита одной пачки
+    BULK_CHUNK_SIZE = 5000
+
+    def _filter_conditions(self, filters: UserFilter) -> list:
+        """Условия WHERE для фильтра массовой операции"""
+        conditions = []
+        if filters.role_id is not None:
+            conditions.append(UserModel.role_id == filters.role_id)
+        if filters.user_ids is not None:
+            conditions.append(UserModel.user_id.in_(filters.user_ids))
+        if filters.created_after is not None:
+            conditions.append(UserModel.created_at >= filters.created_after)
+        if filters.created_before is not None:
+            conditions.append(UserModel.created_at < filters.created_before)
+        return conditions
+
+    def _next_chunk(
+        self,
+        conditions: list,
+        after_user_id: int,
+        chunk_size: int
+    ):
+        """Подзапрос следующей пачки: блокирует строки в порядке user_id"""
+        return (
+            select(UserModel.user_id)
+            .where(*conditions, UserModel.user_id > after_user_id)
+            .order_by(UserModel.user_id)
+            .limit(chunk_size)
+            .with_for_update()
+            .subquery()
+        )
+
+    async def _run_chunked(
+        self,
+        build_statement: Callable[[int], Any],
+        on_chunk: Callable[[List[Any]], None]
+    ) -> int:
+        """
+        Выполнять statement пачками до исчерпания строк
+
+        Каждая пачка — один оператор с RETURNING user_id и отдельный
+        коммит. Пачки идут по возрастанию user_id, поэтому
+        строки, измененные в предыдущих пачках, повторно не выбираются.
+        """
+        affected = 0
+        after_user_id = 0
+        while True:
+            result = await self.session.execute(
+                build_statement(after_user_id),
+                execution_options={"synchronize_session": False}
+            )
+            rows = result.all()
+            await self.session.commit()
+            if not rows:
+                return affected
+            affected += len(rows)
+            after_user_id = max(row[0] for row in rows)
+            on_chunk(rows)
+
+    async def bulk_update(
+        self,
+        filters: UserFilter,
+        values: UserBulkValues,
+        chunk_size: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> int:
+        """
+        Обновить пользователей по фильтру пачками UPDATE ... FROM
+
+        Args:
+            filters: Какие пользователи обновляются
+            values: Новые значения (только переданные поля)
+            chunk_size: Размер пачки (по умолчанию BULK_CHUNK_SIZE)
+            on_progress: Вызывается с количеством строк после каждой пачки
+
+        Returns:
+            int: Количество обновленных пользователей
+
+        Raises:
+            IntegrityError: Если новая роль не существует
+        """
+        new_values = values.model_dump(exclude_unset=True)
+
+        def revoke(rows: List[Any]) -> None:
+            if "role_id" in new_values:
+                # Роль записана в токенах только этих пользователей
+                for row in rows:
+                    token_revocations.revoke_user(row[0])
+
+        return await self._update_chunked(
+            filters, new_values, revoke, chunk_size, on_progress
+        )
+
+    async def _update_chunked(
+        self,
+        filters: UserFilter,
+        new_values: dict,
+        revoke: Callable[[List[Any]], None],
+        chunk_size: Optional[int],
+        on_progress: Optional[Callable[[int], None]]
+    ) -> int:
+        """Пачки UPDATE ... FROM; revoke отзывает токены после каждой пачки"""
+        if not new_values:
+            return 0
+        conditions = self._filter_conditions(filters)
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+
+        def build_statement(after_user_id: int):
+            chunk = self._next_chunk(conditions, after_user_id, chunk_size)
+            return (
+                update(UserModel)
+                .where(UserModel.user_id == chunk.c.user_id)
+                .values(**new_values)
+                .returning(UserModel.user_id)
+            )
+
+        def on_chunk(rows: List[Any]) -> None:
+            user_cache.invalidate()
+            revoke(rows)
+            if on_progress:
+                on_progress(len(rows))
+
+        return await self._run_chunked(build_statement, on_chunk)
+
+    async def bulk_delete(
+        self,
+        filters: UserFilter,
+        chunk_size: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> int:
+        """
+        Удалить пользователей по фильтру пачками
+
+        Returns:
+            int: Количество удаленных пользователей
+        """
+        conditions = self._filter_conditions(filters)
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+
+        def build_statement(after_user_id: int):
+            chunk = self._next_chunk(conditions, after_user_id, chunk_size)
+            return (
+                delete(UserModel)
+                .where(UserModel.user_id.in_(select(chunk.c.user_id)))
+                .returning(UserModel.user_id)
+            )
+
+        def on_chunk(rows: List[Any]) -> None:
+            user_cache.invalidate()
+            total_counter.adjust(UserModel.__tablename__, -len(rows))
+            for row in rows:
+                token_revocations.revoke_user(row[0])
+            if on_progress:
+                on_progress(len(rows))
+
+        return await self._run_chunked(build_statement, on_chunk)
+
+    async def reassign_role(
+        self,
+        from_role_id: int,
+        to_role_id: int,
+        chunk_size: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> int:
+        """
+        Перенести всех пользователей роли в другую роль (см. bulk_update)
+
+        Прежняя роль остается без пользователей, поэтому ее токены
+        отзываются целиком, без записи на каждого пользователя.
+        """
+        def revoke(rows: List[Any]) -> None:
+            token_revocations.revoke_role(from_role_id)
+
+        return await self._update_chunked(
+            UserFilter(role_id=from_role_id),
+            {"role_id": to_role_id},
+            revoke,
+            chunk_size,
+            on_progress
+        )
+
+    async def count(self, mode: CountMode = CountMode.EXACT) -> int:
         """Получить общее количество пользователей"""
-        query = select(UserModel.user_id)
-        result = await self.session.execute(query)
-        return len(result.scalars().all())
+        return await count_rows(self.session, UserModel, mode)
 
     async def get_by_role_id(
         self,
-        role_id: int, 
-        include_role: bool = False
-    ) -> List[UserModel]:
-        """Получить пользователей по ID роли"""
-        query = select(UserModel).where(UserModel.role_id == role_id)
-        
-        if include_role:
-            query = query.options(selectinload(UserModel.role))
-            
-        result = await self.session.execute(query)
-        return result.scalars().all()
+        role_id: int,
+        limit: int = 1000,
+        after_user_id: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Получить страницу пользователей роли по ID роли
+
+        Keyset-пагинация по индексу ix_users_role_id_user_id: стоимость
+        страницы не зависит от ее глубины.
+
+        Args:
+            role_id: Идентификатор роли
+            limit: Максимальное количество записей
+            after_user_id: ID последнего пользователя предыдущей страницы
+
+        Returns:
+            List[Row]: Строки ROW_COLUMNS, отсортированные по user_id
+        """
+        return await self.get_rows(
+            limit=limit, after_user_id=after_user_id, role_id=role_id
+        )
 
     async def get_by_role_name(
         self,
         role_name: str,
-        include_role: bool = False
-    ) -> List[UserModel]:
-        """Получить пользователей по названию роли"""
-        query = (
-            select(UserModel)
-            .join(RoleModel)
-            .where(RoleModel.role_name == role_name.lower())
+        limit: int = 1000,
+        after_user_id: Optional[int] = None
+    ) -> List[Any]:
+        """Получить страницу пользователей роли по названию роли (как get_by_role_id)"""
+        return await self.get_rows(
+            limit=limit, after_user_id=after_user_id, role_name=role_name
         )
-        
-        if include_role:
-            query = query.options(selectinload(UserModel.role))
-            
-        result = await self.session.execute(query)
-        return result.scalars().all()
+
+    def stream_by_role_id(
+        self,
+        role_id: int,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Any]:
+        """Потоково отдать всех пользователей роли (строки ROW_COLUMNS)"""
+        return self.stream_with_roles(batch_size, role_id=role_id)
+
+    def stream_by_role_name(
+        self,
+        role_name: str,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Any]:
+        """Потоково отдать всех пользователей роли по ее названию"""
+        return self.stream_with_roles(batch_size, role_name=role_name)
 
     async def verify_role_exists(self, role_id: int) -> bool:
         """Проверить существование роли"""
-        query = select(RoleModel.role_id).where(RoleModel.role_id == role_id)
-        result = await self.session.execute(query)
-        return result.scalar_one_or_none() is not None
+        return await role_cache.get_by_id(self.session, role_id) is not None
 
     async def authenticate(
         self,
@@ -294,18 +865,22 @@ class UserRepository:
             None: Если пользователь не найден или пароль неверен
         """
         # Получаем пользователя по логину
-        query = (
-            select(UserModel)
-            .where(
-                UserModel.login == login
-                and UserModel.password == password
-            )
-        )
+        query = select(UserModel).where(UserModel.login == login)
         result = await self.session.execute(query)
         user = result.scalar_one_or_none()
-        
+
         # Проверяем существование пользователя и корректность пароля
-        if user:
-            return user
+        if not user or not user.password:
+            await password_hasher.verify_dummy(password)
+            return None
 
-        return None
+        if not await password_hasher.verify(password, user.password):
+            return None
+
+        # Cost factor изменился в конфигурации — перехешируем пароль
+        if password_hasher.needs_rehash(user.password):
+            user.password = await password_hasher.hash(password)
+            await self.session.commit()
+            user_cache.invalidate(user.user_id)
+
+        return user
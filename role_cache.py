@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import time
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from models import RoleModel
+
+
+class LocalRoleNotifier:
+    """
+    Оповещение об изменении ролей в пределах одного процесса
+
+    Используется с ROLE_CACHE_NOTIFIER=local (один процесс) и в тестах
+    вместо PostgreSQL LISTEN/NOTIFY.
+    """
+
+    def __init__(self):
+        self._listeners: List[Callable[[], None]] = []
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """Подписаться на изменения ролей"""
+        self._listeners.append(callback)
+
+    def _dispatch(self) -> None:
+        for callback in self._listeners:
+            callback()
+
+    async def publish(self) -> None:
+        """Сообщить подписчикам, что роли изменились"""
+        self._dispatch()
+
+    async def start(self) -> None:
+        """Начать прием оповещений"""
+
+    async def stop(self) -> None:
+        """Прекратить прием оповещений"""
+
+
+class PostgresRoleNotifier(LocalRoleNotifier):
+    """
+    Оповещение об изменении ролей между воркерами через LISTEN/NOTIFY
+
+    Каждый воркер держит одно выделенное соединение asyncpg, которое
+    слушает канал и через которое отправляются оповещения.
+    """
+
+    channel = "roles_changed"
+
+    def __init__(self, dsn: str):
+        super().__init__()
+        self.dsn = dsn
+        self._connection: Optional[asyncpg.Connection] = None
+        self._lock = asyncio.Lock()
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self._dispatch()
+
+    async def start(self) -> None:
+        self._connection = await asyncpg.connect(self.dsn)
+        await self._connection.add_listener(self.channel, self._on_notify)
+
+    async def stop(self) -> None:
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def publish(self) -> None:
+        # Свой процесс сбрасываем сразу, не дожидаясь эха от сервера
+        self._dispatch()
+        if self._connection is None:
+            return
+        async with self._lock:
+            await self._connection.execute(
+                "SELECT pg_notify($1, '')", self.channel
+            )
+
+
+class RoleCache:
+    """
+    Read-through кэш таблицы ролей
+
+    Таблица ролей маленькая и почти не меняется, поэтому при промахе
+    она загружается целиком одним запросом. В кэше лежат отсоединенные
+    объекты RoleModel; репозитории подключают их к своей сессии через
+    merge(load=False), что не порождает запросов к базе.
+
+    Изменения ролей сбрасывают кэш в этом процессе и оповещают другие
+    воркеры через notifier. ttl — страховка на случай потерянного
+    оповещения. Промах по ID или названию перечитывает таблицу не чаще
+    раза в miss_reload_interval секунд, поэтому запросы несуществующих
+    ролей не загружают таблицу на каждом обращении.
+    """
+
+    def __init__(
+        self,
+        notifier: Optional[LocalRoleNotifier] = None,
+        ttl: float = 300.0,
+        miss_reload_interval: float = 1.0
+    ):
+        self.ttl = ttl
+        self.miss_reload_interval = miss_reload_interval
+        self._by_id: Optional[Dict[int, RoleModel]] = None
+        self._by_name: Dict[str, RoleModel] = {}
+        self._version_digest = ""
+        self._loaded_at = 0.0
+        # Растет при каждом сбросе: загрузка, начатая до сброса, не сохраняется
+        self._version = 0
+        self.notifier: LocalRoleNotifier = LocalRoleNotifier()
+        self.set_notifier(notifier or LocalRoleNotifier())
+
+    def set_notifier(self, notifier: LocalRoleNotifier) -> None:
+        """Заменить механизм оповещения (например, на PostgreSQL)"""
+        self.notifier = notifier
+        notifier.subscribe(self.clear)
+
+    def clear(self) -> None:
+        """Сбросить кэш только в этом процессе"""
+        self._version += 1
+        self._by_id = None
+        self._by_name = {}
+
+    async def invalidate(self) -> None:
+        """Сбросить кэш во всех воркерах"""
+        self.clear()
+        await self.notifier.publish()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._by_id is not None
+            and time.monotonic() - self._loaded_at <= self.ttl
+        )
+
+    async def _load(self, session: AsyncSession) -> Dict[int, RoleModel]:
+        version = self._version
+        query = select(
+            RoleModel.role_id, RoleModel.role_name, RoleModel.updated_at
+        )
+        if session.info.get("replica"):
+            # Реплика может отставать: после сброса читаем основную базу
+            from database import get_sessionmaker
+
+            async with get_sessionmaker()() as primary:
+                rows = (await primary.execute(query)).all()
+        else:
+            rows = (await session.execute(query)).all()
+
+        by_id: Dict[int, RoleModel] = {}
+        for role_id, role_name, updated_at in rows:
+            role = RoleModel(
+                role_id=role_id, role_name=role_name, updated_at=updated_at
+            )
+            make_transient_to_detached(role)
+            by_id[role_id] = role
+
+        if version == self._version:
+            self._by_id = by_id
+            self._by_name = {role.role_name: role for role in by_id.values()}
+            self._version_digest = self._digest(rows)
+            self._loaded_at = time.monotonic()
+        return by_id
+
+    @staticmethod
+    def _digest(rows) -> str:
+        data = repr(sorted(tuple(row) for row in rows)).encode("utf-8")
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+    async def _snapshot(self, session: AsyncSession) -> Dict[int, RoleModel]:
+        if self._is_fresh():
+            return self._by_id
+        return await self._load(session)
+
+    def _may_reload_on_miss(self) -> bool:
+        # Недавно загруженный кэш считается точным и для отсутствующих ролей
+        return time.monotonic() - self._loaded_at >= self.miss_reload_interval
+
+    async def _attach(
+        self,
+        session: AsyncSession,
+        role: Optional[RoleModel]
+    ) -> Optional[RoleModel]:
+        if role is None:
+            return None
+        return await session.merge(role, load=False)
+
+    async def version(self, session: AsyncSession) -> str:
+        """
+        Версия таблицы ролей — хеш ее содержимого
+
+        Одинакова во всех воркерах для одинаковых данных, поэтому
+        годится для ETag.
+        """
+        if not self._is_fresh():
+            by_id = await self._load(session)
+            if self._by_id is not by_id:
+                # Кэш сброшен во время загрузки: версия по прочитанным данным
+                return self._digest(
+                    (role.role_id, role.role_name, role.updated_at)
+                    for role in by_id.values()
+                )
+        return self._version_digest
+
+    async def get_all(self, session: AsyncSession) -> List[RoleModel]:
+        """Получить все роли, отсортированные по ID"""
+        roles = await self._snapshot(session)
+        return [
+            await self._attach(session, roles[role_id])
+            for role_id in sorted(roles)
+        ]
+
+    async def get_by_id(
+        self,
+        session: AsyncSession,
+        role_id: int
+    ) -> Optional[RoleModel]:
+        """
+        Получить роль по ID
+
+        При промахе кэш перечитывается (не чаще miss_reload_interval):
+        роль могла быть создана другим воркером, оповещение от которого
+        еще не пришло.
+        """
+        role = (await self._snapshot(session)).get(role_id)
+        if role is None and self._may_reload_on_miss():
+            role = (await self._load(session)).get(role_id)
+        return await self._attach(session, role)
+
+    async def get_by_name(
+        self,
+        session: AsyncSession,
+        name: str
+    ) -> Optional[RoleModel]:
+        """Получить роль по названию"""
+        await self._snapshot(session)
+        role = self._by_name.get(name)
+        if role is None and self._may_reload_on_miss():
+            by_id = await self._load(session)
+            role = next(
+                (r for r in by_id.values() if r.role_name == name),
+                None
+            )
+        return await self._attach(session, role)
+
+
+role_cache = RoleCache()
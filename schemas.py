@@ -35,7 +35,8 @@ class RoleResponse(RoleBase):
 class RoleList(BaseModel):
     """Схема для списка ролей"""
     roles: list[RoleResponse]
-    total: int
+    # None, если клиент запросил список без общего количества
+    total: Optional[int] = None
 
 
 # Схемы для пользователей
@@ -129,7 +130,117 @@ class UserList(BaseModel):
 class UserListWithRoles(BaseModel):
     """Схема для списка пользователей с ролями"""
     users: list[UserWithRoleResponse]
-    total: int
+    # None, если клиент запросил список без общего количества
+    total: Optional[int] = None
+    # Курсор следующей страницы (None, если страница последняя)
+    next_cursor: Optional[str] = None
+
+
+class UserSearchResult(UserWithRoleResponse):
+    """Схема найденного пользователя"""
+    rank: float = Field(description="Релевантность (0..1)")
+
+
+class UserSearchResponse(BaseModel):
+    """Схема результатов поиска пользователей"""
+    users: list[UserSearchResult]
+    limit: int
+    offset: int
+
+
+class UserBatchGetRequest(BaseModel):
+    """Схема запроса пользователей по списку ID"""
+    ids: list[int] = Field(
+        min_length=1,
+        max_length=1000,
+        description="ID пользователей"
+    )
+
+
+class UserBatchGetResponse(BaseModel):
+    """Схема ответа на запрос пользователей по списку ID"""
+    # В порядке ID из запроса (без повторов)
+    users: list[UserWithRoleResponse]
+    # ID, для которых пользователь не найден
+    missing: list[int]
+
+
+class BulkUserResult(BaseModel):
+    """Результат импорта одной строки"""
+    index: int = Field(description="Порядковый номер строки во входных данных")
+    status: str = Field(description="created или error")
+    user_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkUserReport(BaseModel):
+    """Отчет о массовом импорте пользователей"""
+    created: int
+    failed: int
+    results: list[BulkUserResult]
+
+
+class UserFilter(BaseModel):
+    """Фильтр пользователей для массовых операций"""
+    role_id: Optional[int] = Field(None, gt=0)
+    user_ids: Optional[list[int]] = Field(None, min_length=1, max_length=10000)
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+    def has_criteria(self) -> bool:
+        """Задан ли хотя бы один критерий"""
+        return any(
+            value is not None for value in self.model_dump().values()
+        )
+
+
+class UserBulkValues(BaseModel):
+    """Новые значения полей при массовом обновлении"""
+    role_id: Optional[int] = Field(None, gt=0)
+    description: Optional[str] = None
+
+    @validator('role_id')
+    def validate_role_id(cls, v):
+        """Роль нельзя сбросить: role_id в таблице users обязателен"""
+        if v is None:
+            raise ValueError('Роль не может быть null')
+        return v
+
+    def has_values(self) -> bool:
+        """Передано ли хотя бы одно поле"""
+        return bool(self.model_dump(exclude_unset=True))
+
+
+class UserBulkUpdateRequest(BaseModel):
+    """Схема запроса массового обновления пользователей"""
+    filter: UserFilter
+    values: UserBulkValues
+
+
+class UserBulkDeleteRequest(BaseModel):
+    """Схема запроса массового удаления пользователей"""
+    filter: UserFilter
+
+
+class RoleReassignRequest(BaseModel):
+    """Схема запроса переноса пользователей в другую роль"""
+    to_role_id: int = Field(gt=0)
+
+
+class BulkOperationResult(BaseModel):
+    """Результат массовой операции"""
+    affected: int = Field(description="Количество затронутых пользователей")
+
+
+class JobResponse(BaseModel):
+    """Состояние фоновой задачи"""
+    job_id: str
+    kind: str
+    status: str = Field(description="pending, running, done или failed")
+    affected: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
 
 
 # ======= LOGIN SCHEMAS =======
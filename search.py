@@ -0,0 +1,24 @@
+from enum import Enum
+
+# Короче трех символов триграммный индекс не используется
+MIN_QUERY_LENGTH = 3
+
+
+class SearchMode(str, Enum):
+    """Режим поиска пользователей"""
+    PREFIX = "prefix"  # Начало ФИО, email или описания (ILIKE 'q%')
+    FUZZY = "fuzzy"    # Похожие слова с опечатками (word_similarity)
+
+
+# Символ экранирования для LIKE (не обратная косая черта, чтобы не
+# зависеть от standard_conforming_strings)
+LIKE_ESCAPE = "!"
+
+
+def escape_like(value: str) -> str:
+    """Экранировать спецсимволы шаблона LIKE"""
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
@@ -0,0 +1,39 @@
+from typing import Any, Dict
+
+import orjson
+from fastapi import Response
+
+# Поля ответа UserWithRoleResponse, которые берутся из строки как есть
+USER_FIELDS = (
+    "user_id",
+    "full_name",
+    "phone_number",
+    "email",
+    "description",
+    "role_id",
+    "created_at",
+    "updated_at",
+)
+
+
+def user_row_to_dict(row: Any) -> Dict[str, Any]:
+    """
+    Преобразовать строку запроса (колонки пользователя + role_name)
+    в словарь в формате UserWithRoleResponse без ORM и pydantic
+    """
+    mapping = row._mapping
+    data = {field: mapping[field] for field in USER_FIELDS}
+    data["role"] = {
+        "role_id": mapping["role_id"],
+        "role_name": mapping["role_name"],
+    }
+    return data
+
+
+class JSONBytesResponse(Response):
+    """JSON-ответ, сериализуемый orjson без повторной валидации pydantic"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        # OPT_UTC_Z: UTC-время как "...Z", так же как у pydantic
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
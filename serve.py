@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import importlib.util
+import logging
+import os
+import sys
+
+import uvicorn
+
+from config import ServerConfig
+
+logger = logging.getLogger("serve")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Запуск приложения в production (несколько воркеров)"
+    )
+    parser.add_argument("--host", default=ServerConfig.HOST)
+    parser.add_argument("--port", type=int, default=ServerConfig.PORT)
+    parser.add_argument("--workers", type=int, default=ServerConfig.WEB_CONCURRENCY)
+    parser.add_argument("--skip-preflight", action="store_true",
+                        help="Не выполнять предварительные проверки")
+    return parser
+
+
+def get_server_options(args) -> dict:
+    """Параметры uvicorn.run для production"""
+    return {
+        "host": args.host,
+        "port": args.port,
+        "workers": args.workers,
+        # uvloop и httptools входят в uvicorn[standard]
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        "backlog": ServerConfig.BACKLOG,
+        "timeout_keep_alive": ServerConfig.KEEPALIVE_TIMEOUT,
+        # После SIGTERM воркер перестает принимать соединения и ждет
+        # завершения текущих запросов, затем выполняет shutdown lifespan
+        "timeout_graceful_shutdown": ServerConfig.GRACEFUL_TIMEOUT,
+        "limit_concurrency": ServerConfig.LIMIT_CONCURRENCY,
+        "proxy_headers": True,
+        "forwarded_allow_ips": ServerConfig.FORWARDED_ALLOW_IPS,
+        "server_header": False,
+        "access_log": False,
+        "log_level": "info",
+    }
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+
+    from preflight import (
+        PreflightError,
+        check_engine_options,
+        check_workers,
+        run_preflight
+    )
+
+    try:
+        # Проверяется всегда, в том числе с --skip-preflight
+        check_engine_options()
+        check_workers(args.workers)
+        if not args.skip_preflight:
+            asyncio.run(run_preflight())
+    except PreflightError as e:
+        logger.error("%s", e)
+        return 1
+
+    if not args.skip_preflight:
+        # Воркеры наследуют окружение и пропускают эту работу в lifespan
+        os.environ[ServerConfig.PREFLIGHT_ENV] = "1"
+
+    uvicorn.run("main:app", **get_server_options(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
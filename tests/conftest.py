@@ -0,0 +1,126 @@
+import asyncio
+import os
+import sys
+import uuid
+
+import pytest
+
+# Модули приложения лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Ключ подписи токенов, если окружение его не задало. Клиент Google OAuth
+# задает только фикстура google_provider: без него lifespan не обращается к Google
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "db: нужна PostgreSQL из переменных DB_* (тестовая база)"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.getenv("DB_HOST"):
+        return
+    skip = pytest.mark.skip(reason="нужна PostgreSQL (переменные DB_*)")
+    for item in items:
+        if "db" in item.keywords:
+            item.add_marker(skip)
+
+
+async def _run_app(check) -> None:
+    import httpx
+
+    from database import get_engine
+    from main import app
+
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            # https: access-токен записывается в cookie с флагом Secure
+            async with httpx.AsyncClient(
+                transport=transport, base_url="https://test"
+            ) as client:
+                await check(client)
+    finally:
+        # Соединения пула привязаны к циклу событий этого теста
+        await get_engine().dispose()
+
+
+@pytest.fixture
+def run_app():
+    """Выполнить async check(client) с приложением в этом процессе"""
+    def run(check) -> None:
+        asyncio.run(_run_app(check))
+
+    return run
+
+
+@pytest.fixture
+def create_user():
+    """
+    Создать роль и пользователя с логином и паролем
+
+    Роль и пользователь создаются через API, логин и пароль
+    записываются в базу напрямую (в API их задать нельзя).
+    """
+    async def create(client, password: str = "test-password") -> dict:
+        from sqlalchemy import update
+
+        from database import get_sessionmaker
+        from models import UserModel
+        from passwords import password_hasher
+
+        suffix = uuid.uuid4().hex[:12]
+        response = await client.post(
+            "/roles/", json={"role_name": f"test_{suffix}"}
+        )
+        assert response.status_code == 201, response.text
+        role = response.json()
+
+        email = f"{suffix}@test.example.com"
+        response = await client.post("/users/", json={
+            "full_name": "Test User",
+            "phone_number": f"+7{int(suffix, 16) % 10 ** 10:010d}",
+            "email": email,
+            "role_id": role["role_id"],
+        })
+        assert response.status_code == 201, response.text
+        user = response.json()
+
+        login = f"test_{suffix}"
+        async with get_sessionmaker()() as session:
+            await session.execute(
+                update(UserModel)
+                .where(UserModel.user_id == user["user_id"])
+                .values(login=login, password=await password_hasher.hash(password))
+            )
+            await session.commit()
+
+        return {
+            "user_id": user["user_id"],
+            "role_id": role["role_id"],
+            "role_name": role["role_name"],
+            "email": email,
+            "username": login,
+            "password": password,
+        }
+
+    return create
+
+
+@pytest.fixture
+def google_provider(monkeypatch):
+    """Заменитель Google, подключенный к google_oauth (до запуска lifespan)"""
+    from config import get_settings
+    from google_provider import LocalGoogleProvider
+    from oauth_google import google_oauth
+
+    monkeypatch.setenv("OAUTH_GOOGLE_CLIENT_ID", "test-client-id")
+    monkeypatch.setenv("OAUTH_GOOGLE_CLIENT_SECRET", "test-client-secret")
+    get_settings.cache_clear()
+    provider = LocalGoogleProvider(client_id=get_settings().OAUTH_GOOGLE_CLIENT_ID)
+    google_oauth.set_transport(provider.transport)
+    yield provider
+    google_oauth.set_transport(None)
+    get_settings.cache_clear()
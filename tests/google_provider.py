@@ -0,0 +1,109 @@
+import json
+import secrets
+import time
+import urllib.parse
+from typing import Dict, Optional
+
+import httpx
+import jwt
+from jwt.algorithms import RSAAlgorithm
+
+from config import GoogleOAuthConfig
+from oauth_google import GOOGLE_ISSUERS
+
+
+class LocalGoogleProvider:
+    """
+    Заменитель Google для тестов
+
+    Отвечает на запросы к token endpoint и JWKS через httpx.MockTransport,
+    без сети. Коды выдаются методом issue_code, id_token подписывается
+    локально сгенерированным RSA-ключом.
+    """
+
+    kid = "local-test-key"
+
+    def __init__(
+        self,
+        client_id: str,
+        token_url: str = GoogleOAuthConfig.TOKEN_URL,
+        jwks_url: str = GoogleOAuthConfig.JWKS_URL,
+        max_age: int = 3600
+    ):
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        self.client_id = client_id
+        self.token_url = token_url
+        self.jwks_url = jwks_url
+        self.max_age = max_age
+        self.private_key = rsa.generate_private_key(
+            public_exponent=65537, key_size=2048
+        )
+        self._codes: Dict[str, dict] = {}
+        self.token_requests = 0
+        self.jwks_requests = 0
+
+    def issue_code(self, email: str, email_verified: bool = True, **claims) -> str:
+        """Выдать одноразовый код для пользователя"""
+        code = secrets.token_urlsafe(16)
+        self._codes[code] = {
+            "sub": claims.pop("sub", secrets.token_hex(8)),
+            "email": email,
+            "email_verified": email_verified,
+            **claims,
+        }
+        return code
+
+    def sign(self, claims: dict, kid: Optional[str] = None) -> str:
+        """Подписать id_token; claims дополняют и переопределяют стандартные"""
+        now = int(time.time())
+        return jwt.encode(
+            {
+                "iss": GOOGLE_ISSUERS[0],
+                "aud": self.client_id,
+                "iat": now,
+                "exp": now + 3600,
+                **claims,
+            },
+            self.private_key,
+            algorithm="RS256",
+            headers={"kid": kid or self.kid}
+        )
+
+    def _jwks(self) -> dict:
+        jwk = json.loads(RSAAlgorithm.to_jwk(self.private_key.public_key()))
+        jwk.update({"kid": self.kid, "use": "sig", "alg": "RS256"})
+        return {"keys": [jwk]}
+
+    def _token(self, request: httpx.Request) -> httpx.Response:
+        form = dict(urllib.parse.parse_qsl(request.content.decode()))
+        claims = self._codes.pop(form.get("code", ""), None)
+        if claims is None or form.get("client_id") != self.client_id:
+            return httpx.Response(400, json={"error": "invalid_grant"})
+
+        return httpx.Response(200, json={
+            "access_token": secrets.token_urlsafe(16),
+            "id_token": self.sign(claims),
+            "expires_in": 3600,
+            "token_type": "Bearer",
+        })
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Обработать запрос клиента"""
+        url = str(request.url).split("?", 1)[0]
+        if request.method == "GET" and url == self.jwks_url:
+            self.jwks_requests += 1
+            return httpx.Response(
+                200,
+                json=self._jwks(),
+                headers={"Cache-Control": f"public, max-age={self.max_age}"}
+            )
+        if request.method == "POST" and url == self.token_url:
+            self.token_requests += 1
+            return self._token(request)
+        return httpx.Response(404)
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        """Транспорт для GoogleOAuthClient.set_transport"""
+        return httpx.MockTransport(self.handle)
@@ -0,0 +1,128 @@
+import time
+
+import jwt
+import pytest
+
+from auth import TokenClaims, TokenDecoder, TokenRevocations
+
+
+def test_issued_token_carries_claims():
+    decoder = TokenDecoder(version=3)
+    token = decoder.issue(user_id=7, role_id=2, role_name="admin")
+
+    claims = decoder.decode(token)
+
+    assert (claims.user_id, claims.role_id, claims.role_name) == (7, 2, "admin")
+    assert claims.version == 3
+    assert claims.expires_at is not None
+    assert decoder.issue(7, 2, "admin") != token
+
+
+def test_token_of_other_version_is_rejected():
+    token = TokenDecoder(version=1).issue(7, 2, "admin")
+
+    with pytest.raises(jwt.InvalidTokenError):
+        TokenDecoder(version=2).decode(token)
+
+
+def _claims(issued_at: float, role_id: int = 2) -> TokenClaims:
+    return TokenClaims(
+        user_id=7, role_id=role_id, role_name="admin", version=1,
+        jti=f"jti-{issued_at}", issued_at=issued_at, expires_at=None
+    )
+
+
+def test_revocation_rejects_token_issued_in_the_same_second(monkeypatch):
+    revocations = TokenRevocations(max_lifetime=900)
+    monkeypatch.setattr(time, "time", lambda: 1000.5)
+    revocations.revoke_user(7)
+
+    assert revocations.is_revoked(_claims(1000.2))
+    assert revocations.is_revoked(_claims(1000.5))
+    assert not revocations.is_revoked(_claims(1000.8))
+
+
+def test_revocations_older_than_token_lifetime_are_dropped(monkeypatch):
+    revocations = TokenRevocations(max_lifetime=900)
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    revocations.revoke_user(7)
+    revocations.revoke_role(2)
+    now[0] = 1500.0
+    revocations.revoke_user(8)
+    # Повторный отзыв переносит запись в конец
+    revocations.revoke_user(7)
+
+    now[0] = 2100.0
+    assert revocations.is_revoked(_claims(1300.0, role_id=3))
+    # Отзыв роли в 1000 старше срока токена: токены до него истекли
+    assert revocations._roles == {}
+    assert list(revocations._users) == [8, 7]
+
+    now[0] = 2450.0
+    revocations.revoke_role(5)
+    assert revocations._users == {}
+    assert revocations._roles == {5: 2450.0}
+
+
+def test_role_revocation():
+    decoder = TokenDecoder()
+    revocations = TokenRevocations()
+    claims = decoder.decode(decoder.issue(7, 2, "admin"))
+
+    revocations.revoke_role(5)
+    assert not revocations.is_revoked(claims)
+    revocations.revoke_role(2)
+    assert revocations.is_revoked(claims)
+
+
+@pytest.mark.db
+def test_login_me_logout(run_app, create_user):
+    async def check(client):
+        user = await create_user(client)
+
+        response = await client.post("/login", json={
+            "username": user["username"], "password": user["password"]
+        })
+        assert response.status_code == 200, response.text
+        token = response.json()["access_token"]
+
+        response = await client.get("/me")
+        assert response.status_code == 200, response.text
+        assert response.json() == {
+            "user_id": user["user_id"],
+            "role": {"role_id": user["role_id"], "role_name": user["role_name"]},
+        }
+        assert (await client.get("/protected")).status_code == 200
+
+        response = await client.post("/logout")
+        assert response.status_code == 200
+        assert (await client.get("/me")).status_code == 401
+        # Отозванный токен не принимается, даже если клиент его сохранил
+        response = await client.get("/me", cookies={"my_access_token": token})
+        assert response.status_code == 401
+
+    run_app(check)
+
+
+@pytest.mark.db
+def test_role_change_revokes_token(run_app, create_user):
+    async def check(client):
+        user = await create_user(client)
+        other = await create_user(client)
+        response = await client.post("/login", json={
+            "username": user["username"], "password": user["password"]
+        })
+        token = response.json()["access_token"]
+
+        response = await client.patch(
+            f"/users/{user['user_id']}/role",
+            params={"new_role_id": other["role_id"]}
+        )
+        assert response.status_code == 200, response.text
+
+        client.cookies.clear()
+        response = await client.get("/me", cookies={"my_access_token": token})
+        assert response.status_code == 401
+
+    run_app(check)
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from benchmarks.runner import compare, summarize
+
+
+def test_compare_reports_regressions():
+    base = {"endpoints": {"GET /roles/": summarize([0.010] * 100, 0, 1.0)}}
+    current = {"endpoints": {"GET /roles/": summarize([0.020] * 50, 1, 1.0)}}
+
+    regressions = compare(current, base, tolerance=0.10)
+
+    assert any("p95_ms" in r for r in regressions)
+    assert any("throughput_rps" in r for r in regressions)
+    assert any("errors" in r for r in regressions)
+    assert compare(base, base) == []
+
+
+def test_client_errors_fail_only_scenarios_requiring_success():
+    import random
+
+    import httpx
+
+    from benchmarks.runner import run_scenario
+    from benchmarks.scenarios import Scenario
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(429))
+
+    async def run(scenario: Scenario) -> dict:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            return await run_scenario(
+                client, scenario, {}, concurrency=2, requests=4, warmup=1,
+                rnd=random.Random(0)
+            )
+
+    build = lambda m, r: ("/login", {})
+    strict = asyncio.run(run(Scenario("login", "POST", build, require_success=True)))
+    lenient = asyncio.run(run(Scenario("login", "POST", build)))
+
+    assert strict["errors"] == 4
+    assert lenient["errors"] == 0
+
+
+@pytest.mark.db
+def test_seed_and_run_scenario(tmp_path):
+    from benchmarks.runner import run_benchmark
+    from benchmarks.scenarios import select_scenarios
+    from benchmarks.seed import seed
+    from database import get_engine
+
+    async def seed_and_run() -> dict:
+        try:
+            manifest = await seed(
+                roles=2,
+                users=50,
+                login_users=0,
+                manifest_path=str(tmp_path / "bench_seed.json")
+            )
+            return await run_benchmark(
+                select_scenarios(["GET /users/{user_id}"]),
+                manifest,
+                concurrency=2,
+                requests=10,
+                warmup=2
+            )
+        finally:
+            # Соединения пула привязаны к циклу событий этого теста
+            await get_engine().dispose()
+
+    report = asyncio.run(seed_and_run())
+
+    result = report["endpoints"]["GET /users/{user_id}"]
+    assert result["requests"] == 10
+    assert result["errors"] == 0
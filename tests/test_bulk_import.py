@@ -0,0 +1,126 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.exc import IntegrityError
+
+from bulk_import import import_users, iter_json_array, iter_ndjson
+
+
+class UniqueViolation(Exception):
+    """Исключение драйвера с именем нарушенного ограничения"""
+    constraint_name = "users_email_key"
+
+
+class ImportRepository:
+    """Репозиторий пользователей и ролей в памяти"""
+
+    def __init__(self, roles=(1,), emails=(), phones=(), conflicts=()):
+        self.roles = set(roles)
+        self.emails = set(emails)
+        self.phones = set(phones)
+        # Email, занятые параллельной записью уже после проверки уникальности
+        self.conflicts = set(conflicts)
+        self.calls = 0
+        self.next_id = 1
+        self.session = SimpleNamespace(rollback=self._rollback)
+        self.rollbacks = 0
+
+    async def _rollback(self):
+        self.rollbacks += 1
+
+    async def get_existing_ids(self, role_ids):
+        return self.roles & set(role_ids)
+
+    async def get_existing_emails(self, emails):
+        return self.emails & set(emails)
+
+    async def get_existing_phones(self, phones):
+        return self.phones & set(phones)
+
+    async def bulk_create(self, users):
+        self.calls += 1
+        if any(user.email in self.conflicts for user in users):
+            raise IntegrityError("INSERT", {}, UniqueViolation())
+        ids = list(range(self.next_id, self.next_id + len(users)))
+        self.next_id += len(users)
+        self.emails.update(user.email for user in users)
+        self.phones.update(user.phone_number for user in users)
+        return ids
+
+
+def _row(n: int, **overrides) -> dict:
+    return {
+        "full_name": "Иван Петров",
+        "phone_number": f"+7900000{n:04d}",
+        "email": f"user{n}@example.com",
+        "role_id": 1,
+        **overrides,
+    }
+
+
+def _import(repo: ImportRepository, rows, chunk_size: int = 1000):
+    return asyncio.run(import_users(repo, repo, rows, chunk_size=chunk_size))
+
+
+def test_rows_are_validated_individually():
+    report = _import(ImportRepository(), iter_json_array([
+        _row(1),
+        _row(2, full_name="Иван"),
+        _row(3, phone_number="телефон"),
+        _row(4, email="not-an-email"),
+        _row(5, role_id=2),
+    ]))
+
+    assert (report.created, report.failed) == (1, 4)
+    assert [r.status for r in report.results] == ["created"] + ["error"] * 4
+    assert report.results[1].error.startswith("full_name: ")
+    assert report.results[3].error.startswith("email: ")
+    assert "роль" in report.results[4].error
+
+
+def test_duplicates_within_import_and_in_database():
+    repo = ImportRepository(emails={"user9@example.com"})
+    report = _import(repo, iter_json_array([
+        _row(1),
+        _row(2, email="user1@example.com"),
+        _row(3, phone_number=_row(1)["phone_number"]),
+        _row(9),
+        # Дубликат из предыдущей пачки
+        _row(4, email="user1@example.com"),
+    ]), chunk_size=4)
+
+    assert [r.status for r in report.results] == [
+        "created", "error", "error", "error", "error"
+    ]
+    assert "email" in report.results[1].error
+    assert "телефон" in report.results[2].error
+
+
+def test_conflicting_chunk_reports_only_offending_rows():
+    repo = ImportRepository(conflicts={"user2@example.com"})
+    report = _import(repo, iter_json_array([
+        _row(1), _row(2), _row(3),
+        # Телефон строки 2 не записан (ее вставка откатилась) — это не дубликат
+        _row(4, phone_number=_row(2)["phone_number"]),
+    ]), chunk_size=3)
+
+    assert [r.status for r in report.results] == [
+        "created", "error", "created", "created"
+    ]
+    assert report.results[1].error == "Пользователь с таким email уже существует"
+    # Откат пачки и откат вставки строки 2
+    assert repo.rollbacks == 2
+
+
+def test_ndjson_stream_with_broken_lines():
+    async def body():
+        # Строка разрезана между фрагментами тела запроса
+        yield b'{"a": 1}\n{"a"'
+        yield b': 2}\n\nnot json\n{"a": 3}'
+
+    async def collect():
+        return [row async for row in iter_ndjson(body())]
+
+    rows = asyncio.run(collect())
+    assert rows[0] == {"a": 1} and rows[1] == {"a": 2} and rows[3] == {"a": 3}
+    assert isinstance(rows[2], ValueError)
@@ -0,0 +1,25 @@
+import pytest
+from pydantic import ValidationError
+
+from schemas import UserBulkValues
+
+
+def test_bulk_values_reject_null_role():
+    with pytest.raises(ValidationError):
+        UserBulkValues(role_id=None)
+    # description можно сбросить явным null
+    assert UserBulkValues(description=None).has_values()
+    assert not UserBulkValues().has_values()
+
+
+@pytest.mark.db
+def test_bulk_update_requires_values(run_app):
+    async def check(client):
+        body = {"filter": {"user_ids": [1]}}
+        empty = await client.post("/users/bulk-update", json={**body, "values": {}})
+        null_role = await client.post(
+            "/users/bulk-update", json={**body, "values": {"role_id": None}}
+        )
+        assert (empty.status_code, null_role.status_code) == (400, 422)
+
+    run_app(check)
@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+
+import pytest
+from starlette.requests import Request
+
+from conditional import (
+    http_date,
+    is_conditional,
+    is_not_modified,
+    make_etag,
+    validator_headers
+)
+
+ETAG = make_etag("user", 1, "2024-01-01")
+MODIFIED = datetime(2024, 1, 1, 12, 0, 0, 500000, tzinfo=timezone.utc)
+
+
+def _request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [
+            (name.replace("_", "-").encode(), value.encode())
+            for name, value in headers.items()
+        ],
+    })
+
+
+def test_etag_is_weak_and_depends_on_parts():
+    assert ETAG.startswith('W/"')
+    assert make_etag("user", 1, "2024-01-01") == ETAG
+    assert make_etag("user", 1, "2024-01-02") != ETAG
+
+
+@pytest.mark.parametrize("header, expected", [
+    (ETAG, True),
+    # Слабое сравнение: совпадает и без префикса W/
+    (ETAG.removeprefix("W/"), True),
+    (f'W/"other", {ETAG}', True),
+    ("*", True),
+    ('W/"other"', False),
+    ("", False),
+])
+def test_if_none_match(header, expected):
+    assert is_not_modified(_request(if_none_match=header), ETAG) is expected
+
+
+@pytest.mark.parametrize("since, expected", [
+    ("Mon, 01 Jan 2024 12:00:00 GMT", True),
+    ("Mon, 01 Jan 2024 13:00:00 GMT", True),
+    ("Mon, 01 Jan 2024 11:59:59 GMT", False),
+    ("не дата", False),
+])
+def test_if_modified_since_ignores_fractions_of_second(since, expected):
+    request = _request(if_modified_since=since)
+    assert is_not_modified(request, ETAG, MODIFIED) is expected
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = _request(
+        if_none_match='W/"other"',
+        if_modified_since="Mon, 01 Jan 2024 13:00:00 GMT"
+    )
+    assert not is_not_modified(request, ETAG, MODIFIED)
+
+
+def test_is_conditional():
+    assert not is_conditional(_request())
+    assert is_conditional(_request(if_none_match=ETAG))
+    assert is_conditional(_request(if_modified_since=http_date(MODIFIED)))
+    # Эндпоинт без Last-Modified проверяет только If-None-Match
+    assert not is_conditional(
+        _request(if_modified_since=http_date(MODIFIED)), last_modified=False
+    )
+    assert is_conditional(_request(if_none_match=ETAG), last_modified=False)
+
+
+def test_validator_headers():
+    headers = validator_headers(ETAG, MODIFIED)
+
+    assert headers["ETag"] == ETAG
+    assert headers["Cache-Control"] == "no-cache"
+    assert headers["Last-Modified"] == "Mon, 01 Jan 2024 12:00:00 GMT"
+    assert "Last-Modified" not in validator_headers(ETAG)
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only, greenlet_spawn
+
+from database import (
+    PRIMARY_PIN_COOKIE,
+    PoolWaitStats,
+    ReadYourWritesMiddleware,
+    TimedQueuePool,
+    replica_router
+)
+from serialization import JSONBytesResponse
+
+
+class Connection:
+    """DBAPI-соединение без базы"""
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _pool(timeout: float = 1.0) -> TimedQueuePool:
+    pool = TimedQueuePool(Connection, pool_size=1, max_overflow=0, timeout=timeout)
+    pool.wait_stats = PoolWaitStats("primary", "test")
+    return pool
+
+
+def test_idle_connection_of_full_pool_is_not_a_wait():
+    pool = _pool()
+
+    def checkouts():
+        for _ in range(3):
+            pool.connect().close()
+
+    asyncio.run(greenlet_spawn(checkouts))
+    assert (pool.wait_stats.checkouts, pool.wait_stats.waits) == (3, 0)
+
+
+def test_checkout_waits_for_returned_connection():
+    pool = _pool()
+
+    def hold():
+        connection = pool.connect()
+        await_only(asyncio.sleep(0.05))
+        connection.close()
+
+    def wait():
+        await_only(asyncio.sleep(0.01))
+        pool.connect().close()
+
+    async def run():
+        await asyncio.gather(greenlet_spawn(hold), greenlet_spawn(wait))
+
+    asyncio.run(run())
+    stats = pool.wait_stats
+    assert (stats.checkouts, stats.waits, stats.timeouts) == (2, 1, 0)
+    assert 0.02 < stats.max_wait < 1.0
+
+
+def test_timeout_is_counted():
+    pool = _pool(timeout=0.01)
+
+    def checkouts():
+        connection = pool.connect()
+        try:
+            with pytest.raises(PoolTimeoutError):
+                pool.connect()
+        finally:
+            connection.close()
+
+    asyncio.run(greenlet_spawn(checkouts))
+    assert (pool.wait_stats.waits, pool.wait_stats.timeouts) == (0, 1)
+
+
+def _pinning_client(monkeypatch) -> TestClient:
+    monkeypatch.setattr(replica_router, "replicas", [object()])
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/direct")
+    async def direct():
+        # Эндпоинт возвращает свой Response, а не модель
+        Session().commit()
+        return JSONBytesResponse({})
+
+    @app.post("/error")
+    async def error():
+        Session().commit()
+        raise HTTPException(status_code=409, detail="conflict")
+
+    @app.post("/replica")
+    async def replica():
+        Session(info={"replica": True}).commit()
+        return JSONBytesResponse({})
+
+    return TestClient(app)
+
+
+def test_commit_pins_client_to_primary(monkeypatch):
+    client = _pinning_client(monkeypatch)
+
+    direct = client.post("/direct")
+    error = client.post("/error")
+    assert PRIMARY_PIN_COOKIE in direct.cookies
+    assert error.status_code == 409 and PRIMARY_PIN_COOKIE in error.cookies
+
+
+def test_replica_commit_does_not_pin(monkeypatch):
+    client = _pinning_client(monkeypatch)
+
+    assert PRIMARY_PIN_COOKIE not in client.post("/replica").cookies
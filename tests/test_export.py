@@ -0,0 +1,94 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import export
+from export import ExportFormat, iter_export
+
+FIELDS = ("user_id", "full_name", "created_at")
+CREATED = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+async def _rows(count: int):
+    for n in range(count):
+        yield (n, f"Пользователь, {n}", CREATED)
+
+
+def _collect(export_format: ExportFormat, count: int):
+    async def run():
+        return [chunk async for chunk in iter_export(_rows(count), FIELDS, export_format)]
+
+    return asyncio.run(run())
+
+
+def test_ndjson_lines_are_chunked(monkeypatch):
+    monkeypatch.setattr(export, "ROWS_PER_CHUNK", 2)
+    chunks = _collect(ExportFormat.NDJSON, 5)
+
+    assert len(chunks) == 3
+    lines = "".join(chunks).splitlines()
+    assert json.loads(lines[1])["full_name"] == "Пользователь, 1"
+    assert [json.loads(line)["user_id"] for line in lines] == [0, 1, 2, 3, 4]
+
+
+def test_csv_has_header_and_quotes_values(monkeypatch):
+    monkeypatch.setattr(export, "ROWS_PER_CHUNK", 2)
+    chunks = _collect(ExportFormat.CSV, 3)
+
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == list(FIELDS)
+    assert rows[2][1] == "Пользователь, 1"
+    assert len(rows) == 4
+
+
+def test_empty_export():
+    assert _collect(ExportFormat.NDJSON, 0) == []
+    assert "".join(_collect(ExportFormat.CSV, 0)).strip() == ",".join(FIELDS)
+
+
+class _Row(tuple):
+    """Строка результата с _mapping, как у SQLAlchemy Row"""
+
+    def __new__(cls, mapping):
+        row = super().__new__(cls, mapping.values())
+        row._mapping = mapping
+        return row
+
+
+def test_ndjson_rows_match_paged_shape():
+    from serialization import JSONBytesResponse, user_row_to_dict
+
+    row = _Row({
+        "user_id": 1,
+        "full_name": "Пользователь",
+        "phone_number": "+79990000000",
+        "email": "user@example.com",
+        "description": None,
+        "role_id": 2,
+        "role_name": "admin",
+        "created_at": CREATED,
+        "updated_at": CREATED,
+    })
+
+    async def rows():
+        yield row
+
+    async def run():
+        return [
+            chunk async for chunk in iter_export(
+                rows(), list(row._mapping), ExportFormat.NDJSON, user_row_to_dict
+            )
+        ]
+
+    streamed = json.loads("".join(asyncio.run(run())))
+    paged = json.loads(JSONBytesResponse([user_row_to_dict(row)]).body)[0]
+    assert streamed == paged
+    assert streamed["role"] == {"role_id": 2, "role_name": "admin"}
+    assert streamed["created_at"] == "2024-01-01T12:00:00Z"
+
+
+def test_csv_timestamps_use_utc_z():
+    rows = list(csv.reader(io.StringIO("".join(_collect(ExportFormat.CSV, 1)))))
+    assert rows[1][2] == "2024-01-01T12:00:00Z"
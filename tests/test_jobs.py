@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from sqlalchemy.exc import IntegrityError
+
+from jobs import JOB_FAILED_MESSAGE, JobRegistry, LocalJobStore, PostgresJobStore
+
+
+async def _wait_finished(registry: JobRegistry, job_id: str):
+    for _ in range(100):
+        job = await registry.get(job_id)
+        if job.finished_at is not None:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("Задача не завершилась")
+
+
+def test_job_reports_progress_and_result():
+    registry = JobRegistry(LocalJobStore(), progress_interval=0.01)
+
+    async def run(job):
+        job.progress(3)
+        job.progress(2)
+
+    async def scenario():
+        job = await registry.submit("bulk_update", run)
+        return await _wait_finished(registry, job.job_id)
+
+    job = asyncio.run(scenario())
+    assert (job.status, job.affected, job.error) == ("done", 5, None)
+
+
+class UniqueViolation(Exception):
+    """Исключение драйвера с именем нарушенного ограничения"""
+    constraint_name = "users_email_key"
+
+
+def _failed_job(error: Exception):
+    registry = JobRegistry(LocalJobStore())
+
+    async def run(job):
+        job.progress(1)
+        raise error
+
+    async def scenario():
+        job = await registry.submit("bulk_delete", run)
+        return await _wait_finished(registry, job.job_id)
+
+    return asyncio.run(scenario())
+
+
+def test_failed_job_hides_error_details():
+    job = _failed_job(RuntimeError("UPDATE users SET ... secret"))
+    assert (job.status, job.affected, job.error) == ("failed", 1, JOB_FAILED_MESSAGE)
+
+
+def test_failed_job_reports_violated_constraint():
+    error = IntegrityError("UPDATE users SET email = $1", ("a@b.c",), UniqueViolation())
+    job = _failed_job(error)
+    assert job.error == "Пользователь с таким email уже существует"
+
+
+def test_local_store_keeps_unfinished_jobs():
+    store = LocalJobStore(max_jobs=1)
+    registry = JobRegistry(store)
+    release = asyncio.Event()
+
+    async def scenario():
+        await registry.submit("slow", lambda job: release.wait())
+        second = await registry.submit("fast", lambda job: asyncio.sleep(0))
+        await _wait_finished(registry, second.job_id)
+        # Первая задача не завершена и не вытесняется
+        kinds = [job.kind for job in store._jobs.values()]
+        release.set()
+        await registry.shutdown()
+        return kinds
+
+    assert asyncio.run(scenario()) == ["slow", "fast"]
+
+
+@pytest.mark.db
+def test_postgres_store_shares_status_between_workers():
+    from config import DatabaseConfig
+
+    dsn = DatabaseConfig.get_sync_database_url()
+
+    async def scenario():
+        # Два хранилища — как в двух воркерах
+        owner, other = PostgresJobStore(dsn), PostgresJobStore(dsn)
+        await owner.start()
+        await other.start()
+        try:
+            registry = JobRegistry(owner, progress_interval=0.01)
+            started = asyncio.Event()
+            release = asyncio.Event()
+
+            async def run(job):
+                job.progress(7)
+                started.set()
+                await release.wait()
+
+            job = await registry.submit("bulk_update", run)
+            await started.wait()
+            await asyncio.sleep(0.05)
+            running = await other.get(job.job_id)
+            release.set()
+            await _wait_finished(JobRegistry(other), job.job_id)
+            return running, await other.get(job.job_id)
+        finally:
+            await owner.stop()
+            await other.stop()
+
+    running, finished = asyncio.run(scenario())
+    assert (running.status, running.affected) == ("running", 7)
+    assert (finished.status, finished.affected) == ("done", 7)
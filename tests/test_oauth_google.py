@@ -0,0 +1,186 @@
+import asyncio
+import time
+import urllib.parse
+
+import httpx
+import pytest
+
+from google_provider import LocalGoogleProvider
+from oauth_google import GoogleOAuthClient, GoogleOAuthError, JWKSCache
+
+
+async def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "условие не выполнилось"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.parametrize("max_age, expected_ttl", [
+    (600, 600),
+    # Меньше min_ttl — не чаще min_ttl
+    (5, 60),
+])
+def test_jwks_ttl_follows_cache_control(max_age, expected_ttl):
+    provider = LocalGoogleProvider(client_id="test-client-id", max_age=max_age)
+    cache = JWKSCache(provider.jwks_url, min_ttl=60)
+
+    async def run():
+        async with httpx.AsyncClient(transport=provider.transport) as client:
+            await cache.start(client)
+            try:
+                await _wait_for(lambda: provider.jwks_requests == 1)
+                return cache.expires_at - time.monotonic()
+            finally:
+                await cache.stop()
+
+    ttl = asyncio.run(run())
+    assert expected_ttl - 5 < ttl <= expected_ttl
+
+
+def test_on_demand_refresh_waiting_for_lock_reuses_fresh_keys():
+    provider = LocalGoogleProvider(client_id="test-client-id")
+    cache = JWKSCache(provider.jwks_url, min_refresh_interval=0.2)
+
+    async def run():
+        async with httpx.AsyncClient(transport=provider.transport) as client:
+            await cache.start(client)
+            try:
+                await _wait_for(lambda: provider.jwks_requests == 1)
+                await asyncio.sleep(0.25)
+                # Обновление по kid ждет блокировку, пока идет другое
+                # обновление, и затем использует только что загруженные ключи
+                await asyncio.gather(cache.refresh(), cache.refresh(force=False))
+                assert provider.jwks_requests == 2
+                # Обновление по расписанию выполняется всегда
+                await cache.refresh()
+                assert provider.jwks_requests == 3
+            finally:
+                await cache.stop()
+
+    asyncio.run(run())
+
+
+def test_unknown_kid_refreshes_once_for_concurrent_lookups():
+    provider = LocalGoogleProvider(client_id="test-client-id")
+    cache = JWKSCache(provider.jwks_url, min_refresh_interval=0.2)
+
+    async def run():
+        async with httpx.AsyncClient(transport=provider.transport) as client:
+            await cache.start(client)
+            try:
+                await _wait_for(lambda: provider.jwks_requests == 1)
+                assert await cache.get_key(provider.kid) is not None
+                await asyncio.sleep(0.25)
+                keys = await asyncio.gather(*(
+                    cache.get_key("rotated-key") for _ in range(10)
+                ))
+            finally:
+                await cache.stop()
+        return keys
+
+    assert asyncio.run(run()) == [None] * 10
+    assert provider.jwks_requests == 2
+
+
+def _verify(provider: LocalGoogleProvider, id_token: str) -> dict:
+    client = GoogleOAuthClient(
+        provider.token_url, provider.jwks_url, transport=provider.transport
+    )
+
+    async def run():
+        await client.start()
+        try:
+            return await client.verify_id_token(id_token)
+        finally:
+            await client.stop()
+
+    return asyncio.run(run())
+
+
+def test_verify_id_token_accepts_provider_token(google_provider):
+    claims = _verify(
+        google_provider,
+        google_provider.sign({"sub": "1", "email": "ivan@example.com"})
+    )
+    assert claims["email"] == "ivan@example.com"
+
+
+def test_verify_id_token_rejects_unknown_kid(google_provider):
+    # Подпись чужим ключом с kid, которого нет в JWKS
+    other = LocalGoogleProvider(client_id=google_provider.client_id)
+    id_token = other.sign({"sub": "1"}, kid="unknown-key")
+
+    with pytest.raises(GoogleOAuthError, match="Unknown signing key"):
+        _verify(google_provider, id_token)
+
+
+def test_verify_id_token_rejects_wrong_audience(google_provider):
+    id_token = google_provider.sign({"sub": "1", "aud": "other-client"})
+
+    with pytest.raises(GoogleOAuthError, match="Invalid id_token"):
+        _verify(google_provider, id_token)
+
+
+def test_verify_id_token_rejects_wrong_issuer(google_provider):
+    id_token = google_provider.sign({"sub": "1", "iss": "https://evil.example.com"})
+
+    with pytest.raises(GoogleOAuthError, match="issuer"):
+        _verify(google_provider, id_token)
+
+
+def test_client_starts_on_first_callback(google_provider):
+    # Без OAUTH_GOOGLE_CLIENT_ID lifespan не запускает клиент заранее
+    client = GoogleOAuthClient(
+        google_provider.token_url,
+        google_provider.jwks_url,
+        transport=google_provider.transport
+    )
+    code = google_provider.issue_code("ivan@example.com")
+
+    async def run():
+        try:
+            return await client.authenticate(code)
+        finally:
+            await client.stop()
+
+    assert asyncio.run(run())["email"] == "ivan@example.com"
+    assert google_provider.token_requests == 1
+
+
+@pytest.mark.db
+def test_callback_rejects_bad_state(run_app, google_provider):
+    async def check(client):
+        await client.get("/auth/google/url")
+        code = google_provider.issue_code("ivan@example.com")
+
+        response = await client.get(
+            "/auth/google", params={"code": code, "state": "forged"}
+        )
+        assert response.status_code == 400
+        # Код не был обменян
+        assert google_provider.token_requests == 0
+
+    run_app(check)
+
+
+@pytest.mark.db
+def test_callback_logs_user_in(run_app, create_user, google_provider):
+    async def check(client):
+        user = await create_user(client)
+
+        response = await client.get("/auth/google/url")
+        query = urllib.parse.urlparse(response.json()).query
+        state = urllib.parse.parse_qs(query)["state"][0]
+        code = google_provider.issue_code(user["email"])
+
+        response = await client.get(
+            "/auth/google", params={"code": code, "state": state}
+        )
+        assert response.status_code == 200, response.text
+
+        response = await client.get("/me")
+        assert response.status_code == 200, response.text
+        assert response.json()["user_id"] == user["user_id"]
+
+    run_app(check)
@@ -0,0 +1,37 @@
+import base64
+
+import pytest
+
+from pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(user_id=42, name="Иван")
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "user_id") == {"user_id": 42, "name": "Иван"}
+
+
+def test_cursor_is_stable_for_same_keys():
+    assert encode_cursor(a=1, b=2) == encode_cursor(b=2, a=1)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor!",
+    "%%%%",
+    # Обрезанный курсор
+    encode_cursor(user_id=42)[:-3],
+    # Валидный base64, но не JSON
+    base64.urlsafe_b64encode(b"user_id=42").decode(),
+    # JSON, но не объект
+    base64.urlsafe_b64encode(b"[42]").decode(),
+])
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "user_id")
+
+
+def test_cursor_without_required_key_is_rejected():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(id=42), "user_id")
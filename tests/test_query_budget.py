@@ -0,0 +1,65 @@
+"""Ограничения количества SQL-запросов на эндпоинты"""
+import pytest
+
+from profiler import assert_max_queries
+
+pytestmark = pytest.mark.db
+
+
+def test_roles_list_served_from_cache(run_app):
+    async def check(client):
+        # Первый запрос загружает кэш ролей
+        assert (await client.get("/roles/?include_total=false")).status_code == 200
+        with assert_max_queries(0):
+            response = await client.get("/roles/?include_total=false")
+        assert response.status_code == 200
+
+    run_app(check)
+
+
+def test_users_page_query_budget(run_app):
+    async def check(client):
+        await client.get("/roles/?include_total=false")
+        # Без условных заголовков ETag считается по строкам страницы
+        with assert_max_queries(1):
+            response = await client.get("/users/?include_total=false&limit=10")
+        assert response.status_code == 200
+
+        with assert_max_queries(1):
+            response = await client.get(
+                "/users/?include_total=false&limit=10",
+                headers={"If-None-Match": response.headers["etag"]}
+            )
+        assert response.status_code == 304
+
+        # If-Modified-Since списку не поможет: лишний запрос версий не нужен
+        with assert_max_queries(1):
+            response = await client.get(
+                "/users/?include_total=false&limit=10",
+                headers={"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+            )
+        assert response.status_code == 200
+
+    run_app(check)
+
+
+def test_get_user_query_budget(run_app, create_user):
+    async def check(client):
+        user = await create_user(client)
+        path = f"/users/{user['user_id']}"
+        # Создание роли сбросило кэш ролей
+        await client.get("/roles/?include_total=false")
+
+        # Без условных заголовков — один запрос строки
+        with assert_max_queries(1):
+            response = await client.get(path)
+        assert response.status_code == 200
+
+        # Условный запрос — только версия, строка не загружается
+        with assert_max_queries(1):
+            response = await client.get(
+                path, headers={"If-None-Match": response.headers["etag"]}
+            )
+        assert response.status_code == 304
+
+    run_app(check)
@@ -0,0 +1,155 @@
+import asyncio
+import time
+
+import pytest
+
+from rate_limit import (
+    LocalRateLimitBackend,
+    PostgresRateLimitBackend,
+    RateLimiter,
+    retry_after
+)
+
+WINDOW = 60.0
+
+
+def test_window_rollover():
+    backend = LocalRateLimitBackend()
+
+    async def hits():
+        return [
+            await backend.hit("k", now, WINDOW)
+            for now in (10.0, 20.0, 30.0, 70.0, 75.0, 200.0)
+        ]
+
+    assert asyncio.run(hits()) == [
+        (0, 1), (0, 2), (0, 3),
+        # Текущее окно стало предыдущим
+        (3, 1), (3, 2),
+        # Пропущено целое окно: оба счетчика устарели
+        (0, 1),
+    ]
+
+
+def test_backend_evicts_least_recently_used_keys():
+    backend = LocalRateLimitBackend(max_keys=2)
+
+    async def hits():
+        await backend.hit("a", 1.0, WINDOW)
+        await backend.hit("b", 1.0, WINDOW)
+        await backend.hit("a", 2.0, WINDOW)
+        await backend.hit("c", 3.0, WINDOW)
+        return await backend.hit("a", 4.0, WINDOW), await backend.hit("b", 4.0, WINDOW)
+
+    # "a" использовался недавно и сохранился, "b" вытеснен и начинается заново
+    assert asyncio.run(hits()) == ((0, 3), (0, 1))
+
+
+@pytest.mark.parametrize("now, previous, current", [
+    # Хватает уменьшения вклада предыдущего окна
+    (30.0, 10, 2),
+    (50.0, 9, 4),
+    # Нужно дождаться смены окна
+    (30.0, 0, 6),
+    (10.0, 5, 7),
+])
+def test_retry_after_is_the_earliest_allowed_moment(now, previous, current):
+    limit = 5
+    wait = retry_after(now, WINDOW, limit, previous, current)
+    assert wait is not None and wait > 0
+
+    def allowed_at(moment: float) -> bool:
+        # Счетчики на момент moment с учетом смены окна и новой попытки
+        p, c = previous, current
+        if moment // WINDOW != now // WINDOW:
+            p, c = c, 0
+        return retry_after(moment, WINDOW, limit, p, c + 1) is None
+
+    assert allowed_at(now + wait + 1e-6)
+    assert not allowed_at(now + wait - 1.0)
+
+
+def test_retry_after_allows_attempts_within_limit():
+    assert retry_after(30.0, WINDOW, 5, 0, 5) is None
+    # Половина предыдущего окна еще в скользящем окне: 4 * 0.5 + 3 = 5
+    assert retry_after(30.0, WINDOW, 5, 4, 3) is None
+
+
+def test_rejected_attempts_are_counted(monkeypatch):
+    """Отклоненные попытки учитываются: продолжение перебора продлевает блокировку"""
+    limiter = RateLimiter(window=WINDOW)
+    monkeypatch.setattr(time, "time", lambda: 6000.0)
+
+    async def attempts(count: int):
+        return [await limiter.check([("k", 2)]) for _ in range(count)]
+
+    waits = asyncio.run(attempts(5))
+
+    assert waits[:2] == [None, None]
+    assert all(wait is not None for wait in waits[2:])
+    assert waits[2] < waits[3] < waits[4]
+
+
+def test_any_exceeded_key_rejects(monkeypatch):
+    limiter = RateLimiter(window=WINDOW)
+    monkeypatch.setattr(time, "time", lambda: 6000.0)
+
+    async def attempts():
+        await limiter.check([("ip", 1)])
+        return await limiter.check([("user", 10), ("ip", 1)])
+
+    assert asyncio.run(attempts()) is not None
+
+
+class CounterPool:
+    """Пул asyncpg, записывающий выражения"""
+
+    def __init__(self):
+        self.deletes = []
+
+    async def execute(self, query, *args):
+        self.deletes.append(args[0])
+
+    async def fetchrow(self, query, *args):
+        return {"previous": 0, "current": 1}
+
+
+def test_postgres_backend_prunes_stale_counters_once_per_window():
+    backend = PostgresRateLimitBackend("postgresql://unused")
+    backend._pool = pool = CounterPool()
+
+    async def hits():
+        for now in (130.0, 150.0, 189.0, 190.0, 200.0):
+            await backend.hit("k", now, WINDOW)
+
+    asyncio.run(hits())
+    # Удаляются строки старше предыдущего окна: в 130 это окна до 60
+    assert pool.deletes == [60.0, 120.0]
+
+
+@pytest.mark.db
+def test_postgres_backend_deletes_only_stale_rows():
+    from config import DatabaseConfig
+
+    backend = PostgresRateLimitBackend(DatabaseConfig.get_sync_database_url())
+    prefix = f"test-{time.time()}"
+
+    async def run():
+        await backend.start()
+        try:
+            await backend.hit(f"{prefix}-old", 1000.0, WINDOW)
+            await backend.hit(f"{prefix}-previous", 1090.0, WINDOW)
+            await backend.hit(f"{prefix}-current", 1150.0, WINDOW)
+            await backend.prune(1150.0, WINDOW)
+            rows = await backend._pool.fetch(
+                f"SELECT key FROM {backend.table} WHERE key LIKE $1",
+                f"{prefix}-%"
+            )
+            await backend._pool.execute(
+                f"DELETE FROM {backend.table} WHERE key LIKE $1", f"{prefix}-%"
+            )
+            return {row["key"] for row in rows}
+        finally:
+            await backend.stop()
+
+    assert asyncio.run(run()) == {f"{prefix}-previous", f"{prefix}-current"}
@@ -0,0 +1,107 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from role_cache import LocalRoleNotifier, PostgresRoleNotifier, RoleCache
+
+
+class RolesSession:
+    """Сессия, отдающая строки ролей и считающая запросы"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.info = {}
+        self.queries = 0
+
+    async def execute(self, query):
+        self.queries += 1
+        return SimpleNamespace(all=lambda: list(self.rows))
+
+    async def merge(self, role, load=True):
+        return role
+
+
+def test_invalidate_clears_other_caches_through_notifier():
+    notifier = LocalRoleNotifier()
+    writer, reader = RoleCache(notifier), RoleCache(notifier)
+    session = RolesSession([(1, "admin", None), (2, "user", None)])
+
+    async def run():
+        before = await reader.version(session)
+        await reader.version(session)
+        assert session.queries == 1
+
+        session.rows = [(1, "admin", None), (2, "manager", None)]
+        await writer.invalidate()
+        after = await reader.version(session)
+        assert session.queries == 2
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert before != after
+
+
+def test_missing_role_does_not_reload_on_every_request():
+    session = RolesSession([(1, "admin", None)])
+
+    async def run(cache):
+        for _ in range(5):
+            assert await cache.get_by_id(session, 99) is None
+            assert await cache.get_by_name(session, "missing") is None
+        return session.queries
+
+    assert asyncio.run(run(RoleCache())) == 1
+
+
+def test_miss_reloads_role_created_by_other_worker():
+    session = RolesSession([(1, "admin", None)])
+    cache = RoleCache(miss_reload_interval=0)
+
+    async def run():
+        assert await cache.get_by_id(session, 2) is None
+        # Роль создана в другом воркере, оповещение еще не пришло
+        session.rows = [(1, "admin", None), (2, "user", None)]
+        return await cache.get_by_id(session, 2)
+    assert asyncio.run(run()).role_name == "user"
+
+
+@pytest.mark.db
+def test_role_update_invalidates_cache_of_other_worker(run_app):
+    from config import DatabaseConfig
+    from database import get_sessionmaker
+
+    async def check(client):
+        # Кэш «другого воркера» со своим соединением LISTEN
+        other = RoleCache(
+            PostgresRoleNotifier(DatabaseConfig.get_sync_database_url())
+        )
+        await other.notifier.start()
+        try:
+            response = await client.post(
+                "/roles/", json={"role_name": f"test_{uuid.uuid4().hex[:12]}"}
+            )
+            role_id = response.json()["role_id"]
+            sessions = get_sessionmaker()
+
+            async def cached_name() -> str:
+                async with sessions() as session:
+                    return (await other.get_by_id(session, role_id)).role_name
+
+            await cached_name()
+            new_name = f"test_{uuid.uuid4().hex[:12]}"
+            response = await client.put(
+                f"/roles/{role_id}", json={"role_name": new_name}
+            )
+            assert response.status_code == 200, response.text
+
+            for _ in range(50):
+                if await cached_name() == new_name:
+                    break
+                await asyncio.sleep(0.1)
+            assert await cached_name() == new_name
+        finally:
+            await other.notifier.stop()
+
+    run_app(check)
@@ -0,0 +1,90 @@
+import time
+
+from user_cache import UserCache
+
+
+def _user(user_id: int) -> dict:
+    return {
+        "user_id": user_id,
+        "email": f"user{user_id}@example.com",
+        "phone_number": f"+7000000000{user_id}",
+    }
+
+
+def test_lookup_by_secondary_keys():
+    cache = UserCache(enabled=True)
+    cache.put(_user(1), cache.generation)
+
+    assert cache.get(1)["user_id"] == 1
+    assert cache.get_by_email("user1@example.com")["user_id"] == 1
+    assert cache.get_by_phone("+70000000001")["user_id"] == 1
+    assert cache.get_by_email("missing@example.com") is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache = UserCache(enabled=True, ttl=30)
+    monkeypatch.setattr(time, "monotonic", lambda: 100.0)
+    cache.put(_user(1), cache.generation)
+
+    monkeypatch.setattr(time, "monotonic", lambda: 130.0)
+    assert cache.get(1) is not None
+    monkeypatch.setattr(time, "monotonic", lambda: 130.1)
+    assert cache.get(1) is None
+    # Вторичные ключи устаревшей записи тоже удалены
+    assert cache.get_by_email("user1@example.com") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = UserCache(enabled=True, max_size=2)
+    cache.put(_user(1), cache.generation)
+    cache.put(_user(2), cache.generation)
+    cache.get(1)
+    cache.put(_user(3), cache.generation)
+
+    assert cache.get(2) is None
+    assert cache.get_by_email("user2@example.com") is None
+    assert cache.get(1) is not None and cache.get(3) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_changed_email_replaces_old_index():
+    cache = UserCache(enabled=True)
+    cache.put(_user(1), cache.generation)
+    cache.put({**_user(1), "email": "new@example.com"}, cache.generation)
+
+    assert cache.get_by_email("user1@example.com") is None
+    assert cache.get_by_email("new@example.com")["user_id"] == 1
+
+
+def test_invalidate_user_and_all():
+    cache = UserCache(enabled=True)
+    cache.put(_user(1), cache.generation)
+    cache.put(_user(2), cache.generation)
+
+    cache.invalidate(1)
+    assert cache.get(1) is None and cache.get_by_phone("+70000000001") is None
+    assert cache.get(2) is not None
+
+    cache.invalidate()
+    assert cache.get(2) is None
+
+
+def test_read_started_before_invalidation_is_not_cached():
+    cache = UserCache(enabled=True)
+    generation = cache.generation
+    # Запись изменилась, пока шло чтение из базы
+    cache.invalidate(1)
+    cache.put(_user(1), generation)
+
+    assert cache.get(1) is None
+
+
+def test_stats_hit_ratio():
+    cache = UserCache(enabled=True)
+    cache.put(_user(1), cache.generation)
+    cache.get(1)
+    cache.get(2)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
@@ -0,0 +1,125 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import CacheConfig
+
+
+class UserCache:
+    """
+    LRU/TTL кэш пользователей с вторичными ключами
+
+    Основная запись хранится по user_id как словарь значений колонок.
+    Индексы email и phone_number указывают на user_id, поэтому
+    запись существует в единственном экземпляре и сбрасывается
+    вместе со всеми своими ключами.
+
+    Кэш локален для процесса: другие воркеры увидят изменение
+    не позже чем через ttl секунд.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        max_size: int = 10000,
+        ttl: float = 30.0
+    ):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._by_email: Dict[str, int] = {}
+        self._by_phone: Dict[str, int] = {}
+        # Растет при каждом сбросе: чтение, начатое до записи, не кэшируется
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _drop(self, user_id: int) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        values, _ = entry
+        if self._by_email.get(values["email"]) == user_id:
+            del self._by_email[values["email"]]
+        if self._by_phone.get(values["phone_number"]) == user_id:
+            del self._by_phone[values["phone_number"]]
+
+    def get(self, user_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Получить значения колонок пользователя по ID"""
+        entry = self._entries.get(user_id) if user_id is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+
+        values, expires_at = entry
+        if time.monotonic() > expires_at:
+            self._drop(user_id)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return values
+
+    def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Получить значения колонок пользователя по email"""
+        return self.get(self._by_email.get(email))
+
+    def get_by_phone(self, phone_number: str) -> Optional[Dict[str, Any]]:
+        """Получить значения колонок пользователя по телефону"""
+        return self.get(self._by_phone.get(phone_number))
+
+    def put(self, values: Dict[str, Any], generation: int) -> None:
+        """
+        Сохранить пользователя
+
+        Args:
+            values: Значения колонок пользователя
+            generation: Значение self.generation на момент начала чтения
+        """
+        if generation != self.generation:
+            return
+
+        user_id = values["user_id"]
+        self._drop(user_id)
+        self._entries[user_id] = (values, time.monotonic() + self.ttl)
+        self._by_email[values["email"]] = user_id
+        self._by_phone[values["phone_number"]] = user_id
+
+        while len(self._entries) > self.max_size:
+            oldest_id = next(iter(self._entries))
+            self._drop(oldest_id)
+            self.evictions += 1
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Сбросить пользователя (или весь кэш, если user_id не указан)"""
+        self.generation += 1
+        if user_id is None:
+            self._entries.clear()
+            self._by_email.clear()
+            self._by_phone.clear()
+        else:
+            self._drop(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Статистика попаданий"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+user_cache = UserCache(
+    enabled=CacheConfig.USER_CACHE_ENABLED,
+    max_size=CacheConfig.USER_CACHE_MAX_SIZE,
+    ttl=CacheConfig.USER_CACHE_TTL
+)
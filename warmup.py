@@ -0,0 +1,48 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+
+from database import get_engine, get_sessionmaker
+from passwords import password_hasher
+from role_cache import role_cache
+
+logger = logging.getLogger(__name__)
+
+
+async def _open_connections(count: int) -> None:
+    engine = get_engine()
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await engine.connect())
+        await asyncio.gather(*(
+            connection.execute(text("SELECT 1")) for connection in connections
+        ))
+    finally:
+        # Закрытые соединения возвращаются в пул и остаются открытыми
+        for connection in connections:
+            await connection.close()
+
+
+async def prewarm() -> float:
+    """
+    Подготовить воркер до первого запроса
+
+    Создает движок и открывает pool_size соединений, загружает кэш
+    ролей, запускает поток bcrypt. Без прогрева
+    все это происходит лениво на первых запросах.
+
+    Returns:
+        float: Длительность прогрева, секунды
+    """
+    started = time.perf_counter()
+    await _open_connections(get_engine().pool.size())
+    async with get_sessionmaker()() as session:
+        await role_cache.get_all(session)
+    await password_hasher.verify_dummy("")
+
+    elapsed = time.perf_counter() - started
+    logger.info("Воркер прогрет за %.3f с", elapsed)
+    return elapsed